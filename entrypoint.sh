@@ -9,13 +9,35 @@ fi
 
 cd myproject
 
-# If you'd like to automatically configure the DB settings, you can add sed commands here.
-# For now, we assume you're manually configuring settings.py to use PostgreSQL.
-# ตั้งค่า Django settings
-export DJANGO_SETTINGS_MODULE=myproject.settings
+# DJANGO_SERVER เลือกวิธีรัน:
+#   runserver (ค่าเริ่มต้น) dev server process เดียว สำหรับพัฒนา
+#   gunicorn  WSGI หลาย worker (myproject/wsgi.py)
+#   uvicorn   ASGI ผ่าน gunicorn ที่ใช้ worker ของ uvicorn (myproject/asgi.py)
+# ค่าของ gunicorn อยู่ใน gunicorn.conf.py
+export DJANGO_SERVER=${DJANGO_SERVER:-runserver}
+
+# ตั้งค่า Django settings (โหมด production ใช้ myproject.settings_production)
+if [ "$DJANGO_SERVER" = "runserver" ]; then
+    export DJANGO_SETTINGS_MODULE=${DJANGO_SETTINGS_MODULE:-myproject.settings}
+else
+    export DJANGO_SETTINGS_MODULE=${DJANGO_SETTINGS_MODULE:-myproject.settings_production}
+fi
 
 # Run migrations
 python manage.py migrate
 
-# Start Django dev server
-exec python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+# รวมไฟล์ static (ชื่อไฟล์มี hash เมื่อ DEBUG ปิด) ไปที่ STATIC_ROOT
+python manage.py collectstatic --noinput
+
+case "$DJANGO_SERVER" in
+    gunicorn)
+        exec gunicorn -c gunicorn.conf.py myproject.wsgi:application
+        ;;
+    uvicorn)
+        exec gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker myproject.asgi:application
+        ;;
+    *)
+        # Start Django dev server
+        exec python manage.py runserver 0.0.0.0:8000
+        ;;
+esac
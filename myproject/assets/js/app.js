@@ -0,0 +1,10 @@
+// myproject/assets/js/app.js
+/**
+ * JS ของทั้งเว็บ รวมเป็นไฟล์เดียวด้วย esbuild (npm run build) ที่ myapp/static/dist/app.js
+ */
+import Alpine from 'alpinejs';
+
+import '../../myapp/static/js/infiniteScroll.js';
+
+window.Alpine = Alpine;
+Alpine.start();
@@ -0,0 +1,41 @@
+# myproject/gunicorn.conf.py
+"""
+ค่าของ gunicorn ในโหมด production (entrypoint.sh, DJANGO_SERVER=gunicorn หรือ uvicorn)
+
+- จำนวน worker: WEB_CONCURRENCY หรือ (จำนวน CPU * 2) + 1
+- preload_app: โหลด Django ใน master ครั้งเดียวแล้ว fork ให้ worker ใช้หน่วยความจำร่วมกันแบบ copy-on-write
+- kill -HUP <master>: เริ่ม worker ชุดใหม่แล้วปิดชุดเดิมหลังคำขอที่ค้างอยู่เสร็จ (ไม่ตัดการเชื่อมต่อ)
+  เมื่อ preload เปิดอยู่ worker ชุดใหม่ยังใช้โค้ดที่ master โหลดไว้ การ deploy โค้ดใหม่จึงต้อง
+  restart container (SIGTERM รอคำขอที่ค้างได้ถึง graceful_timeout) หรือปิด GUNICORN_PRELOAD
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# รีไซเคิล worker เป็นระยะ กันหน่วยความจำโตจากการรั่ว (jitter กันทุกตัว restart พร้อมกัน)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = max_requests // 10
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+pidfile = os.environ.get('GUNICORN_PIDFILE', '/tmp/gunicorn.pid')
+# heartbeat ของ worker อยู่ในหน่วยความจำ ไม่ใช่ดิสก์ของ container
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None
+errorlog = '-'
+
+
+def pre_fork(server, worker):
+    # master ต้องไม่มีการเชื่อมต่อฐานข้อมูลค้างตอน fork (worker จะใช้ socket เดียวกันร่วมกัน)
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        from myapp.db_pool.pool import close_pools
+        connections.close_all()
+        close_pools()
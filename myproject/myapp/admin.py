@@ -3,8 +3,9 @@ from .models import (
     Product, SubscriptionPlan, Subscription, Order, OrderItem,
     UserProfile, ExercisePlan, MealPlan, DailyMeal, WorkoutDay, WorkoutExercise,
     Exercise, Recipe, Ingredient, MealItem, Content, Article, Video,
-    ForumTopic, ForumThread, ForumReply, Progress, NutritionPlan
+    ForumTopic, ForumThread, ForumReply, Progress, NutritionPlan, Job
 )
+from .search import search_products
 
 # Product Management
 @admin.register(Product)
@@ -14,6 +15,11 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     list_filter = ('is_active', 'created_at')
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return search_products(queryset, search_term), False
+
 # Subscription Management
 @admin.register(SubscriptionPlan)
 class SubscriptionPlanAdmin(admin.ModelAdmin):
@@ -139,7 +145,7 @@ class ForumTopicAdmin(admin.ModelAdmin):
 
 @admin.register(ForumThread)
 class ForumThreadAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'topic', 'created_at', 'updated_at')
+    list_display = ('title', 'author', 'topic', 'reply_count', 'last_reply_at', 'created_at', 'updated_at')
     list_filter = ('topic', 'created_at')
     search_fields = ('title', 'content', 'author__username')
 
@@ -154,4 +160,12 @@ class ForumReplyAdmin(admin.ModelAdmin):
 class ProgressAdmin(admin.ModelAdmin):
     list_display = ('user', 'date', 'weight', 'exercise_minutes')
     list_filter = ('date',)
-    search_fields = ('user__username', 'notes')
\ No newline at end of file
+    search_fields = ('user__username', 'notes')
+
+# Background jobs
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'user', 'attempts', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('kind', 'user__username')
+    raw_id_fields = ('user',)
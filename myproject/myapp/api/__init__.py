@@ -0,0 +1,8 @@
+"""
+API แบบอ่านอย่างเดียว (v1) สำหรับแอปมือถือ สร้างบน Django REST framework
+
+- แบ่งหน้าแบบ keyset ผ่าน ?cursor= (ใช้ myapp.pagination เดียวกับหน้าเว็บ)
+- ?fields=a,b เลือกเฉพาะฟิลด์ที่ต้องการ ความสัมพันธ์ที่ไม่ได้ขอจะไม่ถูก prefetch
+- ทุกคำตอบมี ETag และตอบ 304 เมื่อ If-None-Match ตรงกัน
+- ข้อมูลสาธารณะ (สินค้า แพ็คเกจ คอนเทนต์) ถูกเก็บใน cache แบบมีเวอร์ชัน ล้างด้วย signal
+"""
@@ -0,0 +1,68 @@
+# myapp/api/caching.py
+"""
+cache ของคำตอบ API และ conditional GET
+
+ข้อมูลสาธารณะถูกเก็บตาม path เต็ม (รวม query string) ภายใต้เวอร์ชันของแต่ละหมวด
+(เช่น 'products' ดู myapp/cache_versions.py) การล้างจึงเป็นแค่การเปลี่ยนเวอร์ชัน ไม่ต้องไล่ลบทุก key
+"""
+import hashlib
+from functools import partial
+
+from django.core.cache import cache
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers, set_response_etag,
+)
+from rest_framework.response import Response
+
+from ..cache_versions import get_version
+
+CACHE_TIMEOUT = 60 * 5
+
+
+def _not_modified(request, response):
+    set_response_etag(response)
+    return get_conditional_response(request, etag=response.get('ETag'), response=response)
+
+
+class ConditionalResponseMixin:
+    """ใส่ ETag (hash ของเนื้อหา JSON) และตอบ 304 เมื่อไคลเอนต์มีข้อมูลล่าสุดอยู่แล้ว
+
+    cache_control กำหนดนโยบายของ cache ฝั่งไคลเอนต์/พร็อกซี
+    """
+    cache_control = {'private': True, 'no_cache': True}
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ('GET', 'HEAD') and response.status_code == 200:
+            # ETag คำนวณจากเนื้อหาที่ render แล้ว
+            response.add_post_render_callback(partial(_not_modified, request))
+            patch_cache_control(response, **self.cache_control)
+            patch_vary_headers(response, ('Accept', 'Authorization', 'Cookie'))
+        return response
+
+
+class CachedResponseMixin:
+    """เก็บ response.data ของ list/retrieve ไว้ใน cache (ใช้กับข้อมูลที่ไม่ขึ้นกับผู้ใช้เท่านั้น)"""
+    cache_scope = None
+    cache_timeout = CACHE_TIMEOUT
+    cache_control = {'public': True, 'max_age': 60}
+
+    def _cache_key(self, request):
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f"api:{self.cache_scope}:{get_version(self.cache_scope)}:{path}"
+
+    def _cached(self, handler, request, *args, **kwargs):
+        key = self._cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(super().retrieve, request, *args, **kwargs)
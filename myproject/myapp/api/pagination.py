@@ -0,0 +1,35 @@
+# myapp/api/pagination.py
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+from ..pagination import paginate
+
+
+class KeysetCursorPagination(BasePagination):
+    """keyset pagination ของ myapp.pagination ในรูปแบบของ DRF (?cursor=, ?page_size=)"""
+    page_size = 20
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get('page_size', self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page = paginate(
+            queryset, view.get_ordering(), request.query_params, per_page=self.get_page_size(request)
+        )
+        return list(self.page)
+
+    def _link(self, query):
+        return self.request.build_absolute_uri(f"{self.request.path}?{query}") if query else None
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self._link(self.page.next_query),
+            'previous': self._link(self.page.previous_query),
+            'results': data,
+        })
@@ -0,0 +1,143 @@
+# myapp/api/serializers.py
+from rest_framework import serializers
+
+from ..models import (
+    Article, DailyMeal, Exercise, ExercisePlan, MealItem, MealPlan, Order, OrderItem,
+    Product, Recipe, SubscriptionPlan, Video, WorkoutDay, WorkoutExercise,
+)
+
+
+def requested_fields(request):
+    """ชุดฟิลด์จาก ?fields=a,b หรือ None เมื่อไม่ได้ระบุ"""
+    if request is None:
+        return None
+    value = request.query_params.get('fields')
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """ตัดฟิลด์ระดับบนสุดที่ไม่ได้ขอใน ?fields= ออก (ชื่อที่ไม่รู้จักถูกข้ามไป)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields and fields & set(self.fields):
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'description', 'price', 'stock', 'category', 'image',
+                  'created_at', 'updated_at']
+
+
+class SubscriptionPlanSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    duration_display = serializers.CharField(source='get_duration_display', read_only=True)
+
+    class Meta:
+        model = SubscriptionPlan
+        fields = ['id', 'name', 'description', 'duration', 'duration_display', 'price']
+
+
+class ArticleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.CharField(source='author.username', read_only=True)
+
+    class Meta:
+        model = Article
+        fields = ['id', 'title', 'slug', 'content', 'image', 'category', 'author', 'date']
+
+
+class VideoSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Video
+        fields = ['id', 'title', 'description', 'video_url', 'thumbnail', 'category',
+                  'duration', 'date']
+
+
+class ExerciseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Exercise
+        fields = ['id', 'name', 'muscle_group', 'difficulty', 'equipment_required', 'video_url']
+
+
+class WorkoutExerciseSerializer(serializers.ModelSerializer):
+    exercise = ExerciseSerializer(read_only=True)
+
+    class Meta:
+        model = WorkoutExercise
+        fields = ['id', 'exercise', 'sets', 'reps', 'rest_time', 'notes', 'order']
+
+
+class WorkoutDaySerializer(serializers.ModelSerializer):
+    exercises = WorkoutExerciseSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = WorkoutDay
+        fields = ['id', 'day_number', 'focus', 'exercises']
+
+
+class ExercisePlanSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    workout_days = WorkoutDaySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ExercisePlan
+        fields = ['id', 'goal', 'level', 'days_per_week', 'preferred_time', 'training_focus',
+                  'available_equipment', 'start_date', 'created_at', 'workout_days']
+
+
+class RecipeSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Recipe
+        fields = ['id', 'name', 'meal_type', 'diet_type', 'calories_per_serving',
+                  'protein', 'carbs', 'fat', 'image']
+
+
+class MealItemSerializer(serializers.ModelSerializer):
+    recipe = RecipeSummarySerializer(read_only=True)
+
+    class Meta:
+        model = MealItem
+        fields = ['id', 'meal_time', 'recipe']
+
+
+class DailyMealSerializer(serializers.ModelSerializer):
+    meal_items = MealItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = DailyMeal
+        fields = ['id', 'day_number', 'meal_items']
+
+
+class MealPlanSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    macros = serializers.SerializerMethodField()
+    daily_meals = DailyMealSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = MealPlan
+        fields = ['id', 'goal', 'daily_calories', 'protein_ratio', 'carb_ratio', 'fat_ratio',
+                  'meals_per_day', 'dietary_restrictions', 'allergies', 'start_date',
+                  'created_at', 'macros', 'daily_meals']
+
+    def get_macros(self, obj):
+        return obj.calculate_macros()
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'product_id', 'product_name', 'quantity', 'price']
+
+
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ['id', 'order_number', 'status', 'total_amount', 'shipping_fee',
+                  'tracking_number', 'created_at', 'updated_at', 'items']
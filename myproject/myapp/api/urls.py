@@ -0,0 +1,14 @@
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+router = DefaultRouter()
+router.register('products', views.ProductViewSet, basename='api-product')
+router.register('subscription-plans', views.SubscriptionPlanViewSet, basename='api-subscription-plan')
+router.register('articles', views.ArticleViewSet, basename='api-article')
+router.register('videos', views.VideoViewSet, basename='api-video')
+router.register('exercise-plans', views.ExercisePlanViewSet, basename='api-exercise-plan')
+router.register('meal-plans', views.MealPlanViewSet, basename='api-meal-plan')
+router.register('orders', views.OrderViewSet, basename='api-order')
+
+urlpatterns = router.urls
@@ -0,0 +1,143 @@
+# myapp/api/views.py
+from django.db.models import Prefetch
+from rest_framework import permissions, viewsets
+
+from ..entitlements import get_entitlement
+from ..models import (
+    Article, DailyMeal, ExercisePlan, MealItem, MealPlan, Order, OrderItem, Product,
+    SubscriptionPlan, Video, WorkoutDay, WorkoutExercise,
+)
+from ..search import ordering_for as search_ordering_for, search_products
+from .caching import CachedResponseMixin, ConditionalResponseMixin
+from .serializers import (
+    ArticleSerializer, ExercisePlanSerializer, MealPlanSerializer, OrderSerializer,
+    ProductSerializer, SubscriptionPlanSerializer, VideoSerializer, requested_fields,
+)
+
+
+class HasActiveSubscription(permissions.BasePermission):
+    """เหมือน subscription_required ของหน้าเว็บ: ต้องเป็นสมาชิกที่ยังไม่หมดอายุ"""
+    message = 'ฟีเจอร์นี้สำหรับสมาชิกเท่านั้น'
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and get_entitlement(request).is_active
+
+
+class ReadOnlyViewSet(ConditionalResponseMixin, viewsets.ReadOnlyModelViewSet):
+    """ฐานของ viewset ใน API
+
+    ordering ต้องจบด้วยคีย์ที่ไม่ซ้ำ (ใช้เป็นคีย์ของ cursor)
+    prefetch คือ {ชื่อฟิลด์: lookup} ที่จะ prefetch เฉพาะเมื่อฟิลด์นั้นถูกขอใน ?fields=
+    """
+    ordering = ('-id',)
+    prefetch = {}
+
+    def get_ordering(self):
+        return self.ordering
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = requested_fields(self.request)
+        lookups = [
+            lookup for name, lookup in self.prefetch.items()
+            if fields is None or name in fields
+        ]
+        return queryset.prefetch_related(*lookups) if lookups else queryset
+
+
+class UserOwnedViewSet(ReadOnlyViewSet):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+
+class ProductViewSet(CachedResponseMixin, ReadOnlyViewSet):
+    """สินค้า: ?q= ค้นหา full-text, ?category= กรองหมวดหมู่"""
+    queryset = Product.objects.filter(is_active=True).defer('search_vector')
+    serializer_class = ProductSerializer
+    ordering = ('-created_at', '-id')
+    cache_scope = 'products'
+
+    def get_ordering(self):
+        # เหมือนหน้าเว็บ: เรียงตามคะแนนเฉพาะเมื่อ search_products ค้นหาจริง
+        if self.action == 'list':
+            return search_ordering_for(self.request.query_params.get('q'), self.ordering)
+        return self.ordering
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        category = self.request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(category=category)
+        query = self.request.query_params.get('q')
+        if query and self.action == 'list':
+            queryset = search_products(queryset, query)
+        return queryset
+
+
+class SubscriptionPlanViewSet(CachedResponseMixin, ReadOnlyViewSet):
+    queryset = SubscriptionPlan.objects.filter(is_active=True)
+    serializer_class = SubscriptionPlanSerializer
+    ordering = ('price', 'id')
+    cache_scope = 'subscription_plans'
+
+
+class CategoryFilterMixin:
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        category = self.request.query_params.get('category')
+        return queryset.filter(category=category) if category else queryset
+
+
+class ArticleViewSet(CategoryFilterMixin, CachedResponseMixin, ReadOnlyViewSet):
+    queryset = Article.objects.filter(published=True).select_related('author')
+    serializer_class = ArticleSerializer
+    ordering = ('-date', '-id')
+    cache_scope = 'content'
+
+
+class VideoViewSet(CategoryFilterMixin, CachedResponseMixin, ReadOnlyViewSet):
+    queryset = Video.objects.filter(published=True)
+    serializer_class = VideoSerializer
+    ordering = ('-date', '-id')
+    cache_scope = 'content'
+
+
+class ExercisePlanViewSet(UserOwnedViewSet):
+    permission_classes = [permissions.IsAuthenticated, HasActiveSubscription]
+    queryset = ExercisePlan.objects.all()
+    serializer_class = ExercisePlanSerializer
+    ordering = ('-created_at', '-id')
+    prefetch = {
+        'workout_days': Prefetch('workout_days', queryset=WorkoutDay.objects.prefetch_related(
+            Prefetch('exercises', queryset=WorkoutExercise.objects.select_related('exercise'))
+        )),
+    }
+
+
+class MealPlanViewSet(UserOwnedViewSet):
+    permission_classes = [permissions.IsAuthenticated, HasActiveSubscription]
+    queryset = MealPlan.objects.all()
+    serializer_class = MealPlanSerializer
+    ordering = ('-created_at', '-id')
+    prefetch = {
+        'daily_meals': Prefetch('daily_meals', queryset=DailyMeal.objects.prefetch_related(
+            Prefetch('meal_items', queryset=MealItem.objects.select_related('recipe'))
+        )),
+    }
+
+
+class OrderViewSet(UserOwnedViewSet):
+    """คำสั่งซื้อของผู้ใช้ (?status= กรองสถานะ)"""
+    queryset = Order.objects.all()
+    serializer_class = OrderSerializer
+    ordering = ('-created_at', '-id')
+    prefetch = {
+        'items': Prefetch('items', queryset=OrderItem.objects.select_related('product')),
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        status = self.request.query_params.get('status')
+        return queryset.filter(status=status) if status else queryset
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class MyappConfig(AppConfig):
@@ -6,4 +7,11 @@ class MyappConfig(AppConfig):
     name = 'myapp'
 
     def ready(self):
-        import myapp.signals
\ No newline at end of file
+        import myapp.signals
+        import myapp.tasks  # ลงทะเบียนตัวจัดการงานของคิว myapp.jobs
+
+        # ตัวเก็บกวาด subscription ใน process (ปิดไว้โดยปริยาย ใช้คำสั่ง expire_subscriptions แทนได้)
+        interval = getattr(settings, 'SUBSCRIPTION_SWEEP_INTERVAL', 0)
+        if interval:
+            from myapp.subscriptions import start_periodic_sweeper
+            start_periodic_sweeper(interval)
\ No newline at end of file
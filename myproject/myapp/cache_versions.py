@@ -0,0 +1,37 @@
+# myapp/cache_versions.py
+"""
+เวอร์ชันของข้อมูลแต่ละหมวด (เช่น 'products', 'content') เก็บใน cache กลาง
+
+signal เปลี่ยนเวอร์ชันหลัง commit เมื่อข้อมูลของหมวดเปลี่ยน (ดู myapp/signals.py)
+ผู้ใช้เวอร์ชัน ได้แก่ cache ของ API และ validator ของ conditional GET (myapp/conditional.py)
+จึงรู้ว่าข้อมูลเปลี่ยนหรือไม่โดยไม่ต้อง query
+
+เวอร์ชันเป็น token สุ่มที่ไม่ซ้ำเดิม ไม่ใช่ตัวนับ: ถ้า key ถูก evict หรือ cache เริ่มใหม่
+ตัวนับจะกลับไปเริ่มที่ 1 และ ETag ของเนื้อหาเก่าจะตรงกับเวอร์ชันใหม่ (ตอบ 304 ผิด)
+"""
+import uuid
+
+from django.core.cache import cache
+
+
+def _version_key(scope):
+    return f"version:{scope}"
+
+
+def _new_token():
+    return uuid.uuid4().hex
+
+
+def get_version(scope):
+    version = cache.get(_version_key(scope))
+    if version is None:
+        # add ไม่ทับค่าที่ process อื่นเพิ่งตั้ง ทุก process จึงได้ token เดียวกัน
+        token = _new_token()
+        cache.add(_version_key(scope), token, None)
+        version = cache.get(_version_key(scope), token)
+    return version
+
+
+def invalidate(scope):
+    """ทำให้ทุกอย่างที่อ้างอิงเวอร์ชันของหมวด scope หมดอายุ"""
+    cache.set(_version_key(scope), _new_token(), None)
@@ -0,0 +1,224 @@
+# myapp/cart.py
+"""
+ตะกร้าสินค้า (คำสั่งซื้อสถานะ 'pending')
+
+ทุกการแก้ไขตะกร้าทำผ่านฟังก์ชันในโมดูลนี้ภายใน transaction เดียว โดยปรับจำนวนสินค้า
+และยอดรวมของคำสั่งซื้อด้วย delta แบบ F() แทนการโหลดทุกรายการมารวมใหม่ใน Python
+จำนวน query จึงคงที่ไม่ว่าตะกร้าจะมีกี่รายการ และการกดซ้ำพร้อมกันไม่ทำให้ยอดเพี้ยน
+
+จำนวนสินค้าในตะกร้าถูกแสดงบน badge ของทุกหน้า จึงเก็บไว้ใน cache ต่อผู้ใช้
+และล้างทุกครั้งที่ตะกร้าเปลี่ยน
+
+ผู้ใช้มีตะกร้าได้ใบเดียว (unique order_one_pending_per_user) ตะกร้าที่ถูกทิ้งไว้นาน
+ถูกปิดด้วย reap_idle_carts (คำสั่ง reap_carts)
+"""
+import time
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from . import dashboard, inventory
+from .models import Order, OrderItem
+
+# กันค่าค้างจากการแก้ไขนอก view (เช่นผ่าน admin) ไม่ให้อยู่นานเกินไป
+CART_COUNT_TIMEOUT = 60 * 60
+DEFAULT_BATCH_SIZE = 500
+
+
+class CartClosed(Exception):
+    """ตะกร้าถูกยืนยันสั่งซื้อ (myapp.inventory.place_order) ระหว่างที่กำลังแก้ไข"""
+
+
+def _cart_count_key(user_id):
+    return f"cart:count:{user_id}"
+
+
+def get_cart_count(user):
+    """จำนวนสินค้าทั้งหมดในตะกร้าของผู้ใช้ (อ่านจาก cache ถ้ามี)"""
+    key = _cart_count_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = OrderItem.objects.filter(
+            order__user=user, order__status='pending'
+        ).aggregate(total=Sum('quantity'))['total'] or 0
+        cache.set(key, count, CART_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_cart_count(user):
+    """ล้างค่าใน cache ให้คำนวณใหม่ในการแสดงผลครั้งถัดไป
+
+    ล้าง snapshot ของแดชบอร์ดด้วย เพราะยอดรวมของตะกร้าถูกปรับด้วย .update() ซึ่งไม่ส่ง signal
+    """
+    cache.delete(_cart_count_key(user.pk))
+    dashboard.invalidate(user.pk)
+
+
+def get_cart(user):
+    """ตะกร้าปัจจุบันของผู้ใช้ หรือ None ถ้ายังไม่มี"""
+    return Order.objects.filter(user=user, status='pending').first()
+
+
+def get_or_create_cart(user):
+    # unique order_one_pending_per_user ทำให้คำขอที่สร้างพร้อมกันได้ IntegrityError
+    # ซึ่ง get_or_create จับไว้แล้วอ่านตะกร้าที่อีกคำขอสร้างขึ้นแทน
+    order, _ = Order.objects.get_or_create(
+        user=user,
+        status='pending',
+        defaults={'total_amount': 0, 'shipping_fee': 0},
+    )
+    return order
+
+
+def _adjust_total(order_id, amount):
+    # เงื่อนไขสถานะกันการแก้รายการของคำสั่งซื้อที่ checkout ไปแล้ว (สต็อกถูกตัดตามรายการเดิม)
+    updated = Order.objects.filter(pk=order_id, status='pending').update(
+        total_amount=F('total_amount') + amount,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        raise CartClosed
+
+
+def _upsert_line(order, product, quantity):
+    """เพิ่มรายการสินค้า หรือบวกจำนวนเข้ากับรายการเดิมในคำสั่งเดียว
+
+    bulk_create(update_conflicts=True) เขียนทับจำนวนแทนการบวก จึงเขียน SQL เอง
+    คืนราคาต่อหน่วยของรายการ (รายการเดิมอาจล็อกราคาไว้ต่างจากราคาปัจจุบัน)
+    """
+    qn = connection.ops.quote_name
+    table = qn(OrderItem._meta.db_table)
+    sql = (
+        f"INSERT INTO {table} ({qn('order_id')}, {qn('product_id')}, {qn('quantity')}, {qn('price')}) "
+        f"VALUES (%s, %s, %s, %s) "
+        f"ON CONFLICT ({qn('order_id')}, {qn('product_id')}) "
+        f"DO UPDATE SET {qn('quantity')} = {table}.{qn('quantity')} + EXCLUDED.{qn('quantity')} "
+        f"RETURNING {qn('price')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [order.pk, product.pk, quantity, product.price])
+        (price,) = cursor.fetchone()
+    return OrderItem._meta.get_field('price').to_python(price)
+
+
+def _add_line(user, product, quantity):
+    with transaction.atomic():
+        order = get_or_create_cart(user)
+        price = _upsert_line(order, product, quantity)
+        _adjust_total(order.pk, price * quantity)
+    return order
+
+
+def add_item(user, product, quantity=1):
+    """เพิ่มสินค้าลงตะกร้า"""
+    try:
+        order = _add_line(user, product, quantity)
+    except (CartClosed, IntegrityError):
+        # ตะกร้าเดิมเพิ่ง checkout ไป หรือถูก reap_idle_carts(delete=True) ลบระหว่างรอล็อก
+        # (ปกติ _adjust_total พบก่อน แต่ foreign key ของรายการใหม่ถูกตรวจตอน commit จึงอาจได้ IntegrityError)
+        # เพิ่มลงตะกร้าใบใหม่แทน
+        order = _add_line(user, product, quantity)
+    transaction.on_commit(lambda: invalidate_cart_count(user))
+    return order
+
+
+def _locked_line(user, item_id):
+    # ล็อกเฉพาะแถวของรายการ ทุกเส้นทางจึงล็อกรายการก่อนคำสั่งซื้อเสมอ (ไม่เกิด deadlock)
+    return (
+        OrderItem.objects.select_for_update(of=('self',))
+        .filter(pk=item_id, order__user=user, order__status='pending')
+        .only('id', 'order_id', 'price', 'quantity')
+        .first()
+    )
+
+
+def change_item_quantity(user, item_id, delta):
+    """เพิ่ม/ลดจำนวนของรายการในตะกร้า
+
+    คืนจำนวนใหม่ (0 เมื่อลดจนหมดแล้วรายการถูกลบ) หรือ None ถ้าไม่พบรายการ
+    """
+    try:
+        with transaction.atomic():
+            item = _locked_line(user, item_id)
+            if item is None:
+                return None
+            if item.quantity + delta < 1:
+                OrderItem.objects.filter(pk=item.pk).delete()
+                delta = -item.quantity
+            else:
+                OrderItem.objects.filter(pk=item.pk).update(quantity=F('quantity') + delta)
+            _adjust_total(item.order_id, item.price * delta)
+            transaction.on_commit(lambda: invalidate_cart_count(user))
+    except CartClosed:
+        return None
+    return item.quantity + delta
+
+
+def remove_item(user, item_id):
+    """ลบรายการออกจากตะกร้า คืน False ถ้าไม่พบรายการ (เช่นถูกลบไปแล้วจากการกดซ้ำ)"""
+    try:
+        with transaction.atomic():
+            item = _locked_line(user, item_id)
+            if item is None:
+                return False
+            OrderItem.objects.filter(pk=item.pk).delete()
+            _adjust_total(item.order_id, -item.price * item.quantity)
+            transaction.on_commit(lambda: invalidate_cart_count(user))
+    except CartClosed:
+        return False
+    return True
+
+
+def _reap_batch(order_ids, cutoff, delete):
+    with transaction.atomic():
+        # ข้ามตะกร้าที่กำลังถูกแก้ไขหรือ checkout อยู่ (รอบถัดไปจะตรวจใหม่) จึงไม่รอล็อกของคำขอผู้ใช้
+        # ล็อกรายการก่อนคำสั่งซื้อตามลำดับเดียวกับ _locked_line
+        lines = OrderItem.objects.filter(order_id__in=order_ids)
+        locked = set(lines.select_for_update(skip_locked=True).values_list('pk', flat=True))
+        busy = {order_id for pk, order_id in lines.values_list('pk', 'order_id') if pk not in locked}
+        carts = dict(
+            Order.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=order_ids, status='pending', updated_at__lt=cutoff)
+            .exclude(pk__in=busy)
+            .values_list('pk', 'user_id')
+        )
+        if not carts:
+            return 0
+        inventory.return_reserved(list(carts))
+        closed = Order.objects.filter(pk__in=list(carts))
+        if delete:
+            closed.delete()
+        else:
+            closed.update(status='cancelled', updated_at=timezone.now())
+        user_ids = list(carts.values())
+        transaction.on_commit(lambda: (
+            cache.delete_many([_cart_count_key(user_id) for user_id in user_ids]),
+            dashboard.invalidate_many(user_ids),
+        ))
+    return len(carts)
+
+
+def reap_idle_carts(idle_for, delete=False, now=None, batch_size=DEFAULT_BATCH_SIZE, pause=0):
+    """ปิดตะกร้าที่ไม่ถูกแก้ไขนานกว่า idle_for ทีละชุด คืนจำนวนตะกร้าที่ถูกปิด
+
+    ตะกร้าถูกเปลี่ยนเป็น 'cancelled' (หรือลบทิ้งเมื่อ delete=True) และคืนสต็อกที่จองไว้
+    """
+    cutoff = (now or timezone.now()) - idle_for
+    reaped = 0
+    last_id = 0
+    while True:
+        order_ids = list(
+            Order.objects.filter(status='pending', updated_at__lt=cutoff, pk__gt=last_id)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not order_ids:
+            break
+        reaped += _reap_batch(order_ids, cutoff, delete)
+        last_id = order_ids[-1]
+        if len(order_ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return reaped
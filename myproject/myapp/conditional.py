@@ -0,0 +1,95 @@
+# myapp/conditional.py
+"""
+Conditional GET (ETag/Last-Modified) สำหรับหน้าแคตตาล็อกและคอนเทนต์
+
+validator ของแต่ละหน้าคำนวณจากข้อมูลที่ถูกมาก (updated_at หนึ่งคอลัมน์, hash ของแถวเล็ก ๆ
+หรือเลขเวอร์ชันใน myapp/cache_versions.py) ก่อนที่ view จะ query และ render จริง
+ถ้าเบราว์เซอร์มีหน้าเดิมอยู่แล้วจะได้ 304 โดยไม่ต้อง render
+
+ทุกหน้ามีส่วนที่ขึ้นกับผู้ใช้ (ชื่อผู้ใช้และ badge ตะกร้าใน base.html) ETag จึงรวม
+ผู้ใช้และจำนวนสินค้าในตะกร้าเสมอ ส่วน Last-Modified ส่งให้เฉพาะผู้ใช้ที่ไม่ได้ล็อกอิน
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from . import cache_versions
+from .cart import get_cart_count
+
+
+def page_fingerprint(request):
+    """ส่วนของหน้าที่ขึ้นกับผู้ใช้"""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}:cart:{get_cart_count(request.user)}"
+    return 'anonymous'
+
+
+def _has_pending_messages(request):
+    # len() โหลดข้อความโดยไม่ทำเครื่องหมายว่าแสดงแล้ว (ต่างจากการวนอ่าน)
+    return len(messages.get_messages(request)) > 0
+
+
+def _validator(request, func, args, kwargs):
+    # condition() เรียก etag_func และ last_modified_func แยกกัน จึงจำผลไว้ใน request
+    if not hasattr(request, '_page_validator'):
+        value = None
+        if request.method in ('GET', 'HEAD') and not _has_pending_messages(request):
+            value = func(request, *args, **kwargs)
+        request._page_validator = value
+    return request._page_validator
+
+
+def conditional_page(func):
+    """decorator ของ view: func(request, *args, **kwargs) คืนค่าที่เปลี่ยนเมื่อเนื้อหาเปลี่ยน
+
+    คืน datetime (ใช้เป็น Last-Modified ด้วย), สตริงใด ๆ หรือ None เพื่อข้าม conditional GET
+    """
+    def etag_func(request, *args, **kwargs):
+        value = _validator(request, func, args, kwargs)
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        raw = '|'.join((
+            getattr(settings, 'RELEASE', ''),
+            request.get_full_path(),
+            str(value),
+            page_fingerprint(request),
+        ))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified_func(request, *args, **kwargs):
+        value = _validator(request, func, args, kwargs)
+        if isinstance(value, datetime) and not request.user.is_authenticated:
+            return value
+        return None
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header('ETag'):
+                # เนื้อหาขึ้นกับผู้ใช้: ห้ามพร็อกซีเก็บ และให้เบราว์เซอร์ตรวจ ETag ทุกครั้ง
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def version_validator(scope):
+    """validator ของหน้ารายการ: เลขเวอร์ชันของหมวด (ไม่ต้อง query)"""
+    def validator(request, *args, **kwargs):
+        return f"{scope}:{cache_versions.get_version(scope)}"
+    return validator
+
+
+def content_hash(*rows):
+    """hash ของแถวข้อมูล (เช่นผลของ values_list) สำหรับโมเดลที่ไม่มี updated_at"""
+    return hashlib.md5(repr(rows).encode()).hexdigest()
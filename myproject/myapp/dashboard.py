@@ -0,0 +1,97 @@
+# myapp/dashboard.py
+"""
+ข้อมูลของหน้าแดชบอร์ดผู้ใช้ (snapshot)
+
+รวบรวมข้อมูลทั้งหมดที่ dashboard.html ใช้ด้วยจำนวน query น้อยที่สุด แล้วเก็บใน cache ต่อผู้ใช้
+snapshot ถูกล้างโดย signals เมื่อ Order, Subscription, ExercisePlan, MealPlan หรือ UserProfile
+ของผู้ใช้เปลี่ยน และสร้างใหม่เมื่อขึ้นวันใหม่ (วันฝึก/มื้ออาหารของวันนี้เปลี่ยน)
+"""
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import (
+    Content, DailyMeal, ExercisePlan, MealPlan, Order, Subscription, UserProfile, WorkoutDay,
+)
+
+DASHBOARD_TIMEOUT = 60 * 10
+
+# หมวดบทความแนะนำตามเป้าหมายของแผนออกกำลังกาย
+GOAL_CATEGORIES = {
+    'weight_loss': 'weight_loss',
+    'fat_loss': 'weight_loss',
+    'muscle_gain': 'muscle_building',
+    'endurance': 'cardio',
+    'general_fitness': 'general'
+}
+
+
+def _key(user_id):
+    return f"dashboard:{user_id}"
+
+
+def build_snapshot(user, today=None):
+    today = today or timezone.localdate()
+    # วันในสัปดาห์ (1-7) เพราะ weekday() เริ่มที่ 0 (วันจันทร์)
+    today_weekday = today.weekday() + 1
+
+    user_profile = UserProfile.objects.filter(user=user).first()
+    active_subscription = (
+        Subscription.objects.filter(user=user, status='active', end_date__gte=today)
+        .select_related('plan')
+        .first()
+    )
+    recent_orders = list(Order.objects.filter(user=user).order_by('-created_at')[:5])
+    exercise_plan = ExercisePlan.objects.filter(user=user).order_by('-created_at').first()
+    meal_plan = MealPlan.objects.filter(user=user).order_by('-created_at').first()
+
+    today_workout = None
+    if exercise_plan:
+        today_workout = (
+            WorkoutDay.objects.filter(exercise_plan=exercise_plan, day_number=today_weekday)
+            .annotate(exercise_count=Count('exercises'))
+            .first()
+        )
+
+    today_meal = None
+    if meal_plan:
+        today_meal = (
+            DailyMeal.objects.filter(meal_plan=meal_plan, day_number=today_weekday)
+            .annotate(item_count=Count('meal_items'))
+            .first()
+        )
+
+    articles = Content.objects.filter(is_published=True)
+    if exercise_plan:
+        articles = articles.filter(category=GOAL_CATEGORIES.get(exercise_plan.goal, 'general'))
+    recommended_articles = list(articles.order_by('-published_at')[:3])
+
+    return {
+        'date': today,
+        'user_profile': user_profile,
+        'active_subscription': active_subscription,
+        'recent_orders': recent_orders,
+        'exercise_plan': exercise_plan,
+        'today_workout': today_workout,
+        'meal_plan': meal_plan,
+        'today_meal': today_meal,
+        'recommended_articles': recommended_articles,
+    }
+
+
+def get_snapshot(user):
+    """snapshot ของวันนี้จาก cache (สร้างใหม่เมื่อไม่มีหรือเป็นของวันก่อน)"""
+    today = timezone.localdate()
+    snapshot = cache.get(_key(user.pk))
+    if snapshot is None or snapshot['date'] != today:
+        snapshot = build_snapshot(user, today)
+        cache.set(_key(user.pk), snapshot, DASHBOARD_TIMEOUT)
+    return snapshot
+
+
+def invalidate(user_id):
+    cache.delete(_key(user_id))
+
+
+def invalidate_many(user_ids):
+    cache.delete_many([_key(user_id) for user_id in user_ids])
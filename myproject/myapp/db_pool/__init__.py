@@ -0,0 +1,7 @@
+# myapp/db_pool/__init__.py
+"""
+Database backend PostgreSQL ที่ยืมการเชื่อมต่อจากพูลใน process แทนการเปิดใหม่ทุกคำขอ
+
+เปิดใช้ด้วย DJANGO_DB_POOL=1 (ดู DATABASES ใน settings.py) ค่าของพูลอยู่ใน DATABASES['default']['POOL']
+ดูรายละเอียดของพูลใน myapp/db_pool/pool.py
+"""
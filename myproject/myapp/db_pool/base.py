@@ -0,0 +1,52 @@
+# myapp/db_pool/base.py
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgresCreation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from .pool import close_pools, get_pool
+
+
+class DatabaseCreation(PostgresCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # การเชื่อมต่อที่ว่างอยู่ในพูลทำให้ DROP DATABASE ไม่ผ่าน
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend ที่ close() คืนการเชื่อมต่อเข้าพูลแทนการปิดจริง
+
+    ใช้คู่กับ CONN_MAX_AGE = 0 การเชื่อมต่อจึงกลับเข้าพูลเมื่อจบทุกคำขอ
+    """
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        params = self.get_connection_params()
+        key = (self.alias,) + tuple(sorted((name, repr(value)) for name, value in params.items()))
+        return get_pool(key, self.settings_dict.get('POOL', {}))
+
+    def get_new_connection(self, conn_params):
+        parent = super()
+        connection = self.pool.acquire(lambda: parent.get_new_connection(conn_params))
+        # get_new_connection() เดิมกำหนด isolation_level ตอนสร้างการเชื่อมต่อ
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = IsolationLevel(options.get('isolation_level', IsolationLevel.READ_COMMITTED))
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        if self.in_atomic_block:
+            # ปิดกลางบล็อก atomic: Django ยังอ้างถึงการเชื่อมต่อนี้อยู่ จึงห้ามคืนให้คนอื่นใช้
+            self.pool.discard(connection)
+            return
+        try:
+            if not connection.closed and not connection.autocommit:
+                connection.rollback()
+        except self.Database.Error:
+            self.pool.discard(connection)
+        else:
+            self.pool.release(connection)
@@ -0,0 +1,234 @@
+# myapp/db_pool/pool.py
+"""
+พูลการเชื่อมต่อฐานข้อมูลภายใน process (ใช้โดย backend myapp.db_pool)
+
+จำนวนการเชื่อมต่อสูงสุดต่อ process คือ MAX_SIZE ถ้าเต็ม thread ที่ขอจะรอได้นานสุด TIMEOUT วินาที
+แล้วได้ PoolTimeout การเชื่อมต่อที่ว่างนานกว่า CHECK_AFTER วินาทีจะถูกตรวจด้วย SELECT 1
+ก่อนนำกลับมาใช้ และถูกปิดเมื่ออายุเกิน MAX_LIFETIME หรือว่างเกิน MAX_IDLE
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+
+DEFAULTS = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 5.0,
+    'CHECK_AFTER': 30.0,
+    'MAX_IDLE': 300.0,
+    'MAX_LIFETIME': 3600.0,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+_listeners = []
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """รอการเชื่อมต่อจากพูลนานเกิน TIMEOUT (Django แปลงเป็น django.db.OperationalError)"""
+
+
+def add_listener(callback):
+    """callback(wait_seconds) ถูกเรียกทุกครั้งที่ยืมการเชื่อมต่อ (เช่นเพื่อบันทึกเวลารอของคำขอ)"""
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+class ConnectionPool:
+
+    def __init__(self, max_size, timeout, check_after, max_idle, max_lifetime):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, เวลาที่คืนเข้าพูล)
+        self._born = {}  # connection -> เวลาที่สร้าง
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._counters = {
+            'acquired': 0, 'created': 0, 'discarded': 0, 'waited': 0, 'timeouts': 0,
+            'wait_ms_total': 0.0, 'wait_ms_max': 0.0, 'peak_in_use': 0,
+        }
+
+    def acquire(self, connect):
+        """ยืมการเชื่อมต่อ; connect() สร้างการเชื่อมต่อใหม่เมื่อพูลยังไม่เต็ม"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            connection, idle_for = self._reserve(deadline)
+            if connection is None:
+                # ได้โควตาสร้างการเชื่อมต่อใหม่
+                try:
+                    connection = connect()
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._born[connection] = time.monotonic()
+                    self._counters['created'] += 1
+                break
+            if idle_for < self.check_after or self._is_healthy(connection):
+                break
+            self._discard(connection, in_use=True)
+
+        wait = time.monotonic() - started
+        with self._cond:
+            counters = self._counters
+            counters['acquired'] += 1
+            counters['wait_ms_total'] += wait * 1000
+            counters['wait_ms_max'] = max(counters['wait_ms_max'], wait * 1000)
+        for listener in _listeners:
+            listener(wait)
+        return connection
+
+    def _reserve(self, deadline):
+        # คืน (การเชื่อมต่อที่ว่าง, เวลาที่ว่างอยู่) หรือ (None, 0) เมื่อได้สิทธิ์สร้างใหม่
+        # (นับ size/in_use ไว้แล้วทั้งสองกรณี)
+        with self._cond:
+            waited = False
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    connection, released = self._idle.pop()  # LIFO: ใช้ตัวที่เพิ่งคืนมา
+                    if now - self._born[connection] > self.max_lifetime or connection.closed:
+                        self._close(connection)
+                        continue
+                    self._checkout()
+                    return connection, now - released
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._checkout()
+                    return None, 0.0
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"ไม่มีการเชื่อมต่อว่างในพูลภายใน {self.timeout:g} วินาที "
+                        f"(ใช้อยู่ {self._in_use}/{self.max_size})"
+                    )
+                if not waited:
+                    waited = True
+                    self._counters['waited'] += 1
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _checkout(self):
+        self._in_use += 1
+        self._counters['peak_in_use'] = max(self._counters['peak_in_use'], self._in_use)
+
+    def _is_healthy(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except psycopg2.Error:
+            return False
+
+    def release(self, connection):
+        """คืนการเชื่อมต่อ (ต้องไม่อยู่ใน transaction)"""
+        now = time.monotonic()
+        with self._cond:
+            if connection.closed or now - self._born.get(connection, now) > self.max_lifetime:
+                self._close(connection)
+                self._in_use -= 1
+            else:
+                self._in_use -= 1
+                self._idle.append((connection, now))
+                self._shrink(now)
+            self._cond.notify()
+
+    def discard(self, connection):
+        """ปิดการเชื่อมต่อที่ยืมไปแทนการคืน (เช่นเสียระหว่าง transaction)"""
+        self._discard(connection, in_use=True)
+
+    def _discard(self, connection, in_use):
+        with self._cond:
+            self._close(connection)
+            if in_use:
+                self._in_use -= 1
+            self._cond.notify()
+
+    def _close(self, connection):
+        # เรียกขณะถือ lock
+        self._born.pop(connection, None)
+        self._size -= 1
+        self._counters['discarded'] += 1
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    def _shrink(self, now):
+        # ปิดการเชื่อมต่อที่ว่างนานเกิน MAX_IDLE (อยู่ท้ายคิวฝั่งซ้าย)
+        while self._idle and now - self._idle[0][1] > self.max_idle:
+            connection, _ = self._idle.popleft()
+            self._close(connection)
+
+    def close_idle(self):
+        with self._cond:
+            while self._idle:
+                connection, _ = self._idle.popleft()
+                self._close(connection)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._counters)
+            stats.update({
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'saturation': round(self._in_use / self.max_size, 3),
+            })
+        stats['wait_ms_total'] = round(stats['wait_ms_total'], 2)
+        stats['wait_ms_max'] = round(stats['wait_ms_max'], 2)
+        return stats
+
+
+def get_pool(key, options):
+    """พูลของ key (alias + ค่าการเชื่อมต่อ) ใน process นี้
+
+    process ที่ fork มา (เช่น worker ของ gunicorn) ได้พูลใหม่ของตัวเอง
+    """
+    key = (os.getpid(),) + key
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                config = {**DEFAULTS, **options}
+                pool = _pools[key] = ConnectionPool(
+                    max_size=int(config['MAX_SIZE']),
+                    timeout=float(config['TIMEOUT']),
+                    check_after=float(config['CHECK_AFTER']),
+                    max_idle=float(config['MAX_IDLE']),
+                    max_lifetime=float(config['MAX_LIFETIME']),
+                )
+    return pool
+
+
+def all_stats():
+    """สถิติของทุกพูลใน process นี้ {alias: stats}"""
+    pid = os.getpid()
+    return {key[1]: pool.stats() for key, pool in list(_pools.items()) if key[0] == pid}
+
+
+def close_pools():
+    """ปิดการเชื่อมต่อที่ว่างของทุกพูล (เช่น ก่อน fork หรือก่อนลบฐานข้อมูลทดสอบ)"""
+    pid = os.getpid()
+    for key, pool in list(_pools.items()):
+        # การเชื่อมต่อของ process แม่ต้องไม่ถูกปิดจาก process ลูก
+        if key[0] == pid:
+            pool.close_idle()
@@ -0,0 +1,99 @@
+# myapp/entitlements.py
+"""
+สิทธิ์การใช้งานของสมาชิก (subscription + ข้อมูลส่วนตัว)
+
+get_entitlement() อ่านสถานะครั้งเดียวต่อคำขอ (เก็บไว้ที่ request.entitlement) และเก็บใน cache
+ต่อผู้ใช้ไม่เกินเวลาที่ subscription หมดอายุ signals ของ Subscription/UserProfile จะล้าง cache
+ส่วน view ที่ต้องเป็นสมาชิกใช้ decorator subscription_required
+"""
+from functools import wraps
+
+from django.contrib import messages
+from django.core.cache import cache
+from django.shortcuts import redirect
+from django.utils import timezone
+
+from .models import Subscription, UserProfile
+
+ENTITLEMENT_TIMEOUT = 60 * 60
+
+
+class Entitlement:
+    def __init__(self, subscription=None, profile=None):
+        self.subscription = subscription
+        self.profile = profile
+
+    @property
+    def is_active(self):
+        # ตรวจ end_date ทุกครั้ง เผื่อ subscription หมดอายุระหว่างที่ค่ายังอยู่ใน cache
+        return self.subscription is not None and self.subscription.end_date > timezone.now()
+
+    @property
+    def has_profile(self):
+        return self.profile is not None and self.profile.has_completed_profile
+
+
+def _key(user_id):
+    return f"entitlement:{user_id}"
+
+
+def load_entitlement(user):
+    now = timezone.now()
+    subscription = (
+        Subscription.objects.filter(user=user, status='active', end_date__gt=now)
+        .select_related('plan')
+        .order_by('-end_date')
+        .first()
+    )
+    profile = UserProfile.objects.filter(user=user).first()
+    return Entitlement(subscription, profile)
+
+
+def get_user_entitlement(user):
+    key = _key(user.pk)
+    entitlement = cache.get(key)
+    if entitlement is None:
+        entitlement = load_entitlement(user)
+        timeout = ENTITLEMENT_TIMEOUT
+        if entitlement.subscription is not None:
+            remaining = (entitlement.subscription.end_date - timezone.now()).total_seconds()
+            timeout = max(1, min(timeout, int(remaining)))
+        cache.set(key, entitlement, timeout)
+    return entitlement
+
+
+def get_entitlement(request):
+    """สิทธิ์ของผู้ใช้ในคำขอนี้ (อ่านครั้งเดียวแล้วเก็บไว้ที่ request.entitlement)"""
+    if not hasattr(request, 'entitlement'):
+        request.entitlement = get_user_entitlement(request.user)
+    return request.entitlement
+
+
+def invalidate(user_id):
+    cache.delete(_key(user_id))
+
+
+def invalidate_many(user_ids):
+    cache.delete_many([_key(user_id) for user_id in user_ids])
+
+
+def subscription_required(view_func=None, *, profile_message=None):
+    """ให้เข้าได้เฉพาะสมาชิกที่ยังไม่หมดอายุ (ใช้ต่อจาก login_required)
+
+    ถ้าระบุ profile_message ผู้ใช้ต้องกรอกข้อมูลส่วนตัวครบแล้วด้วย
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            entitlement = get_entitlement(request)
+            if not entitlement.is_active:
+                return redirect('subscription_list')
+            if profile_message and not entitlement.has_profile:
+                messages.warning(request, profile_message)
+                return redirect('profile_setup')
+            return func(request, *args, **kwargs)
+        return wrapper
+
+    if view_func is not None:
+        return decorator(view_func)
+    return decorator
@@ -0,0 +1,62 @@
+# myapp/exercise_catalog.py
+"""
+ดัชนีท่าออกกำลังกายในหน่วยความจำ
+
+การสร้างแผนออกกำลังกายเคยสุ่มท่าด้วย order_by('?') ทีละกลุ่มกล้ามเนื้อทีละวัน
+ตอนนี้โหลด id ของท่าทั้งหมดครั้งเดียวต่อ process แล้วจัดกลุ่มตาม
+(muscle_group, difficulty, equipment_required) เพื่อสุ่มใน Python
+
+เมื่อ Exercise เปลี่ยน signals จะเปลี่ยนเวอร์ชันของหมวด 'exercise_catalog' (myapp/cache_versions.py)
+process ที่ใช้ cache กลางเดียวกัน (Redis ในโหมด production) จึงรู้ว่าต้องโหลดใหม่
+"""
+import threading
+
+from . import cache_versions
+
+VERSION_SCOPE = 'exercise_catalog'
+
+_lock = threading.Lock()
+_catalog = None
+
+
+class ExerciseCatalog:
+    def __init__(self, rows, version=None):
+        self.version = version
+        self._index = {}
+        for exercise_id, muscle_group, difficulty, equipment in rows:
+            self._index.setdefault((muscle_group, difficulty, equipment), []).append(exercise_id)
+
+    def __len__(self):
+        return sum(len(ids) for ids in self._index.values())
+
+    def ids(self, muscle_groups=None, difficulties=(), equipment=False):
+        """id ของท่าที่ตรงเงื่อนไข (muscle_groups=None คือทุกกลุ่ม) เรียงตามลำดับคงที่"""
+        result = []
+        for (muscle_group, difficulty, has_equipment), ids in sorted(self._index.items()):
+            if muscle_groups is not None and muscle_group not in muscle_groups:
+                continue
+            if difficulty in difficulties and has_equipment == equipment:
+                result.extend(ids)
+        return result
+
+
+def get_catalog():
+    """ดัชนีปัจจุบัน (query ฐานข้อมูลเฉพาะครั้งแรกหรือหลังถูก invalidate)"""
+    global _catalog
+    from .models import Exercise
+
+    version = cache_versions.get_version(VERSION_SCOPE)
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+    with _lock:
+        if _catalog is None or _catalog.version != version:
+            rows = Exercise.objects.order_by('id').values_list(
+                'id', 'muscle_group', 'difficulty', 'equipment_required'
+            )
+            _catalog = ExerciseCatalog(rows, version)
+        return _catalog
+
+
+def invalidate():
+    cache_versions.invalidate(VERSION_SCOPE)
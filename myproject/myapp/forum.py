@@ -0,0 +1,100 @@
+# myapp/forum.py
+"""
+ตัวนับของเว็บบอร์ด
+
+ForumThread.reply_count และ last_reply_at ถูกปรับทีละรายการเมื่อมีการสร้าง/ลบ ForumReply
+(ผ่าน signals) แทนการ annotate(Count('replies')) ทุกครั้งที่เปิดหน้า community_forum
+รายการกระทู้ยอดนิยมจึงอ่านจากดัชนี forumthread_popular_idx ได้โดยตรง และเก็บไว้ใน cache
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import ForumReply, ForumThread, ForumTopic
+
+POPULAR_THREADS_KEY = 'forum:popular_threads'
+POPULAR_THREADS_LIMIT = 5
+POPULAR_THREADS_TIMEOUT = 60 * 5
+
+
+def get_popular_threads():
+    threads = cache.get(POPULAR_THREADS_KEY)
+    if threads is None:
+        threads = list(
+            ForumThread.objects.select_related('author')
+            .order_by('-reply_count', '-id')[:POPULAR_THREADS_LIMIT]
+        )
+        cache.set(POPULAR_THREADS_KEY, threads, POPULAR_THREADS_TIMEOUT)
+    return threads
+
+
+def invalidate_popular_threads():
+    cache.delete(POPULAR_THREADS_KEY)
+
+
+def reply_added(reply):
+    """นับคำตอบใหม่ และขยับ last_activity ของหมวดหมู่"""
+    ForumThread.objects.filter(pk=reply.thread_id).update(
+        reply_count=F('reply_count') + 1,
+        last_reply_at=reply.created_at,
+    )
+    ForumTopic.objects.filter(threads=reply.thread_id).update(last_activity=reply.created_at)
+    transaction.on_commit(invalidate_popular_threads)
+
+
+def _latest_reply(thread_ref='pk'):
+    return Subquery(
+        ForumReply.objects.filter(thread=OuterRef(thread_ref))
+        .order_by('-created_at')
+        .values('created_at')[:1]
+    )
+
+
+def reply_removed(reply):
+    """ลดตัวนับ และหา last_reply_at ใหม่จากคำตอบที่เหลือ"""
+    ForumThread.objects.filter(pk=reply.thread_id, reply_count__gt=0).update(
+        reply_count=F('reply_count') - 1,
+        last_reply_at=_latest_reply(),
+    )
+    transaction.on_commit(invalidate_popular_threads)
+
+
+def rebuild_counters(thread_ids=None):
+    """คำนวณ reply_count / last_reply_at ใหม่จากตาราง ForumReply ด้วย UPDATE เดียว
+
+    thread_ids จำกัดเฉพาะบางกระทู้ (ใช้แบ่ง batch) คืนจำนวนกระทู้ที่อัปเดต
+    """
+    counts = (
+        ForumReply.objects.filter(thread=OuterRef('pk'))
+        .order_by()
+        .values('thread')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    threads = ForumThread.objects.all()
+    if thread_ids is not None:
+        threads = threads.filter(pk__in=thread_ids)
+    with transaction.atomic():
+        updated = threads.update(
+            reply_count=Coalesce(Subquery(counts), 0),
+            last_reply_at=_latest_reply(),
+        )
+        transaction.on_commit(invalidate_popular_threads)
+    return updated
+
+
+def rebuild_topic_activity():
+    """ขยับ ForumTopic.last_activity ให้ไม่เก่ากว่าคำตอบล่าสุดในหมวดหมู่"""
+    latest = (
+        ForumThread.objects.filter(topic=OuterRef('pk'))
+        .order_by()
+        .values('topic')
+        .annotate(latest=Max('last_reply_at'))
+        .values('latest')
+    )
+    return (
+        ForumTopic.objects.annotate(latest_reply=Subquery(latest))
+        .filter(latest_reply__gt=F('last_activity'))
+        .update(last_activity=Subquery(latest))
+    )
@@ -1,4 +1,5 @@
 # helpers.py
+import random
 from itertools import cycle
 
 def distribute_training_days(days_per_week):
@@ -22,94 +23,67 @@ def distribute_training_days(days_per_week):
     
     return list(range(1, days_per_week + 1))  # เริ่มจากวันจันทร์
 
-def create_workout_exercises(workout_day, exercise_plan, primary_muscle=None):
-    """สร้างรายการออกกำลังกายให้กับวันนั้นๆ"""
-    from .models import Exercise, WorkoutExercise  # นำเข้าโมเดลที่เกี่ยวข้อง
-    
-    # ดึงท่าที่เหมาะสมตามระดับความสามารถ
-    difficulty = exercise_plan.level
-    
-    # จำนวนท่าต่อวัน ขึ้นอยู่กับระดับความสามารถ
-    if difficulty == 'beginner':
-        exercises_per_day = 5
-    elif difficulty == 'intermediate':
-        exercises_per_day = 7
-    else:  # advanced
-        exercises_per_day = 9
-    
-    # จำนวนเซ็ตต่อท่า ขึ้นอยู่กับระดับความสามารถ
-    if difficulty == 'beginner':
-        sets = 3
-        reps = "8-10"
-        rest_time = 60
-    elif difficulty == 'intermediate':
-        sets = 4
-        reps = "10-12"
-        rest_time = 45
-    else:  # advanced
-        sets = 5
-        reps = "8-12"
-        rest_time = 30
-    
-    # ดึงท่าออกกำลังกายตามกล้ามเนื้อที่ต้องการเน้น
+# จำนวนท่าต่อวัน, เซ็ต, จำนวนครั้ง, เวลาพัก ตามระดับความสามารถ
+LEVEL_SETTINGS = {
+    'beginner': (5, 3, "8-10", 60),
+    'intermediate': (7, 4, "10-12", 45),
+    'advanced': (9, 5, "8-12", 30),
+}
+FULL_BODY_GROUPS = ['chest', 'back', 'shoulders', 'arms', 'legs', 'core']
+UPPER_BODY_GROUPS = ['chest', 'back', 'shoulders', 'arms']
+LOWER_BODY_GROUPS = ['legs', 'core']
+
+
+def pick_exercise_ids(catalog, focus, difficulty, equipment, primary_muscle=None, rng=random):
+    """สุ่ม id ของท่าออกกำลังกายสำหรับหนึ่งวันจาก ExerciseCatalog"""
+    exercises_per_day = LEVEL_SETTINGS.get(difficulty, LEVEL_SETTINGS['advanced'])[0]
+    difficulties = [difficulty, 'beginner'] if difficulty != 'beginner' else ['beginner']
+
+    def sample(muscle_groups, k, exclude=()):
+        pool = [i for i in catalog.ids(muscle_groups, difficulties, equipment) if i not in exclude]
+        return rng.sample(pool, min(k, len(pool)))
+
     if primary_muscle:
         # กรณี Push/Pull/Legs
-        exercises = Exercise.objects.filter(
-            muscle_group=primary_muscle,
-            difficulty__in=[difficulty, 'beginner'] if difficulty != 'beginner' else ['beginner'],
-            equipment_required=exercise_plan.available_equipment
-        ).order_by('?')[:exercises_per_day]
-    elif workout_day.focus == 'upper_body':
-        # กรณีฝึกส่วนบน
-        exercises = Exercise.objects.filter(
-            muscle_group__in=['chest', 'back', 'shoulders', 'arms'],
-            difficulty__in=[difficulty, 'beginner'] if difficulty != 'beginner' else ['beginner'],
-            equipment_required=exercise_plan.available_equipment
-        ).order_by('?')[:exercises_per_day]
-    elif workout_day.focus == 'lower_body':
-        # กรณีฝึกส่วนล่าง
-        exercises = Exercise.objects.filter(
-            muscle_group__in=['legs', 'core'],
-            difficulty__in=[difficulty, 'beginner'] if difficulty != 'beginner' else ['beginner'],
-            equipment_required=exercise_plan.available_equipment
-        ).order_by('?')[:exercises_per_day]
-    else:
-        # กรณีฝึกทั้งร่างกาย
-        # สร้างรายการท่าที่ครอบคลุมทุกส่วนของร่างกาย
-        muscle_groups = ['chest', 'back', 'shoulders', 'arms', 'legs', 'core']
-        exercises = []
-        
-        # เลือกท่าจากแต่ละกลุ่มกล้ามเนื้อ
-        for i, muscle_group in enumerate(muscle_groups):
-            if i >= exercises_per_day:
-                break
-                
-            exercise = Exercise.objects.filter(
-                muscle_group=muscle_group,
-                difficulty__in=[difficulty, 'beginner'] if difficulty != 'beginner' else ['beginner'],
-                equipment_required=exercise_plan.available_equipment
-            ).order_by('?').first()
-            
-            if exercise:
-                exercises.append(exercise)
-        
-        # เพิ่มท่าออกกำลังกายจนครบตามจำนวน
-        remaining = exercises_per_day - len(exercises)
-        if remaining > 0:
-            additional_exercises = Exercise.objects.filter(
-                difficulty__in=[difficulty, 'beginner'] if difficulty != 'beginner' else ['beginner'],
-                equipment_required=exercise_plan.available_equipment
-            ).exclude(id__in=[e.id for e in exercises]).order_by('?')[:remaining]
-            
-            exercises.extend(additional_exercises)
-    
-    # สร้างรายการออกกำลังกาย
-    for i, exercise in enumerate(exercises):
-        WorkoutExercise.objects.create(
+        return sample([primary_muscle], exercises_per_day)
+    if focus == 'upper_body':
+        return sample(UPPER_BODY_GROUPS, exercises_per_day)
+    if focus == 'lower_body':
+        return sample(LOWER_BODY_GROUPS, exercises_per_day)
+
+    # กรณีฝึกทั้งร่างกาย: เลือกท่าจากแต่ละกลุ่มกล้ามเนื้อ แล้วเติมจนครบตามจำนวน
+    chosen = []
+    for muscle_group in FULL_BODY_GROUPS[:exercises_per_day]:
+        chosen.extend(sample([muscle_group], 1))
+    remaining = exercises_per_day - len(chosen)
+    if remaining > 0:
+        chosen.extend(sample(None, remaining, exclude=set(chosen)))
+    return chosen
+
+
+def build_workout_exercises(workout_day, exercise_plan, primary_muscle=None, catalog=None, rng=random):
+    """สร้าง WorkoutExercise (ยังไม่บันทึก) ให้กับวันนั้นๆ"""
+    from .exercise_catalog import get_catalog
+    from .models import WorkoutExercise
+
+    difficulty = exercise_plan.level
+    _, sets, reps, rest_time = LEVEL_SETTINGS.get(difficulty, LEVEL_SETTINGS['advanced'])
+    exercise_ids = pick_exercise_ids(
+        catalog or get_catalog(),
+        workout_day.focus,
+        difficulty,
+        exercise_plan.available_equipment,
+        primary_muscle=primary_muscle,
+        rng=rng,
+    )
+    return [
+        WorkoutExercise(
             workout_day=workout_day,
-            exercise=exercise,
+            exercise_id=exercise_id,
             sets=sets,
             reps=reps,
             rest_time=rest_time,
             order=i + 1
-        )
\ No newline at end of file
+        )
+        for i, exercise_id in enumerate(exercise_ids)
+    ]
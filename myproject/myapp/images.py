@@ -0,0 +1,162 @@
+# myapp/images.py
+"""
+รูปย่อหลายขนาด (WebP/JPEG) สำหรับรูปที่ผู้ใช้อัปโหลด
+
+หลังบันทึกโมเดลที่มีรูปใหม่ signal จะเพิ่มงาน 'generate_image_variants' เข้าคิว
+(myapp/jobs.py) worker จึงย่อรูปด้วย Pillow นอกคำขอ ไฟล์ที่ได้ตั้งชื่อตาม hash ของเนื้อหา
+รูปต้นฉบับ (variants/<hash>/<width>w.<ext>) ชื่อจึงไม่เปลี่ยนและรูปซ้ำกันใช้ไฟล์ชุดเดียว
+
+ข้อมูลของรูปย่อ (manifest) เก็บเป็นไฟล์ JSON คู่กับรูปและใน cache เพื่อให้ template tag
+responsive_image สร้าง srcset ได้โดยไม่ต้องเปิดรูป ถ้ายังไม่มี manifest จะใช้รูปต้นฉบับไปก่อน
+"""
+import hashlib
+import json
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+VARIANT_FORMATS = (
+    # (นามสกุล, รูปแบบของ Pillow, content type, options)
+    ('webp', 'WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+VARIANT_ROOT = 'variants'
+MANIFEST_CACHE_TIMEOUT = 60 * 60 * 24
+MISSING_CACHE_TIMEOUT = 60
+
+# ฟิลด์รูปที่มีรูปย่อ: (app_label.Model, ชื่อฟิลด์)
+IMAGE_FIELDS = (
+    ('myapp.Product', 'image'),
+    ('myapp.Article', 'image'),
+    ('myapp.Recipe', 'image'),
+    ('myapp.Content', 'image'),
+    ('myapp.Video', 'thumbnail'),
+)
+
+
+def _manifest_name(name):
+    return f"{VARIANT_ROOT}/manifests/{hashlib.sha1(name.encode()).hexdigest()}.json"
+
+
+def _cache_key(name):
+    return f"image_variants:{hashlib.sha1(name.encode()).hexdigest()}"
+
+
+def _read_manifest(name):
+    try:
+        with default_storage.open(_manifest_name(name)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def get_manifest(name):
+    """manifest ของรูป name (ชื่อไฟล์ใน storage) หรือ None ถ้ายังไม่ได้สร้างรูปย่อ"""
+    if not name:
+        return None
+    key = _cache_key(name)
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest = _read_manifest(name)
+        if manifest is None:
+            # แคชค่าว่างไว้ช่วงสั้น ๆ กันการเปิดไฟล์ซ้ำทุกครั้งที่ render ระหว่างรอ worker
+            cache.set(key, {}, MISSING_CACHE_TIMEOUT)
+            return None
+        cache.set(key, manifest, MANIFEST_CACHE_TIMEOUT)
+    return manifest or None
+
+
+def get_manifests(names):
+    """เหมือน get_manifest สำหรับหลายรูป คืน {name: manifest หรือ None}
+
+    อ่าน cache ด้วย get_many ครั้งเดียว และเขียนผลของรูปที่ไม่อยู่ใน cache ด้วย set_many
+    """
+    keys = {_cache_key(name): name for name in names if name}
+    found = cache.get_many(keys)
+    manifests = {keys[key]: manifest or None for key, manifest in found.items()}
+    loaded, missing = {}, {}
+    for key, name in keys.items():
+        if key in found:
+            continue
+        manifest = _read_manifest(name)
+        manifests[name] = manifest
+        if manifest is None:
+            missing[key] = {}
+        else:
+            loaded[key] = manifest
+    if loaded:
+        cache.set_many(loaded, MANIFEST_CACHE_TIMEOUT)
+    if missing:
+        cache.set_many(missing, MISSING_CACHE_TIMEOUT)
+    return manifests
+
+
+def has_variants(name):
+    return get_manifest(name) is not None
+
+
+def _encode(image, width, fmt, options):
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.LANCZOS)
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        # JPEG ไม่มีช่องโปร่งใส: วางบนพื้นขาวแทนพื้นดำ
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(name):
+    """สร้างรูปย่อทุกขนาด/รูปแบบของรูป name แล้วคืน manifest
+
+    ข้ามขนาดที่ใหญ่กว่ารูปต้นฉบับ (ไม่ขยายรูป) และไม่เขียนไฟล์ที่มีอยู่แล้วซ้ำ
+    """
+    with default_storage.open(name) as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()[:20]
+
+    with Image.open(BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ('RGB', 'RGBA'):
+            transparent = 'A' in image.getbands() or 'transparency' in source.info
+            image = image.convert('RGBA' if transparent else 'RGB')
+        image.load()
+
+    widths = [w for w in VARIANT_WIDTHS if w < image.width]
+    # รูปที่เล็กกว่าขนาดใหญ่สุด: เพิ่มขนาดจริงเมื่อต่างจากขนาดก่อนหน้าพอสมควร
+    if not widths or (image.width < VARIANT_WIDTHS[-1] and image.width > widths[-1] * 1.2):
+        widths.append(image.width)
+
+    variants = {}
+    for ext, fmt, content_type, options in VARIANT_FORMATS:
+        entries = []
+        for width in widths:
+            path = f"{VARIANT_ROOT}/{digest[:2]}/{digest}/{width}w.{ext}"
+            if not default_storage.exists(path):
+                default_storage.save(path, ContentFile(_encode(image, width, fmt, options)))
+            entries.append([width, default_storage.url(path)])
+        variants[content_type] = entries
+
+    manifest = {
+        'hash': digest,
+        'width': image.width,
+        'height': image.height,
+        'variants': variants,
+    }
+    manifest_name = _manifest_name(name)
+    if default_storage.exists(manifest_name):
+        default_storage.delete(manifest_name)
+    default_storage.save(manifest_name, ContentFile(json.dumps(manifest).encode()))
+    cache.set(_cache_key(name), manifest, MANIFEST_CACHE_TIMEOUT)
+    return manifest
+
+
+def srcset(entries):
+    return ', '.join(f"{url} {width}w" for width, url in entries)
@@ -0,0 +1,183 @@
+# myapp/inventory.py
+"""
+สต็อกสินค้าและการจองสต็อกตอน checkout
+
+สต็อกของทุกรายการในตะกร้าถูกตัดด้วย UPDATE แบบมีเงื่อนไข (stock = stock - n WHERE stock >= n)
+คำสั่งเดียวภายใน transaction เดียว ถ้าสินค้าใดไม่พอ ทั้ง transaction ถูก rollback จึงไม่ขายเกินสต็อก
+แถวสินค้าถูกล็อกเรียงตาม id ก่อนเสมอ (ไม่เกิด deadlock) และถือล็อกเฉพาะสินค้าในตะกร้าช่วง transaction สั้น ๆ
+
+หน้า checkout จองสต็อกของตะกร้าไว้ RESERVATION_TTL (StockReservation) การยืนยันสั่งซื้อใช้สต็อกที่จองไว้
+ถ้าตะกร้าถูกแก้ไขหลังจอง จะปรับเฉพาะส่วนต่าง การจองที่หมดเวลา (ตะกร้าที่ถูกทิ้ง) คืนสต็อกด้วย
+release_expired_reservations ซึ่ง worker ของคิวงาน (run_jobs) รันทุกนาที (หรือสั่งเองด้วยคำสั่ง release_reservations)
+
+ลำดับการล็อก: คำสั่งซื้อ -> สินค้า (เรียงตาม id)
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from . import cache_versions
+from .models import Order, OrderItem, Product, StockReservation
+
+RESERVATION_TTL = timedelta(minutes=15)
+DEFAULT_BATCH_SIZE = 500
+
+
+class OutOfStock(Exception):
+    """สินค้าในตะกร้ามีสต็อกไม่พอ (ไม่มีสินค้าใดถูกตัดสต็อก)"""
+
+    def __init__(self, product_name):
+        self.product_name = product_name
+        super().__init__(f"สินค้า {product_name} มีไม่พอ")
+
+
+def _stock_changed():
+    # .update() ไม่ส่ง signal: เพิ่มเวอร์ชันของหมวดสินค้าเอง (หน้ารายการและ cache ของ API)
+    transaction.on_commit(lambda: cache_versions.invalidate('products'))
+
+
+def _apply(changes, names):
+    """ปรับสต็อกตาม changes {product_id: +คืน / -ตัด} ด้วย query จำนวนคงที่ไม่ว่าตะกร้าจะมีกี่รายการ"""
+    changes = {product_id: delta for product_id, delta in changes.items() if delta}
+    if not changes:
+        return
+    # ล็อกแถวสินค้าเรียงตาม id ก่อน (ลำดับเดียวกันทุก transaction จึงไม่เกิด deadlock)
+    stock = dict(
+        Product.objects.select_for_update().filter(pk__in=changes).order_by('pk').values_list('pk', 'stock')
+    )
+    for product_id in sorted(changes):
+        if stock.get(product_id, 0) + changes[product_id] < 0:
+            raise OutOfStock(names.get(product_id, product_id))
+
+    condition = Q()
+    for product_id, delta in changes.items():
+        condition |= Q(pk=product_id, stock__gte=-delta) if delta < 0 else Q(pk=product_id)
+    updated = Product.objects.filter(condition).update(
+        stock=F('stock') + Case(
+            *[When(pk=product_id, then=Value(delta)) for product_id, delta in changes.items()],
+            output_field=IntegerField(),
+        ),
+        # updated_at เป็น validator ของหน้าสินค้า (ETag) จึงต้องขยับตามสต็อก
+        updated_at=timezone.now(),
+    )
+    if updated != len(changes):
+        raise OutOfStock(names.get(min(changes), min(changes)))
+    _stock_changed()
+
+
+def _lock_cart(order_id):
+    return Order.objects.select_for_update().filter(pk=order_id, status='pending').first()
+
+
+def _cart_lines(order_id):
+    rows = list(OrderItem.objects.filter(order_id=order_id).values_list('product_id', 'quantity', 'product__name'))
+    return {product_id: quantity for product_id, quantity, _ in rows}, {product_id: name for product_id, _, name in rows}
+
+
+def _held(order_id):
+    return dict(StockReservation.objects.filter(order_id=order_id).values_list('product_id', 'quantity'))
+
+
+def _difference(held, wanted):
+    return {
+        product_id: held.get(product_id, 0) - wanted.get(product_id, 0)
+        for product_id in held.keys() | wanted.keys()
+    }
+
+
+def reserve(order_id):
+    """จองสต็อกของทุกรายการในตะกร้า (หรือต่อเวลาการจองเดิม) คืนเวลาหมดอายุของการจอง
+
+    คืน None ถ้าไม่มีตะกร้าหรือตะกร้าว่าง raise OutOfStock ถ้าสินค้าบางรายการไม่พอ
+    """
+    with transaction.atomic():
+        if _lock_cart(order_id) is None:
+            return None
+        wanted, names = _cart_lines(order_id)
+        held = _held(order_id)
+        expires_at = timezone.now() + RESERVATION_TTL
+        if held == wanted:
+            StockReservation.objects.filter(order_id=order_id).update(expires_at=expires_at)
+        else:
+            _apply(_difference(held, wanted), names)
+            StockReservation.objects.filter(order_id=order_id).delete()
+            StockReservation.objects.bulk_create([
+                StockReservation(order_id=order_id, product_id=product_id, quantity=quantity, expires_at=expires_at)
+                for product_id, quantity in wanted.items()
+            ])
+    return expires_at if wanted else None
+
+
+def place_order(order_id):
+    """ยืนยันคำสั่งซื้อ: ใช้สต็อกที่จองไว้ (ตัด/คืนเฉพาะส่วนต่างกับตะกร้า) แล้วเปลี่ยนสถานะเป็น 'paid'
+
+    คืนคำสั่งซื้อ หรือ None ถ้าไม่มีตะกร้าที่รอชำระหรือตะกร้าว่าง raise OutOfStock ถ้าสินค้าไม่พอ
+    """
+    with transaction.atomic():
+        order = _lock_cart(order_id)
+        if order is None:
+            return None
+        wanted, names = _cart_lines(order_id)
+        if not wanted:
+            return None
+        held = _held(order_id)
+        if held != wanted:
+            _apply(_difference(held, wanted), names)
+        if held:
+            StockReservation.objects.filter(order_id=order_id).delete()
+        order.status = 'paid'
+        order.save()
+    return order
+
+
+def release(order_id, expired_before=None):
+    """คืนสต็อกที่คำสั่งซื้อจองไว้ คืน True ถ้ามีการจองถูกยกเลิก
+
+    expired_before: คืนเฉพาะเมื่อการจองหมดเวลาก่อนเวลานี้ (ข้ามตะกร้าที่เพิ่งต่อเวลา)
+    """
+    with transaction.atomic():
+        if not Order.objects.select_for_update().filter(pk=order_id).exists():
+            return False
+        expiry = list(StockReservation.objects.filter(order_id=order_id).values_list('expires_at', flat=True))
+        if not expiry:
+            return False
+        if expired_before is not None and any(expires_at >= expired_before for expires_at in expiry):
+            return False
+        return_reserved([order_id])
+    return True
+
+
+def return_reserved(order_ids):
+    """คืนสต็อกที่คำสั่งซื้อเหล่านี้จองไว้ทั้งหมดด้วย UPDATE เดียว (ผู้เรียกต้องล็อกคำสั่งซื้อไว้แล้ว)"""
+    reserved = StockReservation.objects.filter(order_id__in=order_ids)
+    totals = defaultdict(int)
+    for product_id, quantity in reserved.values_list('product_id', 'quantity'):
+        totals[product_id] += quantity
+    _apply(totals, {})
+    reserved.delete()
+
+
+def release_expired_reservations(now=None, batch_size=DEFAULT_BATCH_SIZE, pause=0):
+    """คืนสต็อกของการจองที่หมดเวลาแล้ว (ตะกร้าที่ถูกทิ้ง) ทีละชุด คืนจำนวนคำสั่งซื้อที่ถูกคืนสต็อก"""
+    now = now or timezone.now()
+    released = 0
+    last_id = 0
+    while True:
+        order_ids = list(
+            StockReservation.objects.filter(expires_at__lt=now, order_id__gt=last_id)
+            .order_by('order_id').values_list('order_id', flat=True).distinct()[:batch_size]
+        )
+        if not order_ids:
+            break
+        # แต่ละคำสั่งซื้อเป็น transaction สั้น ๆ ของตัวเอง ไม่ถือล็อกสินค้าข้ามตะกร้า
+        released += sum(release(order_id, expired_before=now) for order_id in order_ids)
+        last_id = order_ids[-1]
+        if len(order_ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return released
@@ -0,0 +1,212 @@
+# myapp/jobs.py
+"""
+คิวงานเบื้องหลังบนตาราง Job ของ PostgreSQL (ไม่ต้องมี broker ภายนอก)
+
+view เรียก enqueue() แล้วตอบกลับทันที ส่วน worker (คำสั่ง run_jobs) ดึงงานด้วย
+SELECT ... FOR UPDATE SKIP LOCKED: แต่ละ worker ล็อกแถวงานของตัวเองไว้ตลอดการทำงาน
+worker อื่นจึงข้ามไปหยิบงานถัดไปได้ทันทีโดยไม่ต้องรอกัน ถ้า worker ตายกลางคัน
+transaction จะ rollback และงานกลับไปอยู่ในคิวเอง
+
+ตัวจัดการงานลงทะเบียนด้วย @task('ชื่องาน') (ดู myapp/tasks.py) และรับ payload เป็น
+keyword arguments ค่าที่คืนต้องแปลงเป็น JSON ได้ งานที่ error จะถูกลองใหม่แบบ backoff
+จนครบ max_attempts แล้วจึงเป็น 'failed'
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+
+from . import cart, inventory
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF = 5  # วินาที เพิ่มเป็นสองเท่าทุกครั้งที่ลองใหม่
+PURGE_INTERVAL = 60 * 60
+# การจองสต็อกหมดอายุใน 15 นาที (inventory.RESERVATION_TTL) ตรวจบ่อยกว่านั้นมาก
+RESERVATION_SWEEP_INTERVAL = 60
+CART_REAP_INTERVAL = 60 * 60
+
+_registry = {}
+
+
+def task(name):
+    """ลงทะเบียนฟังก์ชันเป็นตัวจัดการงานชนิด name"""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, user=None, max_attempts=3, delay=0, **payload):
+    """เพิ่มงานเข้าคิว คืน Job ที่สร้าง
+
+    worker จะเห็นงานหลัง transaction ของผู้เรียก commit แล้วเท่านั้น
+    ถ้าตั้ง JOBS_EAGER ไว้ (เช่นตอนพัฒนาโดยไม่มี worker) งานจะถูกรันใน process นี้หลัง commit
+    """
+    if kind not in _registry:
+        raise LookupError(f"unknown job kind {kind!r}")
+    job = Job.objects.create(
+        kind=kind,
+        user=user,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+    if getattr(settings, 'JOBS_EAGER', False):
+        transaction.on_commit(lambda: run_job(job.pk))
+    return job
+
+
+def enqueue_once(kind, user=None, **payload):
+    """เหมือน enqueue แต่คืนงานเดิมถ้ามีงานชนิดและ payload เดียวกันรออยู่หรือกำลังทำ
+
+    (งานที่ worker กำลังทำยังเป็น 'queued' จนกว่าจะจบ) การบันทึกซ้ำจึงไม่เพิ่มงานซ้อน
+    """
+    existing = Job.objects.filter(kind=kind, user=user, status='queued', payload=payload).first()
+    return existing or enqueue(kind, user=user, **payload)
+
+
+def has_pending(user, kind):
+    """ผู้ใช้มีงานชนิด kind ที่ยังรออยู่ในคิวหรือไม่"""
+    return Job.objects.filter(user=user, kind=kind, status='queued').exists()
+
+
+def _execute(job, worker):
+    now = timezone.now()
+    job.attempts += 1
+    handler = _registry.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"unknown job kind {job.kind!r}")
+        # savepoint: error ของตัวจัดการไม่ทำให้ transaction ที่ล็อกงานไว้เสีย
+        with transaction.atomic():
+            result = handler(**job.payload)
+    except Exception as exc:
+        logger.exception("job %s (%s) failed on %s", job.pk, job.kind, worker)
+        job.last_error = ''.join(traceback.format_exception_only(type(exc), exc)).strip()
+        if job.attempts < job.max_attempts:
+            job.run_after = now + timedelta(seconds=RETRY_BACKOFF * 2 ** (job.attempts - 1))
+        else:
+            job.status = 'failed'
+            job.finished_at = now
+    else:
+        job.status = 'done'
+        job.result = result
+        job.last_error = ''
+        job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'attempts', 'run_after', 'result', 'last_error', 'finished_at'])
+
+
+def run_next(worker=''):
+    """ทำงานที่ถึงเวลาแล้วหนึ่งงาน คืน Job ที่ทำ หรือ None ถ้าคิวว่าง"""
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', run_after__lte=timezone.now())
+            .order_by('run_after', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        _execute(job, worker)
+    return job
+
+
+def run_job(pk, worker='eager'):
+    """ทำงานที่ระบุทันที (ข้ามถ้าถูก worker อื่นหยิบไปแล้วหรือไม่ได้รออยู่)"""
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(pk=pk, status='queued')
+            .first()
+        )
+        if job is None:
+            return None
+        _execute(job, worker)
+    return job
+
+
+def purge_finished(days=None):
+    """ลบงานที่จบแล้ว (สำเร็จ/ล้มเหลว) ที่เก่ากว่า days วัน"""
+    days = days if days is not None else getattr(settings, 'JOBS_RETENTION_DAYS', 7)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(
+        status__in=('done', 'failed'), finished_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def reap_idle_carts():
+    """ยกเลิกตะกร้าที่ไม่มีการแก้ไขนานกว่า CART_IDLE_DAYS วัน"""
+    return cart.reap_idle_carts(timedelta(days=getattr(settings, 'CART_IDLE_DAYS', 30)))
+
+
+PERIODIC_TASKS = (
+    ('purge finished jobs', PURGE_INTERVAL, purge_finished),
+    ('release expired stock reservations', RESERVATION_SWEEP_INTERVAL, inventory.release_expired_reservations),
+    ('cancel idle carts', CART_REAP_INTERVAL, reap_idle_carts),
+)
+
+
+class Worker:
+    """วนดึงงานจากคิวจนกว่าจะถูก stop()
+
+    once=True: ออกเมื่อคิวว่าง, max_jobs: ออกเมื่อทำครบจำนวน
+    """
+
+    def __init__(self, name=None, poll_interval=1.0, once=False, max_jobs=None):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.once = once
+        self.max_jobs = max_jobs
+        self.processed = 0
+        self._stopped = threading.Event()
+        self._last_run = {}
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run_periodic(self):
+        # งานดูแลระบบที่ทุก worker รันตามรอบ (ทำซ้ำพร้อมกันหลาย process ได้อย่างปลอดภัย)
+        now = timezone.now()
+        for name, interval, func in PERIODIC_TASKS:
+            last = self._last_run.get(name)
+            if last is None or (now - last).total_seconds() >= interval:
+                self._last_run[name] = now
+                try:
+                    done = func()
+                except DatabaseError:
+                    raise
+                except Exception:
+                    # งานรอบที่ error ไม่หยุด worker ทั้งตัว จะลองใหม่ในรอบถัดไป
+                    logger.exception("periodic task %r failed on %s", name, self.name)
+                    continue
+                if done:
+                    logger.info("%s: %s", name, done)
+
+    def run(self):
+        while not self._stopped.is_set():
+            if self.max_jobs is not None and self.processed >= self.max_jobs:
+                break
+            try:
+                self._run_periodic()
+                job = run_next(self.name)
+            except DatabaseError:
+                # การเชื่อมต่อหลุด (เช่นฐานข้อมูลรีสตาร์ท) ทิ้งการเชื่อมต่อเดิมแล้วลองใหม่รอบถัดไป
+                logger.exception("job worker %s lost its database connection", self.name)
+                close_old_connections()
+                job = None
+            if job is not None:
+                self.processed += 1
+                continue
+            if self.once:
+                break
+            self._stopped.wait(self.poll_interval)
+        return self.processed
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+
+from myapp import inventory, order_numbers
+from myapp.models import Order, OrderItem, Product
+from myapp.utils.benchmark import summarize
+
+SEED_PREFIX = 'bench checkout'
+
+
+def _naive_checkout(order_id):
+    # แบบเดิมที่แก้แบบตรงไปตรงมา: อ่านสต็อก ตรวจใน Python แล้วบันทึก (ไม่มีเงื่อนไขใน UPDATE)
+    with transaction.atomic():
+        order = Order.objects.get(pk=order_id, status='pending')
+        for item in order.items.select_related('product'):
+            product = item.product
+            if product.stock < item.quantity:
+                raise inventory.OutOfStock(product.name)
+            product.stock -= item.quantity
+            product.save(update_fields=['stock'])
+        order.status = 'paid'
+        order.save(update_fields=['status'])
+    return order
+
+
+def _reserve_then_place(order_id):
+    # เส้นทางของหน้าเว็บ: GET /checkout/ จองก่อน แล้ว POST ยืนยัน
+    inventory.reserve(order_id)
+    return inventory.place_order(order_id)
+
+
+MODES = [
+    ('naive read-check-write', _naive_checkout),
+    ('conditional update', inventory.place_order),
+    ('reserve + place', _reserve_then_place),
+]
+
+
+def _worker(barrier, order_ids, checkout, results):
+    try:
+        barrier.wait()
+        for order_id in order_ids:
+            start = time.perf_counter()
+            try:
+                outcome = 'sold' if checkout(order_id) else 'missing'
+            except inventory.OutOfStock:
+                outcome = 'sold out'
+            except DatabaseError:
+                # เช่น deadlock หรือ serialization failure
+                outcome = 'error'
+            results.append((outcome, (time.perf_counter() - start) * 1000))
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'จำลอง checkout พร้อมกันหลายร้อยคำสั่งซื้อบนสินค้าขายดีชิ้นเดียว เทียบการตัดสต็อกแต่ละแบบ'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkouts', type=int, default=300, help='จำนวนตะกร้าที่ checkout')
+        parser.add_argument('--concurrency', type=int, default=64,
+                            help='จำนวน thread (การเชื่อมต่อฐานข้อมูล) ที่ checkout พร้อมกัน')
+        parser.add_argument('--stock', type=int, default=100, help='สต็อกของสินค้าขายดี')
+        parser.add_argument('--cold', type=int, default=20,
+                            help='จำนวนสินค้าอื่นที่สุ่มใส่ตะกร้าคู่กับสินค้าขายดี (ทดสอบลำดับการล็อก)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['concurrency'] > options['checkouts']:
+            raise CommandError('--concurrency ต้องไม่เกิน --checkouts')
+        try:
+            self._run(options)
+        finally:
+            User.objects.filter(username__startswith=SEED_PREFIX).delete()
+            Product.objects.filter(name__startswith=SEED_PREFIX).delete()
+
+    def _seed(self, options):
+        rng = random.Random(options['seed'])
+        half = options['cold'] // 2
+        # สินค้าขายดีอยู่กลางช่วง id ตะกร้าจึงมีทั้งสินค้าที่ id น้อยกว่าและมากกว่า
+        products = Product.objects.bulk_create([
+            Product(name=f"{SEED_PREFIX} cold {i}", description='-', price=100, stock=0)
+            for i in range(half)
+        ] + [Product(name=f"{SEED_PREFIX} hot", description='-', price=990, stock=0)] + [
+            Product(name=f"{SEED_PREFIX} cold {i}", description='-', price=100, stock=0)
+            for i in range(half, options['cold'])
+        ])
+        hot = products[half]
+        cold = [product for product in products if product.pk != hot.pk]
+        users = User.objects.bulk_create([
+            User(username=f"{SEED_PREFIX} {i}") for i in range(options['checkouts'])
+        ])
+        carts = [(user, rng.choice(cold) if cold else None) for user in users]
+        return hot, cold, carts
+
+    def _reset(self, hot, cold, carts, stock):
+        Order.objects.filter(user__username__startswith=SEED_PREFIX).delete()
+        Product.objects.filter(pk=hot.pk).update(stock=stock)
+        Product.objects.filter(pk__in=[product.pk for product in cold]).update(stock=len(carts))
+        orders = Order.objects.bulk_create(order_numbers.assign_many([
+            Order(user=user, total_amount=0) for user, _ in carts
+        ]))
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, price=product.price)
+            for order, (_, extra) in zip(orders, carts)
+            for product in ([hot, extra] if extra else [hot])
+        ])
+        return [order.pk for order in orders]
+
+    def _run(self, options):
+        hot, cold, carts = self._seed(options)
+        concurrency = options['concurrency']
+        self.stdout.write(
+            f"{len(carts)} checkout, {concurrency} thread พร้อมกัน, สต็อกสินค้าขายดี {options['stock']}"
+        )
+        for label, checkout in MODES:
+            order_ids = self._reset(hot, cold, carts, options['stock'])
+            results = []
+            barrier = threading.Barrier(concurrency)
+            threads = [
+                threading.Thread(target=_worker, args=(barrier, order_ids[i::concurrency], checkout, results))
+                for i in range(concurrency)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            outcomes = {}
+            for outcome, _ in results:
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            paid = Order.objects.filter(pk__in=order_ids, status='paid').count()
+            remaining = Product.objects.get(pk=hot.pk).stock
+            # ขายเกิน: จ่ายแล้วมากกว่าสต็อก, สต็อกหาย: สต็อกที่ลดไม่ตรงกับจำนวนที่ขาย (lost update)
+            oversold = max(0, paid - options['stock'])
+            lost = (options['stock'] - remaining) - paid
+            stats = summarize([sample for _, sample in results])
+            self.stdout.write(
+                f"{label:<24} {len(results) / elapsed:7.1f} checkout/s p50={stats['p50']:7.1f}ms "
+                f"p95={stats['p95']:7.1f}ms ขาย {paid} ชิ้น (ขายเกิน {oversold}, สต็อกไม่ตรง {lost}) "
+                f"เหลือ {remaining} {outcomes}"
+            )
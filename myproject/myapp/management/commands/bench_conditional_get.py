@@ -0,0 +1,106 @@
+import random
+import re
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from myapp.models import Product, Recipe, SubscriptionPlan
+
+# บรรทัดของ access log แบบ common/combined: ... "GET /path HTTP/1.1" 200 ...
+LOG_RE = re.compile(r'"GET (?P<path>\S+) HTTP/[\d.]+" (?P<status>\d{3})')
+
+
+def _paths_from_log(path):
+    with open(path, encoding='utf-8', errors='replace') as log:
+        for line in log:
+            match = LOG_RE.search(line)
+            if match and match.group('status') in ('200', '304'):
+                yield match.group('path')
+
+
+def _synthetic_paths(rng, count, logged_in=False):
+    """ลำดับคำขอจำลอง: หน้ารายการและหน้ารายละเอียดที่ถูกเปิดซ้ำแบบ long-tail"""
+    products = list(Product.objects.filter(is_active=True).values_list('id', flat=True)[:200])
+    plans = list(SubscriptionPlan.objects.values_list('id', flat=True)[:20])
+    # หน้าสูตรอาหารต้องล็อกอิน
+    recipes = list(Recipe.objects.values_list('id', flat=True)[:200]) if logged_in else []
+    pages = [reverse('product_list'), reverse('subscription_list'), reverse('content_list')]
+    pages += [reverse('product_detail', args=[pk]) for pk in products]
+    pages += [reverse('subscription_detail', args=[pk]) for pk in plans]
+    pages += [reverse('view_recipe', args=[pk]) for pk in recipes]
+    weights = [1 / (rank + 1) for rank in range(len(pages))]
+    return rng.choices(pages, weights=weights, k=count)
+
+
+def _replay(client, paths, revalidate):
+    """เล่นคำขอตามลำดับ; revalidate=True จำลองเบราว์เซอร์ที่ส่ง ETag/Last-Modified ที่เคยได้รับ"""
+    validators = {}
+    stats = {'requests': 0, 'bytes': 0, 'not_modified': 0}
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for path in paths:
+        headers = validators.get(path, {}) if revalidate else {}
+        response = client.get(path, **headers)
+        stats['requests'] += 1
+        stats['bytes'] += len(response.content)
+        if response.status_code == 304:
+            stats['not_modified'] += 1
+        elif response.status_code == 200:
+            saved = {}
+            if response.has_header('ETag'):
+                saved['HTTP_IF_NONE_MATCH'] = response['ETag']
+            if response.has_header('Last-Modified'):
+                saved['HTTP_IF_MODIFIED_SINCE'] = response['Last-Modified']
+            validators[path] = saved
+    stats['wall_ms'] = (time.perf_counter() - wall) * 1000
+    stats['cpu_ms'] = (time.process_time() - cpu) * 1000
+    return stats
+
+
+class Command(BaseCommand):
+    help = 'เล่น access log ซ้ำเพื่อวัด bandwidth และ CPU ที่ conditional GET ประหยัดได้'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help='ไฟล์ access log (รูปแบบ common/combined) ถ้าไม่ระบุจะสร้างลำดับคำขอจำลอง')
+        parser.add_argument('--requests', type=int, default=2000, help='จำนวนคำขอของลำดับจำลอง')
+        parser.add_argument('--username', help='เล่นคำขอในนามผู้ใช้นี้ (ค่าเริ่มต้น: ไม่ล็อกอิน)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['log']:
+            paths = list(_paths_from_log(options['log']))
+        else:
+            paths = _synthetic_paths(
+                random.Random(options['seed']), options['requests'], logged_in=bool(options['username'])
+            )
+        if not paths:
+            raise CommandError('ไม่พบคำขอ GET ที่จะเล่นซ้ำ')
+
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+        client = Client(HTTP_HOST=hosts[0] if hosts else 'localhost')
+        if options['username']:
+            try:
+                client.force_login(User.objects.get(username=options['username']))
+            except User.DoesNotExist:
+                raise CommandError(f"ไม่พบผู้ใช้ {options['username']}")
+
+        # รอบอุ่นเครื่อง ให้ cache ของแอปอยู่ในสภาพเดียวกันทั้งสองรอบที่วัด
+        _replay(client, paths[:50], revalidate=False)
+        baseline = _replay(client, paths, revalidate=False)
+        conditional = _replay(client, paths, revalidate=True)
+
+        self.stdout.write(f"คำขอทั้งหมด {len(paths)} รายการ ({len(set(paths))} path)")
+        for label, stats in (('full render', baseline), ('conditional GET', conditional)):
+            self.stdout.write(
+                f"{label:<16} bytes={stats['bytes']:>12,} 304={stats['not_modified']:>6} "
+                f"wall={stats['wall_ms']:9.1f}ms cpu={stats['cpu_ms']:9.1f}ms"
+            )
+        if baseline['bytes']:
+            self.stdout.write(
+                f"ประหยัด bandwidth {100 * (1 - conditional['bytes'] / baseline['bytes']):.1f}% "
+                f"CPU {100 * (1 - conditional['cpu_ms'] / baseline['cpu_ms']):.1f}%"
+            )
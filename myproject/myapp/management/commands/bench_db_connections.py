@@ -0,0 +1,115 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+from myapp.db_pool.pool import close_pools
+from myapp.utils.benchmark import summarize
+
+
+def _modes(pool_size, timeout):
+    """(ชื่อ, ค่าที่เปลี่ยนจาก DATABASES['default']) ของแต่ละวิธีจัดการการเชื่อมต่อ"""
+    return [
+        ('connect per request', {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 0}),
+        ('persistent (CONN_MAX_AGE)', {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 600}),
+        (f'pool (max {pool_size})', {
+            'ENGINE': 'myapp.db_pool', 'CONN_MAX_AGE': 0,
+            'POOL': {'MAX_SIZE': pool_size, 'TIMEOUT': timeout},
+        }),
+    ]
+
+
+class ConnectionMonitor(threading.Thread):
+    """นับการเชื่อมต่อที่เปิดอยู่บนฐานข้อมูล (pg_stat_activity) เป็นระยะ เก็บค่าสูงสุด"""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        connection = connections['default']
+        try:
+            while not self._stop_event.is_set():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT count(*) FROM pg_stat_activity "
+                        "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+                    )
+                    self.peak = max(self.peak, cursor.fetchone()[0])
+                self._stop_event.wait(self.interval)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Command(BaseCommand):
+    help = (
+        'วัดต้นทุนการเชื่อมต่อฐานข้อมูลต่อคำขอ: เปิดใหม่ทุกคำขอ, CONN_MAX_AGE และพูล (myapp.db_pool) '
+        'ใช้กับ service db ของ docker-compose (POSTGRES_HOST)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='จำนวนคำขอจำลองต่อวิธี')
+        parser.add_argument('--threads', type=int, default=16, help='จำนวน thread พร้อมกัน (เหมือน worker thread)')
+        parser.add_argument('--queries', type=int, default=3, help='จำนวน query ต่อคำขอ')
+        parser.add_argument('--pool-size', type=int, default=8)
+        parser.add_argument('--pool-timeout', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        base_settings = connections['default'].settings_dict
+        self.stdout.write(
+            f"{options['requests']} คำขอ, {options['threads']} thread, {options['queries']} query/คำขอ, "
+            f"db {base_settings['HOST']}:{base_settings['PORT']}"
+        )
+        for label, overrides in _modes(options['pool_size'], options['pool_timeout']):
+            settings_dict = {**base_settings, **overrides}
+            backend = load_backend(settings_dict['ENGINE'])
+
+            def worker(count):
+                # หนึ่ง thread = worker thread หนึ่งตัวของ server: ใช้ DatabaseWrapper ของตัวเอง
+                wrapper = backend.DatabaseWrapper(settings_dict, alias='bench')
+                samples = []
+                for _ in range(count):
+                    started = time.perf_counter()
+                    with wrapper.cursor() as cursor:
+                        for _ in range(options['queries']):
+                            cursor.execute('SELECT 1')
+                    # เหมือนสัญญาณ request_finished ตอนจบคำขอ
+                    wrapper.close_if_unusable_or_obsolete()
+                    samples.append((time.perf_counter() - started) * 1000)
+                wrapper.close()
+                return samples, wrapper
+
+            threads = options['threads']
+            per_thread = [options['requests'] // threads + (i < options['requests'] % threads) for i in range(threads)]
+            monitor = ConnectionMonitor()
+            monitor.start()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                results = list(executor.map(worker, per_thread))
+            elapsed = time.perf_counter() - started
+            monitor.stop()
+
+            samples = [sample for thread_samples, _ in results for sample in thread_samples]
+            stats = summarize(samples)
+            line = (
+                f"{label:<26} {len(samples) / elapsed:8.1f} req/s p50={stats['p50']:6.2f}ms "
+                f"p95={stats['p95']:6.2f}ms peak connections={monitor.peak}"
+            )
+            wrapper = results[0][1]
+            if hasattr(wrapper, 'pool'):
+                pool = wrapper.pool.stats()
+                line += (
+                    f" created={pool['created']} waited={pool['waited']} timeouts={pool['timeouts']} "
+                    f"wait max={pool['wait_ms_max']}ms"
+                )
+            self.stdout.write(line)
+        close_pools()
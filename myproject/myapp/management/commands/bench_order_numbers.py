@@ -0,0 +1,96 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from myapp import order_numbers
+from myapp.models import Order
+from myapp.utils.benchmark import summarize
+
+SEED_PREFIX = 'bench order numbers'
+
+
+def _legacy_create(user, index):
+    # แบบเดิม: INSERT ให้ได้ id ก่อน แล้ว UPDATE order_number อีกครั้ง
+    # (เลขพัสดุต้องกำหนดเอง ค่า default 'TEMP' เดิมชน unique ตั้งแต่คำสั่งซื้อที่สอง)
+    order = Order(user=user, total_amount=0, status='paid', tracking_number=f"{SEED_PREFIX}-{user.pk}-{index}")
+    Order.objects.bulk_create([order])
+    Order.objects.filter(pk=order.pk).update(order_number=order_numbers.order_number(order.pk))
+
+
+def _allocated_create(user, index):
+    Order.objects.create(user=user, total_amount=0, status='paid')
+
+
+MODES = [
+    ('insert + update', _legacy_create),
+    ('preallocated id', _allocated_create),
+]
+
+
+def _worker(barrier, user, count, create, samples):
+    try:
+        barrier.wait()
+        for index in range(count):
+            start = time.perf_counter()
+            create(user, index)
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'วัดจำนวนคำสั่งซื้อที่สร้างได้ต่อวินาที เทียบการตั้งหมายเลขแบบ save ซ้ำกับการจอง id ล่วงหน้า'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=5000, help='จำนวนคำสั่งซื้อต่อแบบ')
+        parser.add_argument('--concurrency', type=int, default=16, help='จำนวน thread ที่สร้างพร้อมกัน')
+        parser.add_argument('--block-size', type=int, default=order_numbers.BLOCK_SIZE,
+                            help='จำนวน id ที่จองจาก sequence ต่อครั้ง')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] > options['orders']:
+            raise CommandError('--concurrency ต้องไม่เกิน --orders')
+        order_numbers.BLOCK_SIZE = options['block_size']
+        users = User.objects.bulk_create([
+            User(username=f"{SEED_PREFIX} {i}") for i in range(options['concurrency'])
+        ])
+        try:
+            self._run(users, options)
+        finally:
+            User.objects.filter(username__startswith=SEED_PREFIX).delete()
+
+    def _run(self, users, options):
+        per_thread = options['orders'] // len(users)
+        self.stdout.write(
+            f"{per_thread * len(users)} คำสั่งซื้อต่อแบบ, {len(users)} thread พร้อมกัน, "
+            f"จอง id ครั้งละ {options['block_size']}"
+        )
+        # เฉพาะการจอง id (ไม่มี INSERT) ตัวจองจึงไม่ใช่คอขวดของการสร้างคำสั่งซื้อ
+        start = time.perf_counter()
+        for _ in range(options['orders']):
+            order_numbers.next_id()
+        self.stdout.write(f"{'allocator only':<16} {options['orders'] / (time.perf_counter() - start):8.0f} id/s")
+        for label, create in MODES:
+            samples = []
+            barrier = threading.Barrier(len(users))
+            threads = [
+                threading.Thread(target=_worker, args=(barrier, user, per_thread, create, samples))
+                for user in users
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            created = Order.objects.filter(user__in=users).count()
+            stats = summarize(samples)
+            self.stdout.write(
+                f"{label:<16} {len(samples) / elapsed:8.0f} คำสั่งซื้อ/s p50={stats['p50']:6.2f}ms "
+                f"p95={stats['p95']:6.2f}ms (สร้าง {created} รายการ)"
+            )
+            Order.objects.filter(user__in=users).delete()
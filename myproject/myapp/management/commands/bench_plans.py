@@ -0,0 +1,99 @@
+import random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from myapp.models import DailyMeal, Exercise, ExercisePlan, MealPlan, Recipe, WorkoutDay
+from myapp.plan_store import generate_meal_plan, generate_workout_plan
+from myapp.utils.benchmark import format_summary, time_call
+
+MUSCLE_GROUPS = ['chest', 'back', 'shoulders', 'arms', 'legs', 'core', 'full_body']
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner', 'snack']
+DIET_TYPES = ['any', 'vegetarian', 'vegan', 'low_carb', 'high_protein']
+
+
+def _seed_catalog(rng, exercises, recipes):
+    Exercise.objects.bulk_create([
+        Exercise(
+            name=f"bench exercise {i}", description='-', instructions='-',
+            muscle_group=rng.choice(MUSCLE_GROUPS), difficulty=rng.choice(DIFFICULTIES),
+            equipment_required=rng.random() < 0.5,
+        )
+        for i in range(exercises)
+    ])
+    Recipe.objects.bulk_create([
+        Recipe(
+            name=f"bench recipe {i}", description='-', instructions='-', prep_time=10, cook_time=10,
+            calories_per_serving=rng.randint(100, 900), protein=rng.uniform(2, 60),
+            carbs=rng.uniform(5, 120), fat=rng.uniform(1, 45),
+            meal_type=rng.choice(MEAL_TYPES), diet_type=rng.choice(DIET_TYPES),
+        )
+        for i in range(recipes)
+    ])
+
+
+def _legacy_delete(model, **filters):
+    # เส้นทางเดิม: .delete() ผ่าน collector ของ Django
+    model.objects.filter(**filters).delete()
+
+
+class Command(BaseCommand):
+    help = 'วัดเวลาสร้างแผนออกกำลังกาย/แผนอาหารใหม่ต่อแผน (ข้อมูลทดสอบถูก rollback)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plans', type=int, default=20, help='จำนวนแผนของแต่ละชนิด')
+        parser.add_argument('--repeat', type=int, default=5, help='จำนวนรอบการสร้างใหม่ต่อแผน')
+        parser.add_argument('--exercises', type=int, default=500)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            _seed_catalog(rng, options['exercises'], options['recipes'])
+            user = User.objects.create_user('bench_plans_user')
+            exercise_plans = [
+                ExercisePlan.objects.create(
+                    user=user, goal='general_fitness', level=rng.choice(DIFFICULTIES),
+                    days_per_week=rng.randint(3, 6),
+                    training_focus=rng.choice(['full_body', 'upper_lower', 'push_pull_legs']),
+                )
+                for _ in range(options['plans'])
+            ]
+            meal_plans = [
+                MealPlan.objects.create(user=user, goal='maintenance', meals_per_day=rng.randint(3, 6))
+                for _ in range(options['plans'])
+            ]
+            # สร้างครั้งแรกเพื่อให้ทุกรอบที่วัดเป็นการแทนที่แผนเดิม
+            for plan in exercise_plans:
+                generate_workout_plan(plan, rng)
+            for plan in meal_plans:
+                generate_meal_plan(plan, rng)
+
+            workout, meal, legacy_workout, legacy_meal = [], [], [], []
+            for _ in range(options['repeat']):
+                for plan in exercise_plans:
+                    workout.append(time_call(generate_workout_plan, plan, rng))
+                    legacy_workout.append(time_call(_legacy_delete, WorkoutDay, exercise_plan=plan))
+                    generate_workout_plan(plan, rng)
+                for plan in meal_plans:
+                    meal.append(time_call(generate_meal_plan, plan, rng))
+                    legacy_meal.append(time_call(_legacy_delete, DailyMeal, meal_plan=plan))
+                    generate_meal_plan(plan, rng)
+
+            with CaptureQueriesContext(connection) as workout_queries:
+                generate_workout_plan(exercise_plans[0], rng)
+            with CaptureQueriesContext(connection) as meal_queries:
+                generate_meal_plan(meal_plans[0], rng)
+
+            self.stdout.write(format_summary('regenerate workout plan', workout))
+            self.stdout.write(format_summary('  collector delete only', legacy_workout))
+            self.stdout.write(format_summary('regenerate meal plan', meal))
+            self.stdout.write(format_summary('  collector delete only', legacy_meal))
+            self.stdout.write(
+                f"queries per regeneration: workout={len(workout_queries)} meal={len(meal_queries)}"
+            )
+            transaction.set_rollback(True)
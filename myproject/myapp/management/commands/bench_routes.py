@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+
+from myapp import route_bench
+
+
+class Command(BaseCommand):
+    help = ('วัดจำนวน query และเวลาตอบของทุกหน้าใน myapp/urls.py แยกตามผู้ใช้ เทียบกับงบและ baseline '
+            '(ข้อมูลทดสอบถูก rollback)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20, help='จำนวนชุดข้อมูลที่หน้ารายการต้องแสดง')
+        parser.add_argument('--repeat', type=int, default=20, help='จำนวนคำขอต่อหน้าต่อผู้ใช้')
+        parser.add_argument('--baseline', default=str(Path(settings.BASE_DIR) / 'route_baseline.json'),
+                            help='ไฟล์ JSON ของผลครั้งก่อน')
+        parser.add_argument('--update-baseline', action='store_true', help='เขียนผลครั้งนี้ทับ baseline')
+        parser.add_argument('--metric', choices=['p50', 'p95', 'p99'], default='p50',
+                            help='ค่าที่ใช้เทียบกับ baseline (p95/p99 แกว่งมากเมื่อ repeat น้อย)')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='สัดส่วนที่ช้าลงได้จาก baseline ก่อนนับว่าถดถอย')
+        parser.add_argument('--slack-ms', type=float, default=2.0,
+                            help='เวลาที่ยอมให้ช้าลงเพิ่มจาก tolerance (กันหน้าเร็ว ๆ แกว่ง)')
+        parser.add_argument('--routes', nargs='*', help='วัดเฉพาะชื่อ route เหล่านี้ (รวมทุก variant)')
+
+    def handle(self, *args, **options):
+        routes = route_bench.ROUTES
+        if options['routes']:
+            routes = [route for route in routes if route.name in options['routes']]
+            if not routes:
+                raise CommandError('ไม่พบ route ที่ระบุ')
+
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+        client = Client(HTTP_HOST=hosts[0] if hosts else 'localhost')
+        results = {}
+        with transaction.atomic():
+            dataset = route_bench.seed_dataset(rows=options['rows'])
+            for route in routes:
+                for persona in route_bench.PERSONAS:
+                    # คำขอแรกตอน cache ว่างใช้นับ query ส่วนที่เหลือใช้วัดเวลา
+                    status, queries, samples = route_bench.measure(
+                        dataset, route, persona, repeat=options['repeat'] + 1, client=client,
+                    )
+                    results[f"{route.key}:{persona}"] = {
+                        'status': status, 'queries': queries, 'budget': route.budget(persona),
+                        **route_bench.summarize_samples(samples[1:] or samples),
+                    }
+            transaction.set_rollback(True)
+
+        baseline_path = Path(options['baseline'])
+        baseline = {}
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+
+        failures = []
+        for key, result in results.items():
+            previous = baseline.get(key)
+            notes = []
+            if result['status'] >= 500:
+                notes.append(f"HTTP {result['status']}")
+            if result['queries'] > result['budget']:
+                notes.append(f"query {result['queries']} เกินงบ {result['budget']}")
+            if previous:
+                if result['queries'] > previous['queries']:
+                    notes.append(f"query เพิ่มจาก {previous['queries']}")
+                metric = options['metric']
+                limit = previous[metric] * (1 + options['tolerance']) + options['slack_ms']
+                if result[metric] > limit:
+                    notes.append(f"{metric} ช้าลงจาก {previous[metric]:.2f}ms เป็น {result[metric]:.2f}ms")
+            failures.extend(f"{key}: {note}" for note in notes)
+            self.stdout.write(
+                f"{key:<44} {result['status']} query={result['queries']:>2}/{result['budget']:<2} "
+                f"p50={result['p50']:7.2f}ms p95={result['p95']:7.2f}ms p99={result['p99']:7.2f}ms"
+                + (f"  <- {', '.join(notes)}" if notes else '')
+            )
+
+        if options['update_baseline']:
+            baseline.update(results)
+            baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(f"บันทึก baseline {len(results)} รายการที่ {baseline_path}")
+        if failures:
+            raise CommandError(f"{len(failures)} หน้าเกินงบหรือถดถอย:\n" + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS(f"ทุกหน้า ({len(results)} รายการ) อยู่ในงบ"))
@@ -0,0 +1,78 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from myapp.models import Product
+from myapp.search import is_supported, search_products, search_vector_expression
+from myapp.utils.benchmark import format_summary, time_call
+
+WORDS = [
+    'ดัมเบล', 'บาร์เบล', 'เสื่อโยคะ', 'ลู่วิ่ง', 'จักรยาน', 'ยางยืด', 'ถุงมือ', 'เวย์โปรตีน',
+    'เครื่องชั่ง', 'นาฬิกา', 'สายรัด', 'เชือกกระโดด', 'ลูกบอล', 'ม้านั่ง', 'แผ่นน้ำหนัก',
+    'dumbbell', 'barbell', 'yoga', 'treadmill', 'bike', 'band', 'gloves', 'whey',
+    'scale', 'tracker', 'strap', 'rope', 'ball', 'bench', 'plate', 'kettlebell',
+]
+QUERIES = ['ดัมเบล', 'โยคะ', 'whey', 'เชือก', 'treadmill', 'ยางยืด', 'bench', 'kettle', 'นาฬิกา', 'ball']
+PAGE_SIZE = 24
+
+
+def _product(rng, index):
+    name = f"{' '.join(rng.choices(WORDS, k=3))} #{index}"
+    description = ' '.join(rng.choices(WORDS, k=40))
+    product = Product(
+        name=name,
+        description=description,
+        price=rng.randint(100, 20000),
+        stock=rng.randint(0, 100),
+        category=rng.choice(['เครื่องออกกำลังกาย', 'อุปกรณ์เสริม', 'อาหารเสริม']),
+    )
+    product.search_vector = search_vector_expression(product)
+    return product
+
+
+class Command(BaseCommand):
+    help = 'เปรียบเทียบ latency ของการค้นหา full-text กับ icontains ที่ขนาดแคตตาล็อกต่าง ๆ'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000',
+                            help='จำนวนสินค้าที่ต้องการทดสอบ คั่นด้วยจุลภาค')
+        parser.add_argument('--repeat', type=int, default=50, help='จำนวนคำค้นหาต่อขนาด')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help='ไม่ rollback ข้อมูลทดสอบ')
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError('benchmark นี้ต้องใช้ PostgreSQL')
+
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        rng = random.Random(options['seed'])
+        base = Product.objects.filter(is_active=True).order_by('-created_at')
+
+        with transaction.atomic():
+            created = Product.objects.count()
+            for size in sizes:
+                while created < size:
+                    batch = min(options['batch_size'], size - created)
+                    Product.objects.bulk_create(
+                        [_product(rng, created + i) for i in range(batch)]
+                    )
+                    created += batch
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE myapp_product')
+
+                self.stdout.write(f"\n== {size} products ==")
+                icontains, fulltext = [], []
+                for i in range(options['repeat']):
+                    term = QUERIES[i % len(QUERIES)]
+                    icontains.append(time_call(lambda: list(
+                        base.filter(Q(name__icontains=term) | Q(description__icontains=term))[:PAGE_SIZE]
+                    )))
+                    fulltext.append(time_call(lambda: list(search_products(base, term)[:PAGE_SIZE])))
+                self.stdout.write(format_summary('icontains', icontains))
+                self.stdout.write(format_summary('full-text (GIN)', fulltext))
+
+            if not options['keep']:
+                transaction.set_rollback(True)
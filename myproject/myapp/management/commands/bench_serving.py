@@ -0,0 +1,170 @@
+import http.client
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from myapp.models import Product
+from myapp.utils.benchmark import summarize
+
+SEED_PREFIX = 'bench serving product'
+HOST = '127.0.0.1'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def _server_commands(port, pidfile):
+    """(ชื่อ, คำสั่ง, env) ของแต่ละวิธีรัน เทียบกับ runserver ที่ใช้อยู่เดิม"""
+    python = sys.executable
+    gunicorn = [python, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'{HOST}:{port}', '--pid', pidfile]
+    # DJANGO_SERVER เหมือนที่ entrypoint.sh ตั้ง (settings_production ใช้เลือกค่า CONN_MAX_AGE)
+    return [
+        ('runserver', [python, 'manage.py', 'runserver', '--noreload', f'{HOST}:{port}'],
+         {'DJANGO_SERVER': 'runserver', 'DJANGO_SETTINGS_MODULE': 'myproject.settings'}),
+        ('gunicorn (WSGI)', gunicorn + ['myproject.wsgi:application'],
+         {'DJANGO_SERVER': 'gunicorn', 'DJANGO_SETTINGS_MODULE': 'myproject.settings_production'}),
+        ('gunicorn+uvicorn (ASGI)', gunicorn + ['-k', 'uvicorn.workers.UvicornWorker', 'myproject.asgi:application'],
+         {'DJANGO_SERVER': 'uvicorn', 'DJANGO_SETTINGS_MODULE': 'myproject.settings_production'}),
+    ]
+
+
+def _wait_ready(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f'server ออกก่อนพร้อมใช้งาน (exit {process.returncode})')
+        try:
+            conn = http.client.HTTPConnection(HOST, port, timeout=2)
+            conn.request('GET', '/', headers={'Host': 'localhost'})
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError('server ไม่พร้อมใช้งานภายในเวลาที่กำหนด')
+
+
+def _client(port, paths):
+    """ส่งคำขอตามลำดับผ่านการเชื่อมต่อ keep-alive เดียว คืน (เวลาแต่ละคำขอ ms, จำนวน error)"""
+    samples = []
+    errors = 0
+    conn = http.client.HTTPConnection(HOST, port, timeout=30)
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Host': 'localhost'})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors += 1
+            if response.will_close:
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+        samples.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    return samples, errors
+
+
+def _load(port, paths, concurrency):
+    chunks = [paths[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda chunk: _client(port, chunk), chunks))
+    elapsed = time.perf_counter() - start
+    samples = [sample for chunk_samples, _ in results for sample in chunk_samples]
+    return samples, sum(errors for _, errors in results), elapsed
+
+
+class Command(BaseCommand):
+    help = 'เทียบ throughput ของ runserver กับ gunicorn (WSGI) และ gunicorn+uvicorn (ASGI) บนข้อมูลสินค้าที่ seed ไว้'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='จำนวนคำขอต่อ server')
+        parser.add_argument('--concurrency', type=int, default=16, help='จำนวนไคลเอนต์พร้อมกัน')
+        parser.add_argument('--products', type=int, default=500,
+                            help='seed สินค้าให้มีอย่างน้อยเท่านี้ (ลบทิ้งหลังวัด)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='จำนวน worker ของ gunicorn (ค่าเริ่มต้นตาม gunicorn.conf.py)')
+
+    def _seed(self, count):
+        missing = count - Product.objects.filter(is_active=True).count()
+        if missing <= 0:
+            return 0
+        Product.objects.bulk_create([
+            Product(
+                name=f"{SEED_PREFIX} {i}", description='สินค้าสำหรับวัด throughput ' * 10,
+                price=100 + i % 900, stock=50, category='equipment',
+            )
+            for i in range(missing)
+        ], batch_size=1000)
+        return missing
+
+    def handle(self, *args, **options):
+        seeded = self._seed(options['products'])
+        try:
+            self._run(options)
+        finally:
+            if seeded:
+                Product.objects.filter(name__startswith=SEED_PREFIX).delete()
+
+    def _run(self, options):
+        product_ids = list(Product.objects.filter(is_active=True).values_list('id', flat=True)[:200])
+        pages = [reverse('home'), reverse('product_list'), reverse('subscription_list'), reverse('content_list')]
+        pages += [reverse('product_detail', args=[pk]) for pk in product_ids]
+        paths = [pages[i % len(pages)] for i in range(options['requests'])]
+
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SECRET_KEY', secrets.token_urlsafe(50))
+        env['DJANGO_ALLOWED_HOSTS'] = 'localhost,127.0.0.1'
+        env['GUNICORN_ACCESSLOG'] = ''
+        if options['workers']:
+            env['WEB_CONCURRENCY'] = str(options['workers'])
+
+        # settings_production ใช้ manifest storage: ต้องมีไฟล์ static ที่ collect แล้ว
+        subprocess.run(
+            [sys.executable, 'manage.py', 'collectstatic', '--noinput', '-v', '0'],
+            cwd=settings.BASE_DIR, env={**env, 'DJANGO_SETTINGS_MODULE': 'myproject.settings_production'},
+            check=True,
+        )
+
+        self.stdout.write(
+            f"{len(paths)} คำขอต่อ server, ไคลเอนต์พร้อมกัน {options['concurrency']}, "
+            f"{len(pages)} path, CPU {os.cpu_count()} core"
+        )
+        baseline = None
+        with tempfile.TemporaryDirectory() as tmp:
+            port = _free_port()
+            for label, command, server_env in _server_commands(port, os.path.join(tmp, 'gunicorn.pid')):
+                process = subprocess.Popen(
+                    command, cwd=settings.BASE_DIR,
+                    env={**env, **server_env},
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                try:
+                    _wait_ready(port, process)
+                    _load(port, paths[:100], options['concurrency'])  # อุ่นเครื่อง (cache, template)
+                    samples, errors, elapsed = _load(port, paths, options['concurrency'])
+                finally:
+                    process.terminate()
+                    process.wait(timeout=30)
+
+                throughput = len(samples) / elapsed
+                baseline = baseline or throughput
+                stats = summarize(samples)
+                self.stdout.write(
+                    f"{label:<24} {throughput:8.1f} req/s (x{throughput / baseline:4.2f}) "
+                    f"p50={stats['p50']:7.1f}ms p95={stats['p95']:7.1f}ms error={errors}"
+                )
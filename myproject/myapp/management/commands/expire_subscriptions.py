@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapp.subscriptions import DEFAULT_BATCH_SIZE, expire_due_subscriptions
+
+
+class Command(BaseCommand):
+    help = 'เปลี่ยนสถานะ subscription ที่เลย end_date แล้วเป็น expired (ทีละชุด)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='จำนวนชุดสูงสุดต่อรอบ (ค่าเริ่มต้น: จนหมด)')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='เวลาพักระหว่างชุด (วินาที) เพื่อลดภาระฐานข้อมูล')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='รันซ้ำทุก N วินาที (0 = รันครั้งเดียว)')
+
+    def handle(self, *args, **options):
+        while True:
+            result = expire_due_subscriptions(
+                batch_size=options['batch_size'],
+                max_batches=options['max_batches'],
+                pause=options['pause'],
+            )
+            self.stdout.write(
+                f"หมดอายุ {result.expired} รายการ ({result.batches} ชุด, ผู้ใช้ {result.users} คน)"
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
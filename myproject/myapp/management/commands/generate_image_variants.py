@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from myapp import images, jobs
+
+
+def _image_names():
+    names = set()
+    for model_label, field in images.IMAGE_FIELDS:
+        model = apps.get_model(model_label)
+        names.update(
+            model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            .values_list(field, flat=True)
+        )
+    return sorted(names)
+
+
+class Command(BaseCommand):
+    help = 'สร้างรูปย่อ WebP/JPEG ของรูปที่มีอยู่แล้ว (เช่น หลังนำเข้าข้อมูลหรือเพิ่มขนาดใหม่)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='จำนวน thread ที่ย่อรูปพร้อมกัน (Pillow ปล่อย GIL ระหว่างย่อ/เข้ารหัส)')
+        parser.add_argument('--enqueue', action='store_true',
+                            help='เพิ่มเข้าคิวให้ run_jobs ทำแทนการย่อใน process นี้')
+        parser.add_argument('--force', action='store_true',
+                            help='สร้าง manifest ใหม่แม้มีรูปย่ออยู่แล้ว')
+
+    def handle(self, *args, **options):
+        names = _image_names()
+        if not options['force']:
+            names = [name for name in names if not images.has_variants(name)]
+        if options['enqueue']:
+            for name in names:
+                jobs.enqueue('generate_image_variants', name=name)
+            self.stdout.write(self.style.SUCCESS(f"เพิ่มงานย่อรูป {len(names)} รายการเข้าคิว"))
+            return
+
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(images.generate_variants, name): name for name in names}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except (OSError, ValueError) as exc:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"สร้างรูปย่อ {done} รูป (ผิดพลาด {failed})"))
@@ -0,0 +1,32 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from myapp.cart import DEFAULT_BATCH_SIZE, reap_idle_carts
+
+
+class Command(BaseCommand):
+    help = 'ปิดตะกร้าที่ไม่มีการแก้ไขนานเกินกำหนด (เปลี่ยนเป็นยกเลิก หรือลบทิ้ง) และคืนสต็อกที่จองไว้'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='ปิดตะกร้าที่ไม่ถูกแก้ไขนานกว่า N วัน')
+        parser.add_argument('--delete', action='store_true',
+                            help='ลบตะกร้าทิ้งแทนการเปลี่ยนสถานะเป็น cancelled')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0,
+                            help='เวลาพักระหว่างชุด (วินาที) เพื่อลดภาระฐานข้อมูล')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='รันซ้ำทุก N วินาที (0 = รันครั้งเดียว)')
+
+    def handle(self, *args, **options):
+        while True:
+            reaped = reap_idle_carts(
+                timedelta(days=options['days']), delete=options['delete'],
+                batch_size=options['batch_size'], pause=options['pause'],
+            )
+            action = 'ลบ' if options['delete'] else 'ยกเลิก'
+            self.stdout.write(f"{action}ตะกร้าที่ไม่มีการแก้ไขเกิน {options['days']} วัน {reaped} รายการ")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from myapp.forum import rebuild_counters, rebuild_topic_activity
+from myapp.models import ForumThread
+
+
+class Command(BaseCommand):
+    help = 'คำนวณ reply_count / last_reply_at ของกระทู้ และ last_activity ของหมวดหมู่ใหม่ทั้งหมด'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                ForumThread.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            total += rebuild_counters(ids)
+            last_id = ids[-1]
+            self.stdout.write(f"rebuilt {total} threads")
+
+        topics = rebuild_topic_activity()
+        self.stdout.write(self.style.SUCCESS(
+            f"สร้างตัวนับใหม่ {total} กระทู้, อัปเดตหมวดหมู่ {topics} รายการ"
+        ))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from myapp.models import Product
+from myapp.search import is_supported, search_vector_expression
+
+
+class Command(BaseCommand):
+    help = 'สร้างคอลัมน์ search_vector ของสินค้าใหม่ทั้งหมด (เช่น หลัง bulk import หรือ .update())'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError('การค้นหา full-text ใช้ได้กับ PostgreSQL เท่านั้น')
+
+        batch_size = options['batch_size']
+        last_id = 0
+        total = 0
+        while True:
+            batch = list(
+                Product.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .only('id', 'name', 'category', 'description')[:batch_size]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                for product in batch:
+                    Product.objects.filter(pk=product.pk).update(
+                        search_vector=search_vector_expression(product)
+                    )
+            last_id = batch[-1].id
+            total += len(batch)
+            self.stdout.write(f"indexed {total} products")
+
+        self.stdout.write(self.style.SUCCESS(f"สร้างดัชนีค้นหาใหม่ {total} รายการ"))
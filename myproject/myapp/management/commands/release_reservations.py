@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapp.inventory import DEFAULT_BATCH_SIZE, release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'คืนสต็อกที่ตะกร้าจองไว้ตอน checkout แต่ไม่ได้ยืนยันสั่งซื้อภายในเวลา'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0,
+                            help='เวลาพักระหว่างชุด (วินาที) เพื่อลดภาระฐานข้อมูล')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='รันซ้ำทุก N วินาที (0 = รันครั้งเดียว)')
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_expired_reservations(batch_size=options['batch_size'], pause=options['pause'])
+            self.stdout.write(f"คืนสต็อกของตะกร้าที่หมดเวลาจอง {released} รายการ")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
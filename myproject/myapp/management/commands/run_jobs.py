@@ -0,0 +1,64 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from myapp.jobs import Worker
+
+
+def _run_worker(options):
+    worker = Worker(
+        poll_interval=options['poll_interval'],
+        once=options['once'],
+        max_jobs=options['max_jobs'],
+    )
+    # SIGTERM/SIGINT: ทำงานที่ค้างอยู่ให้เสร็จก่อนแล้วจึงออก
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: worker.stop())
+    return worker.run()
+
+
+def _child(options):
+    # process ลูกห้ามใช้การเชื่อมต่อฐานข้อมูลที่สืบทอดมาจาก process แม่
+    connections.close_all()
+    _run_worker(options)
+
+
+class Command(BaseCommand):
+    help = 'รัน worker ของคิวงานเบื้องหลัง (myapp.jobs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help='จำนวน process ของ worker')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='เวลารอ (วินาที) ก่อนตรวจคิวใหม่เมื่อคิวว่าง')
+        parser.add_argument('--once', action='store_true',
+                            help='ทำงานที่รออยู่จนคิวว่างแล้วออก')
+        parser.add_argument('--max-jobs', type=int, default=None,
+                            help='ออกหลังทำงานครบจำนวนนี้ (ต่อ process)')
+
+    def handle(self, *args, **options):
+        if options['processes'] <= 1:
+            processed = _run_worker(options)
+            self.stdout.write(f"ทำงานเสร็จ {processed} งาน")
+            return
+
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [
+            context.Process(target=_child, args=(options,), name=f'job-worker-{i}')
+            for i in range(options['processes'])
+        ]
+        for child in children:
+            child.start()
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for child in children:
+            child.join()
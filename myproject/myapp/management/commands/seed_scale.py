@@ -0,0 +1,318 @@
+import io
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+
+from myapp import cache_versions, forum, order_numbers
+from myapp.models import (
+    ForumReply, ForumThread, ForumTopic, Ingredient, Order, OrderItem, Product, Progress, Recipe,
+)
+from myapp.search import vector_literal
+
+PRODUCT_WORDS = [
+    'ดัมเบล', 'บาร์เบล', 'เสื่อโยคะ', 'ลู่วิ่ง', 'จักรยาน', 'ยางยืด', 'ถุงมือ', 'เวย์โปรตีน',
+    'เครื่องชั่ง', 'นาฬิกา', 'สายรัด', 'เชือกกระโดด', 'ลูกบอล', 'ม้านั่ง', 'แผ่นน้ำหนัก',
+    'dumbbell', 'barbell', 'yoga', 'treadmill', 'bike', 'band', 'gloves', 'whey', 'kettlebell',
+]
+PRODUCT_CATEGORIES = ['เครื่องออกกำลังกาย', 'อุปกรณ์เสริม', 'อาหารเสริม']
+FOOD_WORDS = ['ไก่', 'ปลา', 'ข้าวกล้อง', 'ไข่', 'เต้าหู้', 'ผักโขม', 'บรอกโคลี', 'อะโวคาโด', 'ควินัว', 'มันหวาน']
+FORUM_WORDS = ['วิ่ง', 'ลดน้ำหนัก', 'เวท', 'โปรตีน', 'คาร์ดิโอ', 'พักผ่อน', 'ยืดเหยียด', 'แคลอรี่', 'ตาราง', 'มือใหม่']
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner', 'snack']
+DIET_TYPES = ['any', 'vegetarian', 'vegan', 'low_carb', 'high_protein']
+# ไม่สร้างคำสั่งซื้อ 'pending' (ตะกร้า) เพราะผู้ใช้หนึ่งคนมีตะกร้าที่ค้างอยู่ได้ใบเดียว
+ORDER_STATUSES = (['delivered'] * 6) + (['shipped'] * 2) + ['paid', 'cancelled']
+
+
+def _product_price(product_id):
+    # ราคาคำนวณจาก id ได้ทั้งตอนสร้างสินค้าและตอนสร้างรายการสั่งซื้อใน process อื่น
+    return Decimal(100 + (product_id * 7919) % 4900)
+
+
+def _columns(model, fields):
+    return [model._meta.get_field(field).column for field in fields]
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _copy(cursor, model, fields, rows):
+    """COPY แถวเข้าตารางของ model (รูปแบบ text ของ PostgreSQL)"""
+    if not rows:
+        return 0
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    columns = ', '.join(connection.ops.quote_name(column) for column in _columns(model, fields))
+    cursor.copy_expert(f'COPY {model._meta.db_table} ({columns}) FROM STDIN', buffer)
+    return len(rows)
+
+
+def _moment(rng, plan):
+    return plan['until'] - timedelta(seconds=rng.random() * plan['days'] * 86400)
+
+
+def _users(rng, plan, start, count):
+    rows = []
+    for id_ in range(plan['user_base'] + start + 1, plan['user_base'] + start + count + 1):
+        rows.append((id_, plan['password'], False, f'seed_user_{id_}', '', '', f'seed_user_{id_}@example.com',
+                     False, True, _moment(rng, plan)))
+    return [(User, ['id', 'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email',
+                    'is_staff', 'is_active', 'date_joined'], rows)]
+
+
+def _products(rng, plan, start, count):
+    rows = []
+    for id_ in range(plan['product_base'] + start + 1, plan['product_base'] + start + count + 1):
+        product = SimpleNamespace(
+            name=f"{' '.join(rng.choices(PRODUCT_WORDS, k=3))} #{id_}",
+            category=rng.choice(PRODUCT_CATEGORIES),
+            description=' '.join(rng.choices(PRODUCT_WORDS, k=30)),
+        )
+        created = _moment(rng, plan)
+        rows.append((id_, product.name, product.description, _product_price(id_), rng.randint(0, 200), True,
+                     created, created, product.category, vector_literal(product)))
+    return [(Product, ['id', 'name', 'description', 'price', 'stock', 'is_active', 'created_at', 'updated_at',
+                       'category', 'search_vector'], rows)]
+
+
+def _recipes(rng, plan, start, count):
+    recipes, ingredients = [], []
+    for id_ in range(plan['recipe_base'] + start + 1, plan['recipe_base'] + start + count + 1):
+        words = rng.sample(FOOD_WORDS, 3)
+        recipes.append((id_, f"{' '.join(words)} #{id_}", ' '.join(rng.choices(FOOD_WORDS, k=20)),
+                        '\n'.join(f"{step}. {word}" for step, word in enumerate(words, 1)),
+                        rng.randint(5, 30), rng.randint(0, 60), 1, rng.randint(150, 900),
+                        round(rng.uniform(2, 60), 1), round(rng.uniform(5, 120), 1), round(rng.uniform(1, 45), 1),
+                        rng.choice(MEAL_TYPES), rng.choice(DIET_TYPES)))
+        for name in rng.sample(FOOD_WORDS, rng.randint(2, plan['max_ingredients'])):
+            ingredients.append((id_, name, f"{rng.randint(1, 300)} กรัม"))
+    return [
+        (Recipe, ['id', 'name', 'description', 'instructions', 'prep_time', 'cook_time', 'servings',
+                  'calories_per_serving', 'protein', 'carbs', 'fat', 'meal_type', 'diet_type'], recipes),
+        (Ingredient, ['recipe', 'name', 'amount'], ingredients),
+    ]
+
+
+def _threads(rng, plan, start, count):
+    # คำตอบสร้างพร้อมกระทู้ ตัวนับ reply_count / last_reply_at จึงถูกต้องโดยไม่ต้องผ่าน signal
+    threads, replies = [], []
+    for id_ in range(plan['thread_base'] + start + 1, plan['thread_base'] + start + count + 1):
+        created = _moment(rng, plan)
+        reply_times = sorted(
+            created + (plan['until'] - created) * rng.random()
+            for _ in range(rng.randint(0, plan['max_replies']))
+        )
+        threads.append((id_, rng.choice(plan['topic_ids']), ' '.join(rng.choices(FORUM_WORDS, k=5)),
+                        ' '.join(rng.choices(FORUM_WORDS, k=40)), rng.choice(plan['user_ids']), created,
+                        reply_times[-1] if reply_times else created, len(reply_times),
+                        reply_times[-1] if reply_times else None))
+        for moment in reply_times:
+            replies.append((id_, ' '.join(rng.choices(FORUM_WORDS, k=15)), rng.choice(plan['user_ids']),
+                            moment, moment))
+    return [
+        (ForumThread, ['id', 'topic', 'title', 'content', 'author', 'created_at', 'updated_at', 'reply_count',
+                       'last_reply_at'], threads),
+        (ForumReply, ['thread', 'content', 'author', 'created_at', 'updated_at'], replies),
+    ]
+
+
+def _orders(rng, plan, start, count):
+    orders, items = [], []
+    for id_ in range(plan['order_base'] + start + 1, plan['order_base'] + start + count + 1):
+        total = Decimal(0)
+        for product_id in rng.sample(plan['product_ids'], rng.randint(1, plan['max_items'])):
+            quantity = rng.randint(1, 3)
+            price = _product_price(product_id)
+            total += price * quantity
+            items.append((id_, product_id, quantity, price))
+        shipping_fee = Decimal(0) if total >= 1000 else Decimal(50)
+        created = _moment(rng, plan)
+        orders.append((id_, rng.choice(plan['user_ids']), total + shipping_fee, rng.choice(ORDER_STATUSES),
+                       created, created, order_numbers.order_number(id_), shipping_fee,
+                       order_numbers.tracking_number(id_)))
+    return [
+        (Order, ['id', 'user', 'total_amount', 'status', 'created_at', 'updated_at', 'order_number',
+                 'shipping_fee', 'tracking_number'], orders),
+        (OrderItem, ['order', 'product', 'quantity', 'price'], items),
+    ]
+
+
+def _progress(rng, plan, start, count):
+    rows = []
+    for _ in range(count):
+        rows.append((rng.choice(plan['user_ids']), _moment(rng, plan).date(), round(rng.uniform(45, 110), 1),
+                     rng.randint(0, 120)))
+    return [(Progress, ['user', 'date', 'weight', 'exercise_minutes'], rows)]
+
+
+# (ชื่อ, ตัวสร้างแถว, ตัวเลือกจำนวน) เรียงตามลำดับ foreign key: ขั้นหลังต้องรอขั้นก่อน commit
+PHASES = [
+    [('users', _users, 'users'), ('products', _products, 'products'), ('recipes', _recipes, 'recipes')],
+    [('forum threads', _threads, 'threads'), ('orders', _orders, 'orders'), ('progress', _progress, 'progress')],
+]
+
+
+def _load_chunk(kind, builder, plan, index, start, count):
+    """สร้างและ COPY หนึ่งช่วงใน worker process คืน (kind, จำนวนแถวทุกตาราง)"""
+    # seed ขึ้นกับตาราง/ลำดับช่วงเท่านั้น ผลจึงเหมือนเดิมไม่ว่าจะใช้กี่ worker
+    rng = random.Random(f"{plan['seed']}:{kind}:{index}")
+    written = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # ข้อมูลสังเคราะห์สร้างใหม่ได้ ไม่ต้องรอ WAL flush ทุก commit
+            cursor.execute('SET LOCAL synchronous_commit = off')
+            for model, fields, rows in builder(rng, plan, start, count):
+                written += _copy(cursor, model, fields, rows)
+    return kind, written
+
+
+def _close_connections():
+    # process ลูกต้องไม่ใช้การเชื่อมต่อที่ได้มาจาก process แม่ร่วมกัน
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ('สร้างข้อมูลสังเคราะห์ปริมาณระดับ production (ผู้ใช้ สินค้า คำสั่งซื้อ progress กระทู้ สูตรอาหาร) '
+            'ด้วย COPY ใน worker หลาย process ผลลัพธ์ขึ้นกับ --seed')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--products', type=int, default=2000)
+        parser.add_argument('--orders', type=int, default=50000)
+        parser.add_argument('--max-items', type=int, default=4, help='จำนวนรายการสูงสุดต่อคำสั่งซื้อ')
+        parser.add_argument('--progress', type=int, default=100000)
+        parser.add_argument('--topics', type=int, default=8, help='จำนวนหมวดหมู่ของกระทู้ที่สร้างใหม่')
+        parser.add_argument('--threads', type=int, default=5000)
+        parser.add_argument('--max-replies', type=int, default=10, help='จำนวนคำตอบสูงสุดต่อกระทู้')
+        parser.add_argument('--recipes', type=int, default=2000)
+        parser.add_argument('--max-ingredients', type=int, default=8)
+        parser.add_argument('--days', type=int, default=365, help='กระจายวันที่สร้างย้อนหลังกี่วัน')
+        parser.add_argument('--until', type=datetime.fromisoformat, default=None,
+                            help='เวลาล่าสุดของข้อมูล (ISO 8601, ค่าเริ่มต้นคือตอนนี้) ระบุเพื่อให้ได้ข้อมูลชุดเดิมทุกครั้ง')
+        parser.add_argument('--chunk-size', type=int, default=20000, help='จำนวนแถวหลักต่อ COPY หนึ่งครั้ง')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('seed_scale ใช้ COPY ของ PostgreSQL')
+        if options['max_items'] > max(options['products'], Product.objects.count()):
+            raise CommandError('--max-items ต้องไม่เกินจำนวนสินค้า')
+
+        plan = self._plan(options)
+        started = time.perf_counter()
+        total = 0
+        for phase in PHASES:
+            total += self._run_phase(phase, plan, options)
+
+        # id ถูกกำหนดเอง จึงต้องเลื่อน sequence ตามให้ INSERT ปกติไม่ชนกัน
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, Product, Recipe, ForumThread, Order]):
+                cursor.execute(sql)
+            for model in (User, Product, Recipe, Ingredient, ForumThread, ForumReply, Order, OrderItem, Progress):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+        cache_versions.invalidate('products')
+        forum.invalidate_popular_threads()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"สร้าง {total:,} แถวใน {elapsed:.1f} วินาที ({total / elapsed:,.0f} แถว/วินาที, "
+            f"{options['workers']} worker, seed={options['seed']})"
+        ))
+
+    def _until(self, until):
+        if until is None:
+            return datetime.now(dt_timezone.utc).replace(microsecond=0)
+        return until if until.tzinfo else until.replace(tzinfo=dt_timezone.utc)
+
+    def _base(self, model):
+        return model.objects.aggregate(value=Max('id'))['value'] or 0
+
+    def _plan(self, options):
+        """ค่าที่ทุก worker ใช้ร่วมกัน: ช่วง id ของแต่ละตาราง และ id ที่ใช้เป็น foreign key"""
+        plan = {
+            'seed': options['seed'],
+            'days': options['days'],
+            'until': self._until(options['until']),
+            'max_items': options['max_items'],
+            'max_replies': options['max_replies'],
+            'max_ingredients': min(options['max_ingredients'], len(FOOD_WORDS)),
+            # ทุกบัญชีที่สร้างใช้รหัสผ่าน "password" (hash ครั้งเดียว)
+            'password': make_password('password'),
+        }
+        for key, model in (('user', User), ('product', Product), ('recipe', Recipe),
+                           ('thread', ForumThread), ('order', Order)):
+            plan[f'{key}_base'] = self._base(model)
+        # process ที่รันอยู่อาจจอง id ของคำสั่งซื้อไว้ล่วงหน้าเกิน Max('id')
+        plan['order_base'] = max(plan['order_base'], order_numbers.last_reserved())
+
+        topic_base = self._base(ForumTopic)
+        topics = []
+        for index in range(options['topics']):
+            rng = random.Random(f"{options['seed']}:topics:{index}")
+            topics.append(ForumTopic(name=f"หมวด {' '.join(rng.sample(FORUM_WORDS, 2))}", description='-'))
+        ForumTopic.objects.bulk_create(topics)
+
+        # foreign key ชี้ไปยังแถวที่กำลังสร้าง หรือแถวที่มีอยู่แล้วเมื่อไม่ได้สร้างใหม่
+        plan['user_ids'] = (range(plan['user_base'] + 1, plan['user_base'] + options['users'] + 1)
+                            if options['users'] else list(User.objects.values_list('id', flat=True)))
+        plan['product_ids'] = (range(plan['product_base'] + 1, plan['product_base'] + options['products'] + 1)
+                               if options['products'] else list(Product.objects.values_list('id', flat=True)))
+        plan['topic_ids'] = list(ForumTopic.objects.filter(id__gt=topic_base).values_list('id', flat=True)) \
+            or list(ForumTopic.objects.values_list('id', flat=True))
+        if not plan['user_ids'] and (options['orders'] or options['progress'] or options['threads']):
+            raise CommandError('ไม่มีผู้ใช้ให้ผูกกับคำสั่งซื้อ/progress/กระทู้ (ใช้ --users)')
+        if not plan['topic_ids'] and options['threads']:
+            raise CommandError('ไม่มีหมวดหมู่กระทู้ (ใช้ --topics)')
+        return plan
+
+    def _run_phase(self, phase, plan, options):
+        chunk_size = options['chunk_size']
+        tasks = [
+            (kind, builder, index, start, min(chunk_size, options[option] - start))
+            for kind, builder, option in phase
+            for index, start in enumerate(range(0, options[option], chunk_size))
+        ]
+        if not tasks:
+            return 0
+
+        _close_connections()
+        written = {}
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_close_connections) as pool:
+            futures = [
+                pool.submit(_load_chunk, kind, builder, plan, index, start, count)
+                for kind, builder, index, start, count in tasks
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                kind, rows = future.result()
+                written[kind] = written.get(kind, 0) + rows
+                if done % max(1, len(futures) // 10) == 0 or done == len(futures):
+                    self.stdout.write(f"  {done}/{len(futures)} ช่วง, {sum(written.values()):,} แถว")
+        elapsed = time.perf_counter() - started
+        for kind, rows in written.items():
+            self.stdout.write(f"{kind:<14} {rows:>12,} แถว")
+        self.stdout.write(f"  ({elapsed:.1f} วินาที)")
+        return sum(written.values())
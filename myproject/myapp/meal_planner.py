@@ -0,0 +1,166 @@
+# myapp/meal_planner.py
+"""
+ตัววางแผนอาหารรายสัปดาห์
+
+โหลดคุณค่าทางโภชนาการของ Recipe ทั้งหมดเป็นเมทริกซ์ NumPy ครั้งเดียวต่อ process
+(โหลดใหม่เมื่อ Recipe เปลี่ยน ผ่านเวอร์ชันของหมวด 'recipe_matrix' ใน cache_versions เหมือน exercise_catalog)
+แล้วเลือกเมนูของแต่ละวันให้ผลรวม แคลอรี่/โปรตีน/คาร์บ/ไขมัน ใกล้เป้าหมายของ MealPlan ที่สุด
+
+วิธีเลือก: สุ่มเมนูเริ่มต้นจากกลุ่มที่ใกล้สัดส่วนของมื้อนั้น แล้วปรับทีละมื้อ
+(coordinate descent) ให้ค่าคลาดเคลื่อนของทั้งวันต่ำที่สุด เมนูที่ใช้ไปแล้วในสัปดาห์จะถูกบวกโทษ
+เพื่อให้อาหารไม่ซ้ำกันถ้าแคตตาล็อกมีตัวเลือกพอ
+"""
+import random
+import threading
+
+import numpy as np
+
+from . import cache_versions
+
+VERSION_SCOPE = 'recipe_matrix'
+
+# คอลัมน์ของเมทริกซ์: แคลอรี่, โปรตีน (ก.), คาร์บ (ก.), ไขมัน (ก.)
+NUTRIENT_FIELDS = ('calories_per_serving', 'protein', 'carbs', 'fat')
+
+# มื้ออาหารตามจำนวนมื้อต่อวัน (2-6)
+MEAL_SLOTS = {
+    2: ['breakfast', 'dinner'],
+    3: ['breakfast', 'lunch', 'dinner'],
+    4: ['breakfast', 'lunch', 'dinner', 'snack'],
+    5: ['breakfast', 'snack', 'lunch', 'snack', 'dinner'],
+    6: ['breakfast', 'snack', 'lunch', 'snack', 'dinner', 'snack'],
+}
+# สัดส่วนพลังงานโดยประมาณของแต่ละมื้อ (ใช้เลือกเมนูเริ่มต้นเท่านั้น)
+SLOT_WEIGHTS = {'breakfast': 3.0, 'lunch': 4.0, 'dinner': 4.0, 'snack': 1.5}
+
+# ข้อจำกัดด้านอาหาร -> diet_type ของ Recipe ที่อนุญาต
+DIET_RESTRICTIONS = (
+    (('vegan', 'วีแกน', 'เจ'), {'vegan'}),
+    (('vegetarian', 'มังสวิรัติ'), {'vegetarian', 'vegan'}),
+)
+
+REPEAT_PENALTY = 1.0
+CANDIDATES = 10
+PASSES = 2
+
+_lock = threading.Lock()
+_matrix = None
+
+
+class RecipeMatrix:
+    def __init__(self, rows, version=None):
+        rows = list(rows)
+        self.version = version
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.meal_types = np.array([row[1] for row in rows], dtype=object)
+        self.diet_types = np.array([row[2] for row in rows], dtype=object)
+        self.nutrients = np.array([row[3:] for row in rows], dtype=np.float64).reshape(len(rows), 4)
+        self._pools = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def pool(self, meal_type, diet_types=None):
+        """ตำแหน่งแถวของเมนูประเภท meal_type ที่ diet_type อยู่ใน diet_types (None คือทุกแบบ)"""
+        key = (meal_type, frozenset(diet_types) if diet_types else None)
+        if key not in self._pools:
+            mask = self.meal_types == meal_type
+            if diet_types:
+                mask &= np.isin(self.diet_types, list(diet_types))
+            self._pools[key] = np.flatnonzero(mask)
+        return self._pools[key]
+
+
+def get_matrix():
+    """เมทริกซ์ปัจจุบัน (query ฐานข้อมูลเฉพาะครั้งแรกหรือหลังถูก invalidate)"""
+    global _matrix
+    from .models import Recipe
+
+    version = cache_versions.get_version(VERSION_SCOPE)
+    matrix = _matrix
+    if matrix is not None and matrix.version == version:
+        return matrix
+    with _lock:
+        if _matrix is None or _matrix.version != version:
+            rows = Recipe.objects.order_by('id').values_list(
+                'id', 'meal_type', 'diet_type', *NUTRIENT_FIELDS
+            )
+            _matrix = RecipeMatrix(rows, version)
+        return _matrix
+
+
+def invalidate():
+    cache_versions.invalidate(VERSION_SCOPE)
+
+
+def allowed_diet_types(dietary_restrictions):
+    """แปลงข้อความข้อจำกัดด้านอาหารเป็นชุด diet_type ที่กินได้ (None คือไม่จำกัด)"""
+    text = (dietary_restrictions or '').lower()
+    for keywords, diet_types in DIET_RESTRICTIONS:
+        if any(keyword in text for keyword in keywords):
+            return diet_types
+    return None
+
+
+def daily_targets(meal_plan):
+    macros = meal_plan.calculate_macros()
+    return np.array(
+        [meal_plan.daily_calories, macros['protein'], macros['carbs'], macros['fat']],
+        dtype=np.float64,
+    )
+
+
+def plan_week(meal_plan, matrix=None, rng=None, days=7):
+    """เลือกเมนูของแต่ละวัน คืน [(day_number, [(meal_time, recipe_id), ...]), ...]"""
+    matrix = matrix or get_matrix()
+    rng = rng or random.Random()
+    slots = MEAL_SLOTS[min(max(meal_plan.meals_per_day, 2), 6)]
+    diet_types = allowed_diet_types(meal_plan.dietary_restrictions)
+
+    pools = []
+    for meal_time in slots:
+        pool = matrix.pool(meal_time, diet_types)
+        if not len(pool):
+            # หากไม่มีสูตรอาหารที่ตรงตามเงื่อนไข ใช้ทั้งหมดของมื้อนั้น
+            pool = matrix.pool(meal_time)
+        pools.append(pool)
+
+    target = daily_targets(meal_plan)
+    scale = np.where(target > 0, target, 1.0)
+    total_weight = sum(SLOT_WEIGHTS[meal_time] for meal_time in slots)
+    used = np.zeros(len(matrix), dtype=np.float64)
+
+    def deviation(rows, goal):
+        # ค่าคลาดเคลื่อนสัมพัทธ์กำลังสองรวมทุกสารอาหาร + โทษของเมนูที่ใช้ไปแล้ว
+        error = (matrix.nutrients[rows] - goal) / scale
+        return np.einsum('ij,ij->i', error, error) + used[rows]
+
+    week = []
+    for day in range(1, days + 1):
+        chosen = [None] * len(slots)
+        for i, (meal_time, pool) in enumerate(zip(slots, pools)):
+            if not len(pool):
+                continue
+            share = target * (SLOT_WEIGHTS[meal_time] / total_weight)
+            scores = deviation(pool, share)
+            top = min(CANDIDATES, len(pool))
+            best = np.argpartition(scores, top - 1)[:top]
+            chosen[i] = int(pool[best[rng.randrange(top)]])
+
+        for _ in range(PASSES):
+            for i, pool in enumerate(pools):
+                if chosen[i] is None:
+                    continue
+                others = [row for j, row in enumerate(chosen) if j != i and row is not None]
+                residual = target - matrix.nutrients[others].sum(axis=0)
+                scores = deviation(pool, residual)
+                scores[np.isin(pool, others)] += REPEAT_PENALTY  # ไม่ซ้ำภายในวันเดียวกัน
+                chosen[i] = int(pool[np.argmin(scores)])
+
+        items = []
+        for meal_time, row in zip(slots, chosen):
+            if row is not None:
+                used[row] += REPEAT_PENALTY
+                items.append((meal_time, int(matrix.ids[row])))
+        week.append((day, items))
+    return week
@@ -1,9 +1,21 @@
 # /myproject/myapp/middleware.py
 
+import json
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.template.backends import django as django_backend
 from django.urls import reverse
 
+from .db_pool import pool as db_pool
+
 class AuthenticationMiddleware:
     """
     Middleware to handle authentication requirements for specific paths.
@@ -44,4 +56,189 @@ class AuthenticationMiddleware:
         
         # Continue processing the request
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
+
+
+logger = logging.getLogger('myapp.instrumentation')
+
+_current_metrics = ContextVar('request_metrics', default=None)
+_MISSING = object()
+
+
+class RequestMetrics:
+    """ค่าที่วัดได้ของคำขอหนึ่งครั้ง"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        self.queries = {}  # sql -> [จำนวนครั้ง, เวลารวม]
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.pool_wait = 0.0
+
+    def record_query(self, sql, duration):
+        self.db_count += 1
+        self.db_time += duration
+        entry = self.queries.setdefault(sql, [0, 0.0])
+        entry[0] += 1
+        entry[1] += duration
+
+    def top_queries(self, limit):
+        ranked = sorted(self.queries.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {'sql': sql, 'count': count, 'ms': round(total * 1000, 2)}
+            for sql, (count, total) in ranked[:limit]
+        ]
+
+
+def _record_pool_wait(wait):
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.pool_wait += wait
+
+
+def _instrument_templates():
+    """จับเวลาการเรนเดอร์เทมเพลตระดับบนสุด (include ซ้อนกันนับรวมในตัวแม่)"""
+    template_class = django_backend.Template
+    if getattr(template_class.render, '_instrumented', False):
+        return
+    original = template_class.render
+
+    def render(self, context=None, request=None):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return original(self, context, request)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            metrics.template_depth -= 1
+            if metrics.template_depth == 0:
+                metrics.template_time += time.perf_counter() - started
+
+    render._instrumented = True
+    template_class.render = render
+
+
+class InstrumentationMiddleware:
+    """
+    วัดต้นทุนของแต่ละคำขอ: ชื่อ view, เวลารวม, จำนวน/เวลา query, cache hit/miss
+    และเวลาเรนเดอร์เทมเพลต แล้วส่งใน header Server-Timing
+
+    คำขอที่ช้ากว่า SLOW_REQUEST_THRESHOLD_MS ถูกบันทึกเป็น JSON ลง logger
+    'myapp.instrumentation' พร้อม SQL ที่ใช้เวลารวมมากที่สุด
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'SERVER_TIMING', True)
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500) / 1000
+        self.top_sql = getattr(settings, 'SLOW_REQUEST_TOP_QUERIES', 5)
+        self.db_pool = getattr(settings, 'DB_POOL', False)
+        _instrument_templates()
+        if self.db_pool:
+            db_pool.add_listener(_record_pool_wait)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        restore_cache = self._instrument_caches(metrics)
+        try:
+            with self._instrument_db(metrics):
+                response = self.get_response(request)
+        finally:
+            restore_cache()
+            _current_metrics.reset(token)
+
+        total = time.perf_counter() - metrics.started
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        if self.server_timing:
+            response['Server-Timing'] = self._server_timing(metrics, total, view_name)
+        if total >= self.slow_threshold:
+            self._log_slow_request(request, response, metrics, total, view_name)
+        return response
+
+    def _instrument_db(self, metrics):
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                metrics.record_query(sql, time.perf_counter() - started)
+
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        return stack
+
+    def _instrument_caches(self, metrics):
+        # อ็อบเจ็กต์ของ cache เป็นของแต่ละ thread จึงครอบเมธอดเฉพาะระหว่างคำขอได้อย่างปลอดภัย
+        patched = []
+        for cache in caches.all():
+            original_get = cache.get
+            original_get_many = cache.get_many
+
+            def get(key, default=None, version=None, _get=original_get):
+                value = _get(key, _MISSING, version=version)
+                if value is _MISSING:
+                    metrics.cache_misses += 1
+                    return default
+                metrics.cache_hits += 1
+                return value
+
+            def get_many(keys, version=None, _get_many=original_get_many):
+                keys = list(keys)
+                found = _get_many(keys, version=version)
+                metrics.cache_hits += len(found)
+                metrics.cache_misses += len(keys) - len(found)
+                return found
+
+            cache.get = get
+            cache.get_many = get_many
+            patched.append(cache)
+
+        def restore():
+            for cache in patched:
+                del cache.get
+                del cache.get_many
+
+        return restore
+
+    def _server_timing(self, metrics, total, view_name):
+        entries = [
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.db_count} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'cache;desc="{metrics.cache_hits} hit, {metrics.cache_misses} miss"',
+        ]
+        if self.db_pool:
+            # เวลาที่รอการเชื่อมต่อว่างจากพูล (สูงขึ้นเมื่อพูลเต็ม)
+            entries.append(f'dbpool;dur={metrics.pool_wait * 1000:.1f}')
+        if view_name:
+            entries.append(f'view;desc="{view_name}"')
+        return ', '.join(entries)
+
+    def _log_slow_request(self, request, response, metrics, total, view_name):
+        record = {
+            'event': 'slow_request',
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'db_queries': metrics.db_count,
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+            'top_sql': metrics.top_queries(self.top_sql),
+        }
+        if self.db_pool:
+            record['db_pool_wait_ms'] = round(metrics.pool_wait * 1000, 2)
+            record['db_pool'] = db_pool.all_stats()
+        logger.warning(json.dumps(record, ensure_ascii=False))
+
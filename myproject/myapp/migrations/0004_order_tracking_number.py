@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+
+def backfill_tracking_numbers(apps, schema_editor):
+    # แถวเดิมทั้งหมดจะได้ค่า default 'TEMP' เหมือนกัน ต้องทำให้ไม่ซ้ำก่อนใส่ unique
+    Order = apps.get_model('myapp', 'Order')
+    for order in Order.objects.only('id').iterator():
+        Order.objects.filter(pk=order.pk).update(tracking_number=f"TEMP-{order.pk}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_alter_order_shipping_fee'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='tracking_number',
+            field=models.CharField(default='TEMP', max_length=100),
+        ),
+        migrations.RunPython(backfill_tracking_numbers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='tracking_number',
+            field=models.CharField(default='TEMP', max_length=100, unique=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-18 20:33
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def populate_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from myapp.search import search_vector_expression
+
+    Product = apps.get_model('myapp', 'Product')
+    for product in Product.objects.only('id', 'name', 'category', 'description').iterator():
+        Product.objects.filter(pk=product.pk).update(
+            search_vector=search_vector_expression(product)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_order_tracking_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_gin'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-18 20:45
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_lines(apps, schema_editor):
+    # รวมรายการสินค้าซ้ำในคำสั่งซื้อเดียวกัน (เกิดจากการกดเพิ่มพร้อมกัน) ก่อนใส่ unique
+    OrderItem = apps.get_model('myapp', 'OrderItem')
+    duplicates = (
+        OrderItem.objects.values('order_id', 'product_id')
+        .annotate(lines=Count('id'), keep_id=Min('id'))
+        .filter(lines__gt=1)
+    )
+    for dup in duplicates:
+        lines = OrderItem.objects.filter(order_id=dup['order_id'], product_id=dup['product_id'])
+        total_quantity = sum(line.quantity for line in lines)
+        lines.exclude(pk=dup['keep_id']).delete()
+        OrderItem.objects.filter(pk=dup['keep_id']).update(quantity=total_quantity)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='orderitem',
+            constraint=models.UniqueConstraint(fields=('order', 'product'), name='orderitem_order_product_uniq'),
+        ),
+    ]
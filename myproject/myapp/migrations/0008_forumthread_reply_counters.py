@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-18 20:43
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_reply_counters(apps, schema_editor):
+    ForumThread = apps.get_model('myapp', 'ForumThread')
+    ForumReply = apps.get_model('myapp', 'ForumReply')
+    replies = ForumReply.objects.filter(thread=OuterRef('pk')).order_by()
+    ForumThread.objects.update(
+        reply_count=Coalesce(
+            Subquery(replies.values('thread').annotate(total=Count('id')).values('total')), 0
+        ),
+        last_reply_at=Subquery(replies.order_by('-created_at').values('created_at')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_orderitem_order_product_uniq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forumthread',
+            name='last_reply_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='forumthread',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='forumthread',
+            index=models.Index(fields=['-reply_count', '-id'], name='forumthread_popular_idx'),
+        ),
+        migrations.RunPython(populate_reply_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_forumthread_reply_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', 'status', 'end_date'], name='subscription_entitlement_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 20:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_subscription_entitlement_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['end_date', 'id'], name='subscription_active_end_idx'),
+        ),
+    ]
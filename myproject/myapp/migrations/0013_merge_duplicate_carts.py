@@ -0,0 +1,48 @@
+# Generated by Django 4.2 on 2026-10-18 21:43
+
+from django.db import migrations
+from django.db.models import Count, F, Max
+
+
+def merge_duplicate_carts(apps, schema_editor):
+    # รวมตะกร้าซ้ำของผู้ใช้ (เกิดจากคำขอพร้อมกัน) เข้าตะกร้าใบล่าสุดก่อนใส่ unique
+    Order = apps.get_model('myapp', 'Order')
+    OrderItem = apps.get_model('myapp', 'OrderItem')
+    Product = apps.get_model('myapp', 'Product')
+    StockReservation = apps.get_model('myapp', 'StockReservation')
+    duplicates = (
+        Order.objects.filter(status='pending').values('user_id')
+        .annotate(carts=Count('id'), keep_id=Max('id'))
+        .filter(carts__gt=1)
+    )
+    for dup in duplicates:
+        carts = Order.objects.filter(user_id=dup['user_id'], status='pending')
+        # การจองสต็อกอ้างอิงรายการเดิม คืนสต็อกทั้งหมดแล้วให้หน้า checkout จองใหม่
+        for reservation in StockReservation.objects.filter(order__in=carts):
+            Product.objects.filter(pk=reservation.product_id).update(stock=F('stock') + reservation.quantity)
+        StockReservation.objects.filter(order__in=carts).delete()
+
+        kept = {line.product_id: line for line in OrderItem.objects.filter(order_id=dup['keep_id'])}
+        for line in OrderItem.objects.filter(order__in=carts.exclude(pk=dup['keep_id'])):
+            if line.product_id in kept:
+                kept[line.product_id].quantity += line.quantity
+                kept[line.product_id].save(update_fields=['quantity'])
+                line.delete()
+            else:
+                line.order_id = dup['keep_id']
+                line.save(update_fields=['order'])
+                kept[line.product_id] = line
+        carts.exclude(pk=dup['keep_id']).delete()
+        total = sum(line.price * line.quantity for line in kept.values())
+        Order.objects.filter(pk=dup['keep_id']).update(total_amount=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0012_stockreservation'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_carts, migrations.RunPython.noop),
+    ]
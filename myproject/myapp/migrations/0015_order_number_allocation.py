@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 21:46
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def replace_placeholders(apps, schema_editor):
+    # เลขพัสดุชั่วคราว ('TEMP' และ 'TEMP-<id>' จาก 0004) และ order_number ที่ยังว่าง ใช้รูปแบบเดียวกับ order_numbers
+    Order = apps.get_model('myapp', 'Order')
+    placeholders = Order.objects.filter(
+        Q(tracking_number='TEMP') | Q(tracking_number__startswith='TEMP-') | Q(order_number__isnull=True)
+    )
+    for order in placeholders.only('id', 'order_number', 'tracking_number').iterator():
+        if order.tracking_number == 'TEMP' or order.tracking_number.startswith('TEMP-'):
+            order.tracking_number = f"TRK{order.pk:012d}"
+        order.order_number = order.order_number or f"ORD-{order.pk:06d}"
+        order.save(update_fields=['order_number', 'tracking_number'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_one_pending_order_per_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(replace_placeholders, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='tracking_number',
+            field=models.CharField(blank=True, max_length=100, unique=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 22:13
+
+from django.db import migrations, models
+
+
+def fill_blank_tracking_numbers(apps, schema_editor):
+    # แถวที่ถูก INSERT ด้วยเลขพัสดุว่าง (ข้าม Order.save()) ใช้รูปแบบเดียวกับ order_numbers
+    Order = apps.get_model('myapp', 'Order')
+    for order in Order.objects.filter(tracking_number='').only('id').iterator():
+        Order.objects.filter(pk=order.pk).update(tracking_number=f"TRK{order.pk:012d}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_order_number_allocation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='tracking_number',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_blank_tracking_numbers, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from decimal import Decimal
 
+from . import order_numbers
+
 class Product(models.Model):
     name = models.CharField(max_length=200, unique=True)
     description = models.TextField()
@@ -13,8 +17,16 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     category = models.CharField(max_length=100, blank=True, null=True)  # <-- ต้องมีทั้งสองตัว
+    # ดัชนีค้นหา full-text ดูแลโดย myapp.search (อัปเดตผ่านสัญญาณ post_save)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='product_search_gin'),
+            # keyset pagination ของ ProductListView
+            models.Index(fields=['created_at', 'id'], name='product_created_idx'),
+        ]
 
-    
     def __str__(self):
         return self.name
 
@@ -46,6 +58,17 @@ class Subscription(models.Model):
     start_date = models.DateTimeField(default=timezone.now)
     end_date = models.DateTimeField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'status', 'end_date'], name='subscription_entitlement_idx'),
+            # ใช้โดยตัวเก็บกวาด subscription ที่หมดอายุ (myapp/subscriptions.py)
+            models.Index(
+                fields=['end_date', 'id'],
+                condition=models.Q(status='active'),
+                name='subscription_active_end_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.plan.name}"
@@ -82,15 +105,32 @@ class Order(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     order_number = models.CharField(max_length=20, unique=True, null=True, blank=True)
     shipping_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    tracking_number = models.CharField(max_length=100, unique=True, default='TEMP')
+    # null แทนค่าว่าง เหมือน order_number: แถวที่ไม่ผ่าน save() (เช่น bulk_create) จึงไม่ชน unique
+    tracking_number = models.CharField(max_length=100, unique=True, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination ของประวัติการสั่งซื้อ
+            models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_idx'),
+            # ตะกร้าที่ไม่มีการแก้ไขนาน (myapp.cart.reap_idle_carts)
+            models.Index(fields=['updated_at'], condition=models.Q(status='pending'), name='order_pending_updated_idx'),
+        ]
+        constraints = [
+            # ผู้ใช้หนึ่งคนมีตะกร้า (คำสั่งซื้อ 'pending') ได้ใบเดียว กันการสร้างซ้ำจากคำขอที่มาพร้อมกัน
+            models.UniqueConstraint(fields=['user'], condition=models.Q(status='pending'),
+                                    name='order_one_pending_per_user'),
+        ]
 
     def __str__(self):
         return f"คำสั่งซื้อ #{self.id} - {self.user.username}"
         
     def save(self, *args, **kwargs):
-        if not self.order_number and self.id:
-            self.order_number = f"ORD-{self.id:06d}"
+        if self._state.adding:
+            # จอง id ก่อน INSERT เพื่อเขียนหมายเลขคำสั่งซื้อและเลขพัสดุไปพร้อมกัน (myapp/order_numbers.py)
+            # id ที่กำหนดมาเองใช้ตามเดิม แต่ยังต้องได้หมายเลขทั้งสอง
+            if self.pk is None:
+                kwargs['force_insert'] = True
+            order_numbers.assign(self, kwargs.get('using') or router.db_for_write(Order, instance=self))
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -101,6 +141,12 @@ class OrderItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            # หนึ่งสินค้าต่อหนึ่งรายการในคำสั่งซื้อ (ใช้เป็นเป้าหมาย ON CONFLICT ของ myapp.cart)
+            models.UniqueConstraint(fields=['order', 'product'], name='orderitem_order_product_uniq'),
+        ]
     
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
@@ -111,6 +157,29 @@ class OrderItem(models.Model):
             self.price = self.product.price
         super().save(*args, **kwargs)
 
+class StockReservation(models.Model):
+    """สต็อกที่ตะกร้าจองไว้ตอน checkout (ดูแลโดย myapp/inventory.py)
+
+    เก็บจำนวนที่ตัดจาก Product.stock ไว้จริง แยกจาก OrderItem เพื่อให้คืนสต็อกได้ถูกต้อง
+    แม้ตะกร้าถูกแก้ไขหลังจอง
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'product'], name='stockreservation_order_product_uniq'),
+        ]
+        indexes = [
+            # ตัวเก็บกวาดการจองที่หมดเวลา
+            models.Index(fields=['expires_at'], name='stockreservation_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} (order {self.order_id})"
+
 # models.py - เพิ่มโมเดล
 
 # โมเดลสำหรับความก้าวหน้าของผู้ใช้
@@ -120,6 +189,11 @@ class Progress(models.Model):
     weight = models.FloatField(null=True, blank=True)
     exercise_minutes = models.IntegerField(default=0)
     notes = models.TextField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date', 'id'], name='progress_user_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.date}"
@@ -140,6 +214,11 @@ class Article(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateTimeField(auto_now_add=True)
     published = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['published', 'date', 'id'], name='article_published_date_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -161,6 +240,11 @@ class Video(models.Model):
     duration = models.IntegerField(help_text="ความยาวในวินาที")
     date = models.DateTimeField(auto_now_add=True)
     published = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['published', 'date', 'id'], name='video_published_date_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -201,6 +285,14 @@ class ForumThread(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # ค่าสรุปที่ดูแลโดย myapp/forum.py (สร้างใหม่ได้ด้วยคำสั่ง rebuild_forum_counters)
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
+    last_reply_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-reply_count', '-id'], name='forumthread_popular_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -215,6 +307,11 @@ class ForumReply(models.Model):
     def __str__(self):
         return f"ตอบกลับโดย {self.author.username}"
 
+    def save(self, *args, **kwargs):
+        # ตัวนับของกระทู้ถูกอัปเดตใน post_save จึงต้องอยู่ใน transaction เดียวกับการบันทึก
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 # models.py - เพิ่มโมเดลสำหรับแผนออกกำลังกายและโภชนาการ
 
 class UserProfile(models.Model):
@@ -503,4 +600,44 @@ class Wishlist(models.Model):
         unique_together = ('user', 'product')  # ป้องกันการเพิ่มสินค้าซ้ำ
         
     def __str__(self):
-        return f"{self.user.username} - {self.product.name}"
\ No newline at end of file
+        return f"{self.user.username} - {self.product.name}"
+
+class Job(models.Model):
+    """งานเบื้องหลังในคิวบนฐานข้อมูล (ดู myapp/jobs.py)"""
+    STATUS_CHOICES = [
+        ('queued', 'รอดำเนินการ'),
+        ('done', 'สำเร็จ'),
+        ('failed', 'ล้มเหลว'),
+    ]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # worker ดึงงานถัดไปจากดัชนีนี้ (เล็กเสมอเพราะมีเฉพาะงานที่รออยู่)
+            models.Index(
+                fields=['run_after', 'id'],
+                condition=models.Q(status='queued'),
+                name='job_queue_idx',
+            ),
+            # หน้าแผนตรวจว่ามีงานสร้างแผนของผู้ใช้ค้างอยู่หรือไม่
+            models.Index(
+                fields=['user', 'kind'],
+                condition=models.Q(status='queued'),
+                name='job_user_pending_idx',
+            ),
+            models.Index(fields=['status', 'finished_at'], name='job_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
@@ -0,0 +1,85 @@
+# myapp/order_numbers.py
+"""
+หมายเลขคำสั่งซื้อ (order_number) และเลขพัสดุ (tracking_number)
+
+ทั้งสองค่าคำนวณจาก id ของคำสั่งซื้อ แต่ id ปกติรู้หลัง INSERT เท่านั้น จึงจอง id จาก sequence
+ของตาราง Order ล่วงหน้าทีละ BLOCK_SIZE ค่าต่อ process (nextval ครั้งเดียวต่อหนึ่งชุด)
+Order.save() ใช้ id ที่จองไว้ แล้วเขียน id และหมายเลขทั้งสองใน INSERT เดียว ไม่ต้อง save() ซ้ำ
+
+id ที่จองไว้แต่ไม่ได้ใช้ (process จบก่อน) กลายเป็นช่องว่าง เหมือน nextval ของ transaction ที่ rollback
+"""
+import os
+import threading
+from collections import deque
+
+from django.db import connections
+
+BLOCK_SIZE = 100
+
+_lock = threading.Lock()
+# alias ของฐานข้อมูล -> (pid, id ที่จองไว้) pid กันไม่ให้ process ที่ fork มาใช้ชุดเดียวกัน
+_reserved = {}
+
+
+def order_number(order_id):
+    return f"ORD-{order_id:06d}"
+
+
+def tracking_number(order_id):
+    return f"TRK{order_id:012d}"
+
+
+def reserve_ids(count, using='default'):
+    """จอง id ของคำสั่งซื้อ count ค่าจาก sequence ด้วย query เดียว (ไม่จำเป็นต้องต่อเนื่องกัน)"""
+    from .models import Order
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [Order._meta.db_table, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def last_reserved(using='default'):
+    """id สูงสุดที่เคยถูกจองจาก sequence (0 ถ้ายังไม่เคย) แถวที่กำหนด id เองต้องใช้ค่าที่มากกว่านี้"""
+    from .models import Order
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(pg_sequence_last_value(pg_get_serial_sequence(%s, 'id')::regclass), 0)",
+            [Order._meta.db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+def next_id(using='default'):
+    """id ถัดไปจากชุดที่ process นี้จองไว้ (จองชุดใหม่เมื่อหมด)"""
+    with _lock:
+        pid, ids = _reserved.get(using, (None, None))
+        if pid != os.getpid() or not ids:
+            ids = deque(reserve_ids(BLOCK_SIZE, using))
+            _reserved[using] = (os.getpid(), ids)
+        return ids.popleft()
+
+
+def assign(order, using='default'):
+    """ตั้ง id, order_number และ tracking_number ให้คำสั่งซื้อที่ยังไม่ถูกบันทึก"""
+    if order.pk is None:
+        order.pk = next_id(using)
+    if not order.order_number:
+        order.order_number = order_number(order.pk)
+    if not order.tracking_number:
+        order.tracking_number = tracking_number(order.pk)
+    return order
+
+
+def assign_many(orders, using='default'):
+    """เหมือน assign สำหรับ bulk_create (จอง id ทั้งหมดในครั้งเดียว)"""
+    missing = [order for order in orders if order.pk is None]
+    if missing:
+        for order, order_id in zip(missing, reserve_ids(len(missing), using)):
+            order.pk = order_id
+    for order in orders:
+        assign(order, using)
+    return orders
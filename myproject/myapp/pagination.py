@@ -0,0 +1,217 @@
+# myapp/pagination.py
+"""
+Keyset (cursor) pagination
+
+แทนการใช้ OFFSET ซึ่งต้องสแกนแถวทั้งหมดก่อนหน้า หน้าที่ลึกแค่ไหนก็ใช้เวลาเท่ากับหน้าแรก
+เพราะเงื่อนไข WHERE เริ่มจากค่าของแถวสุดท้ายที่แสดงไปแล้ว (เช่น created_at, id)
+cursor เป็นสตริง base64 ของค่าคีย์ จึงคงที่แม้มีข้อมูลใหม่เข้ามาระหว่างเลื่อนดู
+"""
+import base64
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import QueryDict
+
+DEFAULT_PER_PAGE = 20
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    # ไม่ใช้ DjangoJSONEncoder เพราะตัดไมโครวินาทีเหลือมิลลิวินาที ทำให้แถวที่เวลาใกล้กันหลุดหน้า
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(direction, values):
+    values = [_encode_value(value) for value in values]
+    raw = json.dumps([direction, values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError):
+        raise InvalidCursor(cursor)
+    if direction not in ('next', 'prev') or not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return direction, values
+
+
+def _parse_ordering(ordering):
+    return [(key.lstrip('-'), key.startswith('-')) for key in ordering]
+
+
+def _key_field(queryset, path):
+    # คีย์อาจเป็น annotation (เช่น rank ของการค้นหา) หรือฟิลด์ผ่านความสัมพันธ์ (a__b)
+    annotation = queryset.query.annotations.get(path)
+    if annotation is not None:
+        return annotation.output_field
+    model = queryset.model
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def _cursor_values(queryset, keys, values):
+    """แปลงค่าใน cursor เป็นชนิดของคีย์ raise InvalidCursor ถ้าค่าไม่ถูกต้อง"""
+    if len(values) != len(keys):
+        raise InvalidCursor(values)
+    try:
+        parsed = [_key_field(queryset, field).to_python(value) for (field, _), value in zip(keys, values)]
+    except (ValidationError, ValueError, TypeError):
+        raise InvalidCursor(values)
+    if any(value is None for value in parsed):
+        raise InvalidCursor(values)
+    return parsed
+
+
+def _keyset_filter(keys, values, reverse=False):
+    """สร้างเงื่อนไข "อยู่ถัดจาก values" ตามลำดับ keys
+
+    (a, b) > (x, y) เขียนเป็น a > x OR (a = x AND b > y) และเพิ่ม a >= x ไว้ด้านหน้า
+    เพื่อให้ planner ใช้ดัชนีของคอลัมน์แรกเป็นช่วงสแกนได้
+    """
+    condition = Q()
+    for i, (field, descending) in enumerate(keys):
+        lookup = 'lt' if descending != reverse else 'gt'
+        term = Q(**{f"{field}__{lookup}": values[i]})
+        for j in range(i):
+            term &= Q(**{keys[j][0]: values[j]})
+        condition |= term
+    first_field, first_descending = keys[0]
+    bound = 'lte' if first_descending != reverse else 'gte'
+    return Q(**{f"{first_field}__{bound}": values[0]}) & condition
+
+
+class KeysetPage:
+    """ผลลัพธ์หนึ่งหน้า ใช้ในเทมเพลตได้เหมือนรายการปกติ
+
+    next_query / previous_query คือ query string ของหน้าถัดไป/ก่อนหน้า
+    โดยคงพารามิเตอร์อื่นของคำขอ (เช่น q, category) ไว้
+    """
+
+    def __init__(self, object_list, keys, has_next, has_previous, params=None, param='cursor'):
+        self.object_list = object_list
+        self.keys = keys
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.params = params if params is not None else QueryDict()
+        self.param = param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def _values(self, obj):
+        return [getattr(obj, field) for field, _ in self.keys]
+
+    def _query(self, cursor):
+        params = self.params.copy()
+        params.pop('partial', None)
+        params[self.param] = cursor
+        return params.urlencode()
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.object_list:
+            return encode_cursor('next', self._values(self.object_list[-1]))
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.object_list:
+            return encode_cursor('prev', self._values(self.object_list[0]))
+        return None
+
+    @property
+    def next_query(self):
+        cursor = self.next_cursor
+        return self._query(cursor) if cursor else ''
+
+    @property
+    def previous_query(self):
+        cursor = self.previous_cursor
+        return self._query(cursor) if cursor else ''
+
+
+def paginate(queryset, ordering, params=None, per_page=DEFAULT_PER_PAGE, param='cursor'):
+    """ตัดหน้าของ queryset ตาม ordering (ต้องจบด้วยคีย์ที่ไม่ซ้ำ เช่น id)
+
+    params คือ request.GET; อ่าน cursor จากคีย์ param ส่วน cursor ที่เสียหาย
+    หรือไม่ตรงรูปแบบจะถูกมองเป็นหน้าแรก
+    """
+    keys = _parse_ordering(ordering)
+    cursor = params.get(param) if params is not None else None
+    direction, values = 'next', None
+    if cursor:
+        try:
+            direction, values = decode_cursor(cursor)
+            values = _cursor_values(queryset, keys, values)
+        except InvalidCursor:
+            direction, values = 'next', None
+
+    backwards = direction == 'prev'
+    order_by = [
+        ('-' if descending != backwards else '') + field
+        for field, descending in keys
+    ]
+    queryset = queryset.order_by(*order_by)
+    if values is not None:
+        queryset = queryset.filter(_keyset_filter(keys, values, reverse=backwards))
+
+    rows = list(queryset[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if backwards:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, values is not None
+    return KeysetPage(rows, keys, has_next, has_previous, params=params, param=param)
+
+
+class KeysetPaginationMixin:
+    """Mixin สำหรับ ListView ให้ใช้ keyset pagination แทน Paginator แบบ offset
+
+    เมื่อเรียกด้วย ?partial=1 จะเรนเดอร์ partial_template_name แทน (สำหรับ infinite scroll)
+    """
+    keyset_ordering = ('-created_at', '-id')
+    per_page = DEFAULT_PER_PAGE
+    partial_template_name = None
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def get_template_names(self):
+        if self.partial_template_name and self.request.GET.get('partial'):
+            return [self.partial_template_name]
+        return super().get_template_names()
+
+    def get_context_data(self, **kwargs):
+        page = paginate(
+            self.object_list,
+            self.get_keyset_ordering(),
+            params=self.request.GET,
+            per_page=self.per_page,
+        )
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context['page'] = page
+        return context
@@ -0,0 +1,147 @@
+# myapp/plan_store.py
+"""
+บันทึกแผนรายสัปดาห์ (ต้นไม้ แผน -> วัน -> รายการ) ทั้งชุด
+
+แผนใหม่แทนที่แผนเดิมใน transaction เดียว: ลบต้นไม้เดิมด้วย DELETE สองคำสั่ง
+(ลูกก่อน แล้วจึงวัน) แทน .delete() ที่ให้ collector ของ Django โหลดแถวมาไว้ใน Python
+แล้วเขียนต้นไม้ใหม่ด้วย bulk_create สองครั้ง แถวของแผนถูกล็อกไว้ระหว่างนั้น
+การกดสร้างแผนซ้ำพร้อมกันจึงไม่ทำให้วันของสองรอบปนกัน
+
+ตารางวันและรายการไม่มี signal ผูกไว้ การข้าม collector จึงไม่ทำให้พฤติกรรมอื่นหายไป
+
+generate_workout_plan / generate_meal_plan สร้างแผนใหม่แล้วบันทึกผ่านที่นี่
+(ใช้ทั้งจากงานเบื้องหลังใน myapp/tasks.py และคำสั่ง bench_plans)
+"""
+import random
+from itertools import cycle
+
+from django.db import connection, transaction
+
+from . import dashboard
+from .exercise_catalog import get_catalog
+from .helpers import build_workout_exercises, distribute_training_days
+from .meal_planner import plan_week
+from .models import DailyMeal, MealItem, WorkoutDay, WorkoutExercise
+
+
+class PlanTree:
+    """โครงสร้างของต้นไม้: โมเดลของวัน (ชี้ไปที่แผน) และโมเดลของรายการ (ชี้ไปที่วัน)"""
+
+    def __init__(self, day_model, plan_field, item_model, day_field):
+        self.day_model = day_model
+        self.plan_field = plan_field
+        self.item_model = item_model
+        self.day_field = day_field
+
+    def delete(self, plan_id):
+        qn = connection.ops.quote_name
+        day_meta, item_meta = self.day_model._meta, self.item_model._meta
+        day_table = qn(day_meta.db_table)
+        plan_column = qn(day_meta.get_field(self.plan_field).column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {qn(item_meta.db_table)} "
+                f"WHERE {qn(item_meta.get_field(self.day_field).column)} IN "
+                f"(SELECT {qn(day_meta.pk.column)} FROM {day_table} WHERE {plan_column} = %s)",
+                [plan_id],
+            )
+            cursor.execute(f"DELETE FROM {day_table} WHERE {plan_column} = %s", [plan_id])
+
+    def replace(self, plan, days, items):
+        """แทนที่ต้นไม้ของ plan ด้วย days/items (ยังไม่บันทึก; items ชี้ไปที่อ็อบเจ็กต์ใน days)"""
+        with transaction.atomic():
+            type(plan).objects.select_for_update().filter(pk=plan.pk).values_list('pk').first()
+            self.delete(plan.pk)
+            # bulk_create ของ days ใส่ pk ให้แล้ว bulk_create ของ items จึงอ่าน FK จากอ็อบเจ็กต์ได้
+            days = self.day_model.objects.bulk_create(days)
+            self.item_model.objects.bulk_create(items)
+        return days
+
+
+WORKOUT_TREE = PlanTree(WorkoutDay, 'exercise_plan', WorkoutExercise, 'workout_day')
+MEAL_TREE = PlanTree(DailyMeal, 'meal_plan', MealItem, 'daily_meal')
+
+
+def replace_workout_plan(exercise_plan, days, exercises):
+    return WORKOUT_TREE.replace(exercise_plan, days, exercises)
+
+
+def replace_meal_plan(meal_plan, days, items):
+    return MEAL_TREE.replace(meal_plan, days, items)
+
+
+def generate_meal_plan(meal_plan, rng=None):
+    """สร้างแผนอาหารรายวันให้ใกล้เป้าหมายแคลอรี่และสารอาหารหลักของแผน (ดู meal_planner)"""
+    week = plan_week(meal_plan, rng=rng)
+    daily_meals = [DailyMeal(meal_plan=meal_plan, day_number=day) for day, _ in week]
+    meal_items = [
+        MealItem(daily_meal=daily_meal, recipe_id=recipe_id, meal_time=meal_time)
+        for daily_meal, (_, items) in zip(daily_meals, week)
+        for meal_time, recipe_id in items
+    ]
+
+    # แทนที่แผนเดิม (ถ้ามี) ทั้งชุดใน transaction เดียว
+    replace_meal_plan(meal_plan, daily_meals, meal_items)
+    # bulk_create ไม่ส่ง signal จึงต้องล้าง snapshot ของแดชบอร์ดเอง
+    transaction.on_commit(lambda: dashboard.invalidate(meal_plan.user_id))
+
+
+def _weekly_schedule(exercise_plan):
+    """รายการ (day_number, focus, primary_muscle) ของทั้ง 7 วันตามรูปแบบการฝึก"""
+    days_per_week = exercise_plan.days_per_week
+    schedule = []
+
+    if exercise_plan.training_focus == 'full_body':
+        # แผนฝึกทั้งร่างกาย - กระจายวันฝึกให้ห่างกัน
+        training_days = distribute_training_days(days_per_week)
+        for day in range(1, 8):
+            schedule.append((day, 'full_body' if day in training_days else 'rest', None))
+
+    elif exercise_plan.training_focus == 'upper_lower':
+        # แผนฝึกส่วนบน/ส่วนล่าง - สลับวันฝึก
+        training_days = distribute_training_days(days_per_week)
+        upper_lower_cycle = cycle(['upper_body', 'lower_body'])
+        for day in range(1, 8):
+            schedule.append((day, next(upper_lower_cycle) if day in training_days else 'rest', None))
+
+    elif exercise_plan.training_focus == 'push_pull_legs':
+        # แผนฝึกแบบ Push/Pull/Legs
+        training_days = distribute_training_days(min(6, days_per_week))  # สูงสุด 6 วัน
+        ppl_cycle = cycle(['chest', 'back', 'legs'])  # Push, Pull, Legs
+        for day in range(1, 8):
+            if day in training_days:
+                muscle_focus = next(ppl_cycle)
+                # กำหนด focus สำหรับการแสดงผล (Push/Pull = ส่วนบน, Legs = ส่วนล่าง)
+                display_focus = 'lower_body' if muscle_focus == 'legs' else 'upper_body'
+                schedule.append((day, display_focus, muscle_focus))
+            else:
+                schedule.append((day, 'rest', None))
+
+    return schedule
+
+
+def generate_workout_plan(exercise_plan, rng=None):
+    """สร้างแผนออกกำลังกายรายวันตามเป้าหมายและระดับความสามารถ
+
+    สุ่มท่าจาก ExerciseCatalog ในหน่วยความจำ (ส่ง random.Random(seed) เพื่อให้ผลซ้ำได้)
+    และแทนที่แผนเดิมทั้งชุดด้วย replace_workout_plan
+    """
+    rng = rng or random.Random()
+    catalog = get_catalog()
+    schedule = _weekly_schedule(exercise_plan)
+
+    workout_days = [
+        WorkoutDay(exercise_plan=exercise_plan, day_number=day, focus=focus)
+        for day, focus, _ in schedule
+    ]
+    workout_exercises = []
+    for workout_day, (_, focus, primary_muscle) in zip(workout_days, schedule):
+        if focus != 'rest':
+            workout_exercises.extend(build_workout_exercises(
+                workout_day, exercise_plan, primary_muscle=primary_muscle, catalog=catalog, rng=rng
+            ))
+
+    # แทนที่แผนเดิม (ถ้ามี) ทั้งชุดใน transaction เดียว
+    replace_workout_plan(exercise_plan, workout_days, workout_exercises)
+    # bulk_create ไม่ส่ง signal จึงต้องล้าง snapshot ของแดชบอร์ดเอง
+    transaction.on_commit(lambda: dashboard.invalidate(exercise_plan.user_id))
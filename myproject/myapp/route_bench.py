@@ -0,0 +1,249 @@
+# myapp/route_bench.py
+"""
+งบจำนวน query และการวัดเวลาตอบของทุกหน้าใน myapp/urls.py
+
+ROUTES กำหนดงบ query สูงสุดต่อคำขอของแต่ละหน้าแยกตามผู้ใช้สามแบบ (PERSONAS):
+anonymous, member (ล็อกอินแต่ไม่ได้เป็นสมาชิก) และ subscriber (สมาชิกที่มีแผนและคำสั่งซื้อ)
+งบนับตอน cache ว่าง และต้องไม่โตตามจำนวนแถว (add_rows) ใช้ทั้งใน tests.py และคำสั่ง bench_routes
+"""
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    Article, Content, DailyMeal, Exercise, ExercisePlan, ForumReply, ForumThread, ForumTopic,
+    Ingredient, Job, MealItem, MealPlan, Order, OrderItem, Product, Progress, Recipe, Subscription,
+    SubscriptionPlan, UserProfile, Video, Wishlist, WorkoutDay, WorkoutExercise,
+)
+from .utils.benchmark import percentile
+from .utils.promptpay import generate_promptpay_payload, qr_url_kwargs
+
+PERSONAS = ('anonymous', 'member', 'subscriber')
+SEED_PREFIX = 'bench-route'
+
+
+class Route:
+    """หน้าหนึ่งหน้าใน myapp/urls.py
+
+    budgets: งบ query ต่อผู้ใช้แต่ละแบบ (int = เท่ากันทุกแบบ)
+    kwargs: ฟังก์ชันรับ objects ของผู้ใช้ (ดู seed_dataset) คืน kwargs ของ reverse()
+    variant: ชื่อกรณีย่อยเมื่อหน้าเดียวกันถูกวัดด้วย data ต่างกัน (เช่น มี ?q=)
+    """
+
+    def __init__(self, name, budgets, kwargs=None, method='get', data=None, variant=None):
+        self.name = name
+        self.budgets = budgets
+        self.kwargs = kwargs
+        self.method = method
+        self.data = data or {}
+        self.variant = variant
+
+    @property
+    def key(self):
+        return f"{self.name}[{self.variant}]" if self.variant else self.name
+
+    def budget(self, persona):
+        if isinstance(self.budgets, int):
+            return self.budgets
+        return self.budgets[persona]
+
+    def url(self, objects):
+        return reverse(self.name, kwargs=self.kwargs(objects) if self.kwargs else None)
+
+
+def _budgets(anonymous, member, subscriber):
+    return {'anonymous': anonymous, 'member': member, 'subscriber': subscriber}
+
+
+ROUTES = [
+    Route('login', _budgets(0, 2, 2)),
+    Route('logout', _budgets(0, 4, 4), method='post'),
+    Route('register', _budgets(0, 3, 3)),
+    Route('home', _budgets(2, 5, 5)),
+    Route('product_list', _budgets(1, 4, 4)),
+    Route('product_list', _budgets(1, 4, 4), data={'q': 'product'}, variant='search'),
+    Route('product_list', _budgets(1, 4, 4), data={'q': '!!!'}, variant='search-no-tokens'),
+    Route('product_detail', _budgets(2, 5, 5), kwargs=lambda o: {'pk': o['product'].pk}),
+    Route('subscription_list', _budgets(1, 4, 4)),
+    Route('subscription_detail', _budgets(1, 4, 4), kwargs=lambda o: {'pk': o['plan'].pk}),
+    Route('subscribe', _budgets(0, 5, 4), kwargs=lambda o: {'plan_id': o['plan'].pk}),
+    Route('user_subscriptions', _budgets(0, 4, 5)),
+    Route('cart', _budgets(0, 5, 5)),
+    Route('add_to_cart', _budgets(0, 6, 6), kwargs=lambda o: {'product_id': o['product'].pk}),
+    Route('remove_from_cart', _budgets(0, 5, 5), kwargs=lambda o: {'item_id': o['cart_item'].pk}),
+    Route('update_cart_item', _budgets(0, 5, 5), kwargs=lambda o: {'item_id': o['cart_item'].pk},
+          method='post', data={'action': 'increase'}),
+    Route('checkout', _budgets(0, 12, 12)),
+    Route('pay_order', _budgets(0, 3, 3), kwargs=lambda o: {'order_id': o['order'].pk}),
+    Route('promptpay_qr', 0, kwargs=lambda o: qr_url_kwargs(o['payload'], 'svg')),
+    Route('dashboard', _budgets(0, 11, 11)),
+    Route('content_list', _budgets(2, 5, 5)),
+    Route('community_forum', _budgets(0, 6, 6)),
+    Route('track_progress', _budgets(0, 4, 4)),
+    Route('add_progress', _budgets(0, 3, 3)),
+    Route('profile_setup', _budgets(0, 4, 4)),
+    Route('profile_update', _budgets(0, 4, 4)),
+    Route('password_change', _budgets(0, 3, 3)),
+    Route('exercise_plan', _budgets(0, 4, 6)),
+    Route('view_exercise_plan', _budgets(0, 4, 10)),
+    Route('view_workout_day', _budgets(0, 5, 5), kwargs=lambda o: {'day_id': o['workout_day'].pk}),
+    Route('meal_plan', _budgets(0, 4, 6)),
+    Route('view_meal_plan', _budgets(0, 4, 10)),
+    Route('view_daily_meal', _budgets(0, 5, 5), kwargs=lambda o: {'meal_id': o['daily_meal'].pk}),
+    Route('view_recipe', _budgets(0, 7, 7), kwargs=lambda o: {'recipe_id': o['recipe'].pk}),
+    Route('job_wait', _budgets(0, 3, 3), kwargs=lambda o: {'job_id': o['job'].pk}),
+    Route('job_status', _budgets(0, 3, 3), kwargs=lambda o: {'job_id': o['job'].pk}),
+    Route('order_history', _budgets(0, 4, 4)),
+    Route('order_detail', _budgets(0, 6, 6), kwargs=lambda o: {'order_id': o['order'].pk}),
+    Route('wishlist', _budgets(0, 4, 4)),
+    Route('remove_from_wishlist', _budgets(0, 4, 4), kwargs=lambda o: {'item_id': o['wishlist_item'].pk}),
+    Route('support', _budgets(0, 3, 3)),
+    Route('nutrition_plan', _budgets(0, 4, 7)),
+    Route('about', _budgets(0, 3, 3)),
+    Route('contact', _budgets(0, 3, 3)),
+    Route('faq', _budgets(0, 3, 3)),
+    Route('terms', _budgets(0, 3, 3)),
+]
+
+
+def _persona_user(name, subscribed, catalog):
+    user = User.objects.create_user(f'{SEED_PREFIX}-{name}', f'{name}@example.com', 'pass1234')
+    objects = {'user': user}
+    if subscribed:
+        UserProfile.objects.create(
+            user=user, gender='female', height=165, weight=60, has_completed_profile=True,
+            birth_date=timezone.now().date() - timedelta(days=365 * 30),
+        )
+        Subscription.objects.create(user=user, plan=catalog['plan'], end_date=timezone.now() + timedelta(days=30))
+    objects['exercise_plan'] = ExercisePlan.objects.create(user=user, goal='general_fitness', level='beginner')
+    objects['meal_plan'] = MealPlan.objects.create(user=user, goal='general_health')
+    objects['cart'] = Order.objects.create(user=user, total_amount=0)
+    objects['job'] = Job.objects.create(kind='generate_meal_plan', user=user, status='done')
+    return objects
+
+
+def seed_dataset(rows=3):
+    """สร้างข้อมูลทดสอบ คืน dataset ที่มี objects ของผู้ใช้แต่ละแบบใน dataset['personas'] (ใช้กับ Route.url())"""
+    author = User.objects.create_user(f'{SEED_PREFIX}-author')
+    plan = SubscriptionPlan.objects.create(name=f'{SEED_PREFIX} monthly', description='-', price=199)
+    exercise = Exercise.objects.create(
+        name=f'{SEED_PREFIX} squat', description='-', muscle_group='legs', difficulty='beginner', instructions='-'
+    )
+    topic = ForumTopic.objects.create(name=f'{SEED_PREFIX} general', description='-')
+    catalog = {'author': author, 'plan': plan, 'exercise': exercise, 'topic': topic}
+
+    personas = {
+        'member': _persona_user('member', subscribed=False, catalog=catalog),
+        'subscriber': _persona_user('subscriber', subscribed=True, catalog=catalog),
+    }
+    dataset = {'catalog': catalog, 'personas': personas, 'rows': 0}
+    add_rows(dataset, rows)
+    # ผู้ใช้ที่ไม่ได้ล็อกอินใช้ URL เดียวกับสมาชิก (จะถูกส่งไปหน้า login)
+    personas['anonymous'] = personas['subscriber']
+    return dataset
+
+
+def add_rows(dataset, count):
+    """เพิ่มข้อมูลที่หน้ารายการต้องแสดง count ชุด (งบ query ต้องไม่เปลี่ยน)"""
+    catalog = dataset['catalog']
+    for _ in range(count):
+        n = dataset['rows']
+        dataset['rows'] += 1
+        product = Product.objects.create(name=f'{SEED_PREFIX} product {n}', description='-', price=100 + n,
+                                         stock=10)
+        recipe = Recipe.objects.create(
+            name=f'{SEED_PREFIX} recipe {n}', description='-', instructions='ล้าง\nหั่น\nผัด', prep_time=5,
+            cook_time=10, calories_per_serving=300 + n, protein=10, carbs=20, fat=5, meal_type='lunch',
+        )
+        Ingredient.objects.bulk_create([
+            Ingredient(recipe=recipe, name=f'ingredient {i}', amount='1 ถ้วย') for i in range(3)
+        ])
+        SubscriptionPlan.objects.create(name=f'{SEED_PREFIX} plan {n}', description='-', price=100 + n)
+        Article.objects.create(title=f'{SEED_PREFIX} article {n}', slug=f'{SEED_PREFIX}-article-{n}', content='-',
+                               category='exercise', author=catalog['author'])
+        Video.objects.create(title=f'{SEED_PREFIX} video {n}', description='-', video_url='https://example.com',
+                             thumbnail='video_thumbnails/x.jpg', category='beginner', duration=60)
+        Content.objects.create(title=f'{SEED_PREFIX} content {n}', content='-')
+        thread = ForumThread.objects.create(topic=catalog['topic'], title=f'{SEED_PREFIX} thread {n}',
+                                            content='-', author=catalog['author'])
+        ForumReply.objects.create(thread=thread, content='-', author=catalog['author'])
+        catalog.setdefault('product', product)
+        catalog.setdefault('recipe', recipe)
+
+        for name, objects in dataset['personas'].items():
+            if name == 'anonymous':
+                continue
+            user = objects['user']
+            day = objects['exercise_plan'].workout_days.count() + 1
+            workout_day = WorkoutDay.objects.create(exercise_plan=objects['exercise_plan'], day_number=day,
+                                                    focus='full_body')
+            WorkoutExercise.objects.create(workout_day=workout_day, exercise=catalog['exercise'])
+            daily_meal = DailyMeal.objects.create(meal_plan=objects['meal_plan'], day_number=day)
+            for meal_time in ('breakfast', 'lunch', 'dinner'):
+                MealItem.objects.create(daily_meal=daily_meal, recipe=recipe, meal_time=meal_time)
+
+            order = Order.objects.create(user=user, total_amount=100 + n, status='paid')
+            OrderItem.objects.create(order=order, product=product, price=product.price)
+            cart_item = OrderItem.objects.create(order=objects['cart'], product=product, price=product.price)
+            wishlist_item = Wishlist.objects.create(user=user, product=product)
+            Progress.objects.create(user=user, weight=60, exercise_minutes=30)
+
+            objects.setdefault('workout_day', workout_day)
+            objects.setdefault('daily_meal', daily_meal)
+            objects.setdefault('order', order)
+            objects.setdefault('cart_item', cart_item)
+            objects.setdefault('wishlist_item', wishlist_item)
+            objects.setdefault('product', catalog['product'])
+            objects.setdefault('plan', catalog['plan'])
+            objects.setdefault('recipe', catalog['recipe'])
+            objects.setdefault('payload', generate_promptpay_payload(mobile='0812345678', amount=order.total_amount))
+
+
+def measure(dataset, route, persona, repeat=1, client=None):
+    """เรียกหน้า route ในนาม persona คืน (status, จำนวน query ตอน cache ว่าง, เวลาแต่ละครั้ง ms)
+
+    ทุกครั้งรันใน savepoint ที่ rollback ทิ้ง หน้าที่แก้ข้อมูล (เช่น add_to_cart) จึงเรียกซ้ำได้
+    """
+    client = client or Client()
+    objects = dataset['personas'][persona]
+    url = route.url(objects)
+    if persona == 'anonymous':
+        client.logout()
+    else:
+        client.force_login(objects['user'])
+
+    status, queries, samples = None, None, []
+    for attempt in range(repeat):
+        if attempt == 0:
+            cache.clear()
+        # queries_log มีขนาดจำกัด ถ้าเต็มแล้ว CaptureQueriesContext จะนับได้ 0
+        reset_queries()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = getattr(client, route.method)(url, route.data)
+                samples.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+        if attempt == 0:
+            status = response.status_code
+            # savepoint ของการวัดไม่นับ
+            queries = sum(1 for query in ctx.captured_queries if 'SAVEPOINT' not in query['sql'])
+        if persona != 'anonymous':
+            # หน้า logout ล้าง session
+            client.force_login(objects['user'])
+    return status, queries, samples
+
+
+def summarize_samples(samples):
+    return {
+        'p50': round(percentile(samples, 50), 2),
+        'p95': round(percentile(samples, 95), 2),
+        'p99': round(percentile(samples, 99), 2),
+    }
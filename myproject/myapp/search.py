@@ -0,0 +1,135 @@
+# myapp/search.py
+"""
+ระบบค้นหาสินค้าแบบ full-text บน PostgreSQL
+
+parser ของ Postgres ตัดคำภาษาไทยไม่ได้ (ไม่มีช่องว่างระหว่างคำ และสระ/วรรณยุกต์
+ถูกมองเป็นตัวคั่น) จึงตัดโทเคนฝั่ง Python แล้วเขียน tsvector/tsquery เป็น literal
+โดยตรง: คำภาษาอังกฤษ/ตัวเลขเก็บทั้งคำ ส่วนข้อความภาษาไทยเก็บเป็น bigram ของตัวอักษร
+ทำให้ค้นหาส่วนหนึ่งของคำไทยได้ผ่านดัชนี GIN
+"""
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVectorField,
+)
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast
+
+TOKEN_RE = re.compile(r'[\u0e00-\u0e7f]+|[^\W_\u0e00-\u0e7f]+')
+THAI_RE = re.compile(r'[\u0e00-\u0e7f]')
+
+# ตำแหน่งใน tsvector ได้สูงสุด 16383 และคำอธิบายยาว ๆ ไม่ช่วยเรื่องการจัดอันดับ
+MAX_POSITIONS = 2000
+
+# น้ำหนักของแต่ละฟิลด์ (A สำคัญที่สุด)
+FIELD_WEIGHTS = (
+    ('name', 'A'),
+    ('category', 'B'),
+    ('description', 'C'),
+)
+
+
+# ลำดับผลการค้นหา ใช้ได้เฉพาะเมื่อ search_products ใส่ annotation rank ให้แล้ว
+SEARCH_ORDERING = ('-rank', '-created_at', '-id')
+
+
+def tokenize(text):
+    """แยกข้อความเป็นโทเคนสำหรับดัชนีค้นหา"""
+    tokens = []
+    for run in TOKEN_RE.findall((text or '').lower()):
+        if THAI_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def _quote(lexeme):
+    return "'%s'" % lexeme.replace('\\', '\\\\').replace("'", "''")
+
+
+def vector_literal(product):
+    """สร้าง tsvector literal (พร้อมตำแหน่งและน้ำหนัก) จากฟิลด์ของสินค้า"""
+    lexemes = {}
+    position = 0
+    for field, weight in FIELD_WEIGHTS:
+        for token in tokenize(getattr(product, field)):
+            position += 1
+            if position > MAX_POSITIONS:
+                break
+            lexemes.setdefault(token, []).append(f"{position}{weight}")
+    return ' '.join(
+        f"{_quote(lexeme)}:{','.join(positions)}"
+        for lexeme, positions in lexemes.items()
+    )
+
+
+def query_literal(text):
+    """สร้าง tsquery literal: ทุกโทเคนต้องตรง, โทเคนสุดท้ายค้นหาแบบ prefix"""
+    tokens = list(dict.fromkeys(tokenize(text)))
+    if not tokens:
+        return ''
+    terms = [_quote(token) for token in tokens]
+    # โทเคนท้ายอาจพิมพ์ยังไม่จบ (หรือเป็นอักษรไทยตัวเดียว) จึงให้ค้นหาแบบ prefix
+    terms[-1] += ':*'
+    return ' & '.join(terms)
+
+
+def search_vector_expression(product):
+    """นิพจน์สำหรับบันทึกลงคอลัมน์ Product.search_vector"""
+    return Cast(Value(vector_literal(product)), output_field=SearchVectorField())
+
+
+class LexemeQuery(SearchQuery):
+    """tsquery ที่สร้างจาก literal โดยตรง ไม่ผ่าน parser/dictionary ของ Postgres"""
+    template = '%(expressions)s::tsquery'
+
+    def __init__(self, value, **kwargs):
+        super().__init__(value, search_type='raw', **kwargs)
+
+
+def is_supported():
+    return connection.vendor == 'postgresql'
+
+
+def ordering_for(text, default):
+    """ลำดับของรายการสินค้า: SEARCH_ORDERING เมื่อ search_products ค้นหาจริง (มีโทเคน) ไม่เช่นนั้น default"""
+    if text and is_supported() and query_literal(text):
+        return SEARCH_ORDERING
+    return default
+
+
+def update_search_vector(product):
+    """อัปเดตคอลัมน์ search_vector ของสินค้าหนึ่งรายการ"""
+    if not is_supported():
+        return
+    type(product).objects.filter(pk=product.pk).update(
+        search_vector=search_vector_expression(product)
+    )
+
+
+def search_products(queryset, text):
+    """กรองและจัดอันดับสินค้าตามคำค้นหา
+
+    ใช้ดัชนี GIN บน PostgreSQL และย้อนกลับไปใช้ icontains บนฐานข้อมูลอื่น
+    ผลลัพธ์เรียงตาม SEARCH_ORDERING (ใช้เป็นคีย์ของ keyset pagination ได้)
+    """
+    if not is_supported():
+        return queryset.filter(Q(name__icontains=text) | Q(description__icontains=text))
+
+    literal = query_literal(text)
+    if not literal:
+        # ไม่มีโทเคนให้ค้น (เช่น ช่องว่างหรือเครื่องหมายล้วน) แต่ผู้เรียกยังเรียงตาม SEARCH_ORDERING
+        return queryset.none().annotate(rank=Value(0.0, output_field=FloatField()))
+    query = LexemeQuery(literal)
+    # ts_rank คืนค่า real; cast เป็น double เพื่อให้ค่าที่ส่งกลับมาใน cursor เทียบเท่ากันได้พอดี
+    rank = Cast(SearchRank(F('search_vector'), query), output_field=FloatField())
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=rank)
+        .order_by(*SEARCH_ORDERING)
+    )
@@ -1,8 +1,15 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
+from django.db import transaction
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from allauth.socialaccount.models import SocialAccount
-from .models import UserProfile
+from .models import (
+    UserProfile, Product, ForumReply, Exercise, Recipe,
+    Order, Subscription, ExercisePlan, MealPlan, SubscriptionPlan, Article, Video, Content,
+)
+from . import cache_versions, dashboard, entitlements, exercise_catalog, forum, images, jobs, meal_planner
+from .subscriptions import subscriptions_expired
+from .search import FIELD_WEIGHTS, update_search_vector
 
 @receiver(post_save, sender=SocialAccount)
 def create_profile_for_social_user(sender, instance, created, **kwargs):
@@ -21,4 +28,112 @@ def create_profile_for_social_user(sender, instance, created, **kwargs):
                     # อาจจะดึงข้อมูลอื่นๆ เพิ่มเติมตามที่ต้องการ
                     pass
                     
-            user_profile.save()
\ No newline at end of file
+            user_profile.save()
+
+@receiver(post_save, sender=Product)
+def refresh_product_search_vector(sender, instance, update_fields=None, **kwargs):
+    """อัปเดตดัชนีค้นหาเมื่อสินค้าถูกบันทึก (รวมถึงการแก้ไขใน ProductAdmin)"""
+    indexed_fields = {field for field, weight in FIELD_WEIGHTS}
+    if update_fields is not None and not indexed_fields & set(update_fields):
+        return
+    update_search_vector(instance)
+
+@receiver(post_save, sender=ForumReply)
+def count_new_reply(sender, instance, created, **kwargs):
+    """อัปเดตตัวนับของกระทู้เมื่อมีคำตอบใหม่"""
+    if created:
+        forum.reply_added(instance)
+
+@receiver(post_delete, sender=ForumReply)
+def count_removed_reply(sender, instance, **kwargs):
+    """อัปเดตตัวนับของกระทู้เมื่อคำตอบถูกลบ (รวมถึงการลบแบบ queryset/cascade)"""
+    forum.reply_removed(instance)
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def invalidate_exercise_catalog(sender, **kwargs):
+    """ให้ทุก process โหลด ExerciseCatalog ใหม่หลังจาก commit"""
+    transaction.on_commit(exercise_catalog.invalidate)
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_matrix(sender, **kwargs):
+    """ให้ทุก process โหลดเมทริกซ์สูตรอาหารใหม่หลังจาก commit"""
+    transaction.on_commit(meal_planner.invalidate)
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+@receiver(post_save, sender=ExercisePlan)
+@receiver(post_delete, sender=ExercisePlan)
+@receiver(post_save, sender=MealPlan)
+@receiver(post_delete, sender=MealPlan)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_dashboard(sender, instance, **kwargs):
+    """ล้าง snapshot ของแดชบอร์ดเมื่อข้อมูลที่แสดงของผู้ใช้เปลี่ยน"""
+    user_id = instance.user_id
+    dashboard.invalidate(user_id)
+    # ล้างซ้ำหลัง commit เผื่อมีคำขออื่นสร้าง snapshot จากข้อมูลก่อน commit
+    transaction.on_commit(lambda: dashboard.invalidate(user_id))
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_entitlement(sender, instance, **kwargs):
+    """ล้างสิทธิ์ที่ cache ไว้เมื่อ subscription หรือข้อมูลส่วนตัวเปลี่ยน"""
+    user_id = instance.user_id
+    entitlements.invalidate(user_id)
+    transaction.on_commit(lambda: entitlements.invalidate(user_id))
+
+@receiver(subscriptions_expired)
+def invalidate_expired_subscribers(sender, user_ids, **kwargs):
+    """ล้าง cache ของผู้ใช้ที่ subscription ถูกเปลี่ยนเป็น expired โดยตัวเก็บกวาด"""
+    entitlements.invalidate_many(user_ids)
+    dashboard.invalidate_many(user_ids)
+
+# หมวดของ cache_versions ที่ต้องเพิ่มเวอร์ชันเมื่อโมเดลเปลี่ยน
+VERSION_SCOPES = {
+    Product: 'products',
+    SubscriptionPlan: 'subscription_plans',
+    Article: 'content',
+    Video: 'content',
+}
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def bump_cache_version(sender, **kwargs):
+    """เพิ่มเวอร์ชันของหมวดที่ข้อมูลเปลี่ยน (ล้าง cache ของ API และ ETag ของหน้าเว็บ)"""
+    scope = VERSION_SCOPES[sender]
+    transaction.on_commit(lambda: cache_versions.invalidate(scope))
+
+IMAGE_FIELD_NAMES = {
+    Product: 'image',
+    Article: 'image',
+    Recipe: 'image',
+    Content: 'image',
+    Video: 'thumbnail',
+}
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Content)
+@receiver(post_save, sender=Video)
+def queue_image_variants(sender, instance, update_fields=None, **kwargs):
+    """สร้างรูปย่อของรูปที่อัปโหลดใหม่ในคิวงาน (ไม่ย่อรูประหว่างคำขอ)"""
+    field = IMAGE_FIELD_NAMES[sender]
+    if update_fields is not None and field not in update_fields:
+        return
+    name = getattr(instance, field).name
+    if name and not images.has_variants(name):
+        # บันทึกซ้ำระหว่างรอ worker (หรือหลังงานล้มเหลว) ไม่เพิ่มงานซ้อนของรูปเดียวกัน
+        jobs.enqueue_once('generate_image_variants', name=name)
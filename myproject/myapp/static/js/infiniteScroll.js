@@ -0,0 +1,83 @@
+// /myproject/myapp/static/js/infiniteScroll.js
+
+/**
+ * Infinite scroll สำหรับรายการที่ใช้ keyset pagination (myapp/pagination.py)
+ *
+ * รายการต้องอยู่ในองค์ประกอบที่มี data-infinite-list และท้ายรายการมี
+ * <div data-infinite-next="?cursor=...&partial=1"> (partials/infinite_sentinel.html)
+ * เมื่อเลื่อนมาถึงจะดึง HTML ของหน้าถัดไปมาแทนที่ sentinel ตัวเดิม
+ */
+function setupInfiniteScroll() {
+  if (!('IntersectionObserver' in window) || !window.fetch) {
+    return; // ใช้ลิงก์ก่อนหน้า/ถัดไปตามปกติ
+  }
+
+  const observer = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+      if (entry.isIntersecting) {
+        loadNextPage(entry.target);
+      }
+    });
+  }, {
+    rootMargin: '400px 0px' // โหลดล่วงหน้าก่อนเลื่อนถึงท้ายรายการ
+  });
+
+  function observeSentinels(root) {
+    root.querySelectorAll('[data-infinite-next]').forEach(sentinel => {
+      observer.observe(sentinel);
+    });
+  }
+
+  function loadNextPage(sentinel) {
+    if (sentinel.dataset.loading) {
+      return;
+    }
+    sentinel.dataset.loading = '1';
+    observer.unobserve(sentinel);
+
+    fetch(sentinel.dataset.infiniteNext, {
+      headers: { 'X-Requested-With': 'XMLHttpRequest' },
+      credentials: 'same-origin'
+    })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.text();
+      })
+      .then(html => {
+        const parent = sentinel.parentNode;
+        const marker = sentinel.previousSibling;
+        sentinel.insertAdjacentHTML('afterend', html);
+        sentinel.remove();
+        observeSentinels(parent);
+        // ให้การ์ดใหม่แสดงผลโดยไม่ต้องรอ animation จาก base.html
+        let node = marker ? marker.nextSibling : parent.firstChild;
+        for (; node; node = node.nextSibling) {
+          if (node.classList && node.classList.contains('animate-on-scroll')) {
+            node.classList.add('visible');
+          }
+        }
+      })
+      .catch(() => {
+        // โหลดไม่สำเร็จ ให้ผู้ใช้ใช้ลิงก์ถัดไปแทน
+        delete sentinel.dataset.loading;
+        document.querySelectorAll('[data-infinite-fallback]').forEach(nav => {
+          nav.hidden = false;
+        });
+      });
+  }
+
+  const lists = document.querySelectorAll('[data-infinite-list]');
+  if (lists.length === 0) {
+    return;
+  }
+  lists.forEach(list => {
+    observeSentinels(list);
+  });
+  document.querySelectorAll('[data-infinite-fallback]').forEach(nav => {
+    nav.hidden = true;
+  });
+}
+
+document.addEventListener('DOMContentLoaded', setupInfiniteScroll);
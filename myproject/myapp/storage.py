@@ -0,0 +1,16 @@
+# myapp/storage.py
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """ไฟล์ static ชื่อมี hash และบีบอัดไว้ล่วงหน้า (collectstatic)
+
+    ไฟล์ที่ไม่มีอยู่จริง (เช่นรูป/วิดีโอ hero ที่ยังไม่ได้ใส่ใน repo) ใช้ชื่อเดิม
+    แทนการทำให้ทั้งหน้า error 500
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
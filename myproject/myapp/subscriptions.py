@@ -0,0 +1,124 @@
+# myapp/subscriptions.py
+"""
+ตัวเก็บกวาด subscription ที่หมดอายุ
+
+Subscription.save() เปลี่ยนสถานะเป็น 'expired' เฉพาะตอนที่แถวถูกบันทึก แถว 'active'
+ที่เลย end_date แล้วจึงค้างอยู่ ฟังก์ชันในโมดูลนี้ไล่หมดอายุแถวเหล่านั้นเป็นชุดเล็ก ๆ
+(keyset ตาม (end_date, id) บนดัชนีบางส่วน subscription_active_end_idx) โดยแต่ละชุดเป็น
+UPDATE แบบ set-based ใน transaction สั้น ๆ จึงไม่ล็อกตารางนานแม้มีหลายล้านแถว
+
+หลังแต่ละชุด commit จะส่ง signal subscriptions_expired พร้อม user_ids
+เพื่อให้ cache ที่เกี่ยวข้อง (สิทธิ์สมาชิก, แดชบอร์ด) ถูกล้าง
+"""
+import logging
+import threading
+import time
+
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Subscription
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# ส่งหลัง commit ของแต่ละชุด: user_ids คือ set ของผู้ใช้ที่มี subscription หมดอายุ
+subscriptions_expired = Signal()
+
+
+class SweepResult:
+    def __init__(self):
+        self.expired = 0
+        self.batches = 0
+        self.user_ids = set()
+
+    @property
+    def users(self):
+        return len(self.user_ids)
+
+    def __str__(self):
+        return f"expired={self.expired} batches={self.batches} users={self.users}"
+
+
+def _expire_batch(rows, now):
+    ids = [pk for pk, _, _ in rows]
+    with transaction.atomic():
+        # เงื่อนไขซ้ำใน UPDATE กันแถวที่ถูกต่ออายุระหว่างอ่านกับเขียน
+        expired = Subscription.objects.filter(
+            pk__in=ids, status='active', end_date__lt=now
+        ).update(status='expired')
+    return expired
+
+
+def expire_due_subscriptions(batch_size=DEFAULT_BATCH_SIZE, now=None, max_batches=None, pause=0):
+    """เปลี่ยนสถานะ subscription ที่ end_date < now เป็น 'expired' ทีละชุด
+
+    max_batches จำกัดจำนวนชุดต่อรอบ, pause คือเวลาพัก (วินาที) ระหว่างชุด
+    """
+    now = now or timezone.now()
+    result = SweepResult()
+    cursor = None
+    while max_batches is None or result.batches < max_batches:
+        due = Subscription.objects.filter(status='active', end_date__lt=now)
+        if cursor is not None:
+            end_date, pk = cursor
+            due = due.filter(Q(end_date__gt=end_date) | Q(end_date=end_date, pk__gt=pk))
+        rows = list(due.order_by('end_date', 'id').values_list('id', 'end_date', 'user_id')[:batch_size])
+        if not rows:
+            break
+
+        expired = _expire_batch(rows, now)
+        user_ids = {user_id for _, _, user_id in rows}
+        subscriptions_expired.send(sender=Subscription, user_ids=user_ids)
+
+        result.expired += expired
+        result.batches += 1
+        result.user_ids |= user_ids
+        last_id, last_end_date, _ = rows[-1]
+        cursor = (last_end_date, last_id)
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return result
+
+
+class PeriodicSweeper(threading.Thread):
+    """รัน expire_due_subscriptions ทุก interval วินาทีใน thread พื้นหลังของ process"""
+
+    def __init__(self, interval, batch_size=DEFAULT_BATCH_SIZE):
+        super().__init__(name='subscription-sweeper', daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                result = expire_due_subscriptions(batch_size=self.batch_size)
+                if result.expired:
+                    logger.info("subscription sweep: %s", result)
+            except Exception:
+                logger.exception("subscription sweep failed")
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self._stopped.set()
+
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def start_periodic_sweeper(interval, batch_size=DEFAULT_BATCH_SIZE):
+    """เริ่ม PeriodicSweeper หนึ่งตัวต่อ process (เรียกซ้ำได้)"""
+    global _sweeper
+    with _sweeper_lock:
+        if _sweeper is None or not _sweeper.is_alive():
+            _sweeper = PeriodicSweeper(interval, batch_size)
+            _sweeper.start()
+        return _sweeper
@@ -0,0 +1,54 @@
+# myapp/tasks.py
+"""
+ตัวจัดการงานเบื้องหลังที่รันผ่านคิวใน myapp/jobs.py (โหลดใน MyappConfig.ready)
+"""
+from django.core.files.storage import default_storage
+
+from . import images, jobs
+from .models import ExercisePlan, MealPlan, Order
+from .plan_store import generate_meal_plan, generate_workout_plan
+from .utils.promptpay import QR_CONTENT_TYPES, get_qr_image, order_promptpay_payload
+
+
+@jobs.task('generate_workout_plan')
+def generate_workout_plan_job(plan_id):
+    plan = ExercisePlan.objects.filter(pk=plan_id).first()
+    if plan is None:
+        # แผนถูกลบไปก่อนถึงคิว ไม่มีอะไรต้องทำ
+        return None
+    generate_workout_plan(plan)
+    return {'plan_id': plan.pk}
+
+
+@jobs.task('generate_meal_plan')
+def generate_meal_plan_job(plan_id):
+    plan = MealPlan.objects.filter(pk=plan_id).first()
+    if plan is None:
+        return None
+    generate_meal_plan(plan)
+    return {'plan_id': plan.pk}
+
+
+@jobs.task('render_promptpay_qr')
+def render_promptpay_qr_job(order_id):
+    """สร้างรูป QR ของคำสั่งซื้อเก็บไว้ใน cache กลางก่อนผู้ใช้เปิดหน้าคำสั่งซื้อ
+
+    มีผลเมื่อ CACHES เป็น cache ที่แชร์ระหว่าง process (เช่น Redis/Memcached)
+    """
+    order = Order.objects.filter(pk=order_id).first()
+    if order is None:
+        return None
+    payload = order_promptpay_payload(order)
+    for fmt in QR_CONTENT_TYPES:
+        get_qr_image(payload, fmt)
+    return {'payload': payload}
+
+
+@jobs.task('generate_image_variants')
+def generate_image_variants_job(name):
+    """รูปย่อ WebP/JPEG ของรูป name (ดู myapp/images.py)"""
+    if not default_storage.exists(name):
+        # รูปถูกแทนที่หรือลบไปแล้ว
+        return None
+    manifest = images.generate_variants(name)
+    return {'hash': manifest['hash'], 'widths': [width for width, url in manifest['variants']['image/jpeg']]}
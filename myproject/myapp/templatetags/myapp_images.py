@@ -0,0 +1,60 @@
+# myapp/templatetags/myapp_images.py
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..images import get_manifest, get_manifests, srcset
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 640px) 100vw, (max-width: 1024px) 50vw, 33vw'
+# ตัวแปรใน context ที่ prefetch_image_manifests เก็บ {ชื่อรูป: manifest} ไว้ให้ responsive_image
+MANIFESTS_CONTEXT_KEY = '_image_manifests'
+
+
+@register.simple_tag(takes_context=True)
+def prefetch_image_manifests(context, objects, field='image'):
+    """อ่าน manifest ของรูปในฟิลด์ field ของทุกอ็อบเจ็กต์ด้วย cache.get_many ครั้งเดียว
+
+    ใช้ก่อนวนแสดงรายการ แทนการอ่าน cache หนึ่งครั้งต่อการ์ด
+    Usage: {% prefetch_image_manifests products %} หรือ {% prefetch_image_manifests videos 'thumbnail' %}
+    """
+    names = [getattr(obj, field).name for obj in objects if getattr(obj, field)]
+    context[MANIFESTS_CONTEXT_KEY] = {**context.get(MANIFESTS_CONTEXT_KEY, {}), **get_manifests(names)}
+    return ''
+
+
+@register.simple_tag(takes_context=True)
+def responsive_image(context, image, alt='', sizes=DEFAULT_SIZES, css_class='', loading='lazy'):
+    """แท็ก <picture> พร้อม srcset ของรูปย่อ WebP/JPEG (ดู myapp/images.py)
+
+    ใช้รูปต้นฉบับไปก่อนถ้า worker ยังสร้างรูปย่อไม่เสร็จ
+    Usage: {% responsive_image product.image alt=product.name css_class="w-full h-full object-cover" %}
+    """
+    if not image:
+        return ''
+    prefetched = context.get(MANIFESTS_CONTEXT_KEY, {})
+    if image.name in prefetched:
+        manifest = prefetched[image.name]
+    else:
+        manifest = get_manifest(image.name)
+    if manifest is None:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">',
+            image.url, alt, css_class, loading,
+        )
+
+    variants = manifest['variants']
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((content_type, srcset(entries), sizes)
+         for content_type, entries in variants.items() if content_type != 'image/jpeg'),
+    )
+    fallback = variants['image/jpeg']
+    # รูป src สำรองสำหรับเบราว์เซอร์ที่ไม่รองรับ srcset: ขนาดกลาง ๆ
+    src = next((url for width, url in fallback if width >= 640), fallback[-1][1])
+    return format_html(
+        '<picture class="contents">{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" '
+        'class="{}" loading="{}" decoding="async"></picture>',
+        sources, src, srcset(fallback), sizes, manifest['width'], manifest['height'],
+        alt, css_class, loading,
+    )
@@ -1,3 +1,521 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import QueryDict
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import cart as cart_service
+from . import images, inventory, jobs, order_numbers, route_bench, urls
+from .jobs import Worker
+from .pagination import encode_cursor, paginate
+from .utils import promptpay
+from .search import SEARCH_ORDERING, ordering_for as search_ordering_for, search_products
+from .models import (
+    Article, DailyMeal, Exercise, ExercisePlan, Job, MealItem, MealPlan, Order, OrderItem, Product,
+    Recipe, StockReservation, Subscription, SubscriptionPlan, Video, WorkoutDay, WorkoutExercise,
+)
+
+
+class CartBadgeCacheTests(TestCase):
+    """cart_items_count ต้องไม่ยิง query เพิ่มเมื่อค่ามีอยู่ใน cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('member', 'member@example.com', 'pass1234')
+        self.product = Product.objects.create(name='Dumbbell', description='5kg', price=500, stock=10)
+        self.client.force_login(self.user)
+
+    def _faq_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('faq'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_faq_query_count_matches_session_auth_baseline(self):
+        processors = [
+            'django.template.context_processors.request',
+            'django.contrib.auth.context_processors.auth',
+            'django.contrib.messages.context_processors.messages',
+        ]
+        with override_settings(TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'APP_DIRS': True,
+            'OPTIONS': {'context_processors': processors},
+        }]):
+            baseline = self._faq_queries()
+
+        self.client.get(reverse('add_to_cart', args=[self.product.id]))
+        self._faq_queries()  # เติม cache
+        self.assertEqual(self._faq_queries(), baseline)
+
+    def test_count_follows_cart_changes(self):
+        # การล้าง cache ผูกกับ transaction.on_commit ซึ่ง TestCase ไม่เคย commit จริง
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('add_to_cart', args=[self.product.id]))
+            self.client.get(reverse('add_to_cart', args=[self.product.id]))
+        response = self.client.get(reverse('faq'))
+        self.assertEqual(response.context['cart_items_count'], 2)
+
+        item = self.product.orderitem_set.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('update_cart_item', args=[item.id]), {'action': 'decrease'})
+        response = self.client.get(reverse('faq'))
+        self.assertEqual(response.context['cart_items_count'], 1)
+
+        self.client.post(reverse('checkout'))
+        response = self.client.get(reverse('faq'))
+        self.assertEqual(response.context['cart_items_count'], 0)
+
+
+class CartServiceTests(TestCase):
+    """การแก้ไขตะกร้าต้องใช้ query คงที่และยอดรวมต้องถูกต้อง"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('shopper', 'shopper@example.com', 'pass1234')
+        self.products = [
+            Product.objects.create(name=f'Product {i}', description='-', price=Decimal('10.50') * (i + 1))
+            for i in range(21)
+        ]
+
+    def _queries(self, fn, *args):
+        with CaptureQueriesContext(connection) as ctx:
+            fn(*args)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_cart_size(self):
+        cart_service.add_item(self.user, self.products[0])
+        small = self._queries(cart_service.add_item, self.user, self.products[0])
+        for product in self.products[1:20]:
+            cart_service.add_item(self.user, product)
+        large = self._queries(cart_service.add_item, self.user, self.products[0])
+        self.assertEqual(small, large)
+
+        item = cart_service.get_cart(self.user).items.get(product=self.products[0])
+        self.assertEqual(self._queries(cart_service.change_item_quantity, self.user, item.id, -1), small)
+
+    def test_total_tracks_line_changes(self):
+        first, second = self.products[0], self.products[1]
+        cart_service.add_item(self.user, first)
+        cart_service.add_item(self.user, first)
+        cart_service.add_item(self.user, second)
+        cart = Order.objects.get(user=self.user, status='pending')
+        self.assertEqual(cart.items.count(), 2)
+        self.assertEqual(cart.total_amount, first.price * 2 + second.price)
+
+        line = cart.items.get(product=first)
+        self.assertEqual(cart_service.change_item_quantity(self.user, line.id, -1), 1)
+        self.assertEqual(cart_service.change_item_quantity(self.user, line.id, -1), 0)
+        self.assertTrue(cart_service.remove_item(self.user, cart.items.get().id))
+        self.assertFalse(cart_service.remove_item(self.user, line.id))
+
+        cart.refresh_from_db()
+        self.assertEqual(cart.total_amount, 0)
+        self.assertFalse(cart.items.exists())
+
+    @override_settings(CART_IDLE_DAYS=30)
+    def test_worker_cancels_idle_carts(self):
+        cart_service.add_item(self.user, self.products[0])
+        cart = cart_service.get_cart(self.user)
+        Order.objects.filter(pk=cart.pk).update(updated_at=timezone.now() - timedelta(days=31))
+        Worker(once=True).run()
+        cart.refresh_from_db()
+        self.assertEqual(cart.status, 'cancelled')
+        self.assertIsNone(cart_service.get_cart(self.user))
+
+
+class InventoryTests(TestCase):
+    """การตัด/จอง/คืนสต็อกตอน checkout (myapp.inventory)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('buyer', 'buyer@example.com', 'pass1234')
+        self.plenty = Product.objects.create(name='Plenty', description='-', price=100, stock=5)
+        self.scarce = Product.objects.create(name='Scarce', description='-', price=50, stock=1)
+
+    def _cart(self, *lines):
+        for product, quantity in lines:
+            cart_service.add_item(self.user, product, quantity)
+        return cart_service.get_cart(self.user)
+
+    def _stock(self):
+        return list(Product.objects.filter(pk__in=[self.plenty.pk, self.scarce.pk])
+                    .order_by('pk').values_list('stock', flat=True))
+
+    def test_out_of_stock_leaves_every_line_untouched(self):
+        cart = self._cart((self.plenty, 2), (self.scarce, 2))
+        with self.assertRaises(inventory.OutOfStock) as raised:
+            inventory.place_order(cart.id)
+        self.assertEqual(raised.exception.product_name, 'Scarce')
+        self.assertEqual(self._stock(), [5, 1])
+        cart.refresh_from_db()
+        self.assertEqual(cart.status, 'pending')
+
+    def test_place_order_uses_reservation(self):
+        cart = self._cart((self.plenty, 2), (self.scarce, 1))
+        self.assertIsNotNone(inventory.reserve(cart.id))
+        self.assertEqual(self._stock(), [3, 0])
+        order = inventory.place_order(cart.id)
+        self.assertEqual(order.status, 'paid')
+        self.assertEqual(self._stock(), [3, 0])
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_release_restores_stock(self):
+        cart = self._cart((self.plenty, 2), (self.scarce, 1))
+        inventory.reserve(cart.id)
+        self.assertTrue(inventory.release(cart.id))
+        self.assertEqual(self._stock(), [5, 1])
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_worker_releases_expired_reservations(self):
+        cart = self._cart((self.plenty, 3))
+        inventory.reserve(cart.id)
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        Worker(once=True).run()
+        self.assertEqual(self._stock(), [5, 1])
+        self.assertFalse(StockReservation.objects.exists())
+
+
+class OrderNumberTests(TestCase):
+    """หมายเลขคำสั่งซื้อและเลขพัสดุถูกเขียนใน INSERT เดียว และไม่ชนกันไม่ว่าจะสร้างทางไหน"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('orderer', 'orderer@example.com', 'pass1234')
+
+    def test_create_issues_a_single_insert(self):
+        order_numbers.next_id()  # จองชุด id ไว้ก่อน ไม่ให้ nextval ปนในการนับ
+        with CaptureQueriesContext(connection) as ctx:
+            order = Order.objects.create(user=self.user, total_amount=0, status='paid')
+        table = Order._meta.db_table
+        writes = [query['sql'] for query in ctx.captured_queries if table in query['sql']]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith('INSERT'))
+        order.refresh_from_db()
+        self.assertEqual(order.order_number, order_numbers.order_number(order.pk))
+        self.assertEqual(order.tracking_number, order_numbers.tracking_number(order.pk))
+
+    def test_explicit_pk_gets_numbers(self):
+        for order_id in order_numbers.reserve_ids(2):
+            order = Order.objects.create(pk=order_id, user=self.user, total_amount=0, status='paid')
+            self.assertEqual(order.tracking_number, order_numbers.tracking_number(order_id))
+
+    def test_bulk_create_without_assign_does_not_collide(self):
+        orders = Order.objects.bulk_create([
+            Order(user=self.user, total_amount=0, status='paid') for _ in range(2)
+        ])
+        self.assertEqual(len(orders), 2)
+        self.assertEqual(Order.objects.filter(tracking_number__isnull=True).count(), 2)
+
+
+class JobWorkerTests(TestCase):
+    """worker ของคิวงาน (myapp.jobs) ต้องทำงานต่อได้แม้งานรอบใดรอบหนึ่ง error"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('planner', 'planner@example.com', 'pass1234')
+        Recipe.objects.create(
+            name='Salad', description='-', instructions='-', prep_time=5, cook_time=0,
+            calories_per_serving=300, protein=10, carbs=20, fat=5, meal_type='lunch',
+        )
+
+    def test_failing_periodic_task_does_not_stop_worker(self):
+        calls = []
+
+        def broken():
+            raise RuntimeError('boom')
+
+        periodic = (('broken', 60, broken), ('after broken', 60, lambda: calls.append('ran')))
+        plan = MealPlan.objects.create(user=self.user, goal='general_health')
+        job = jobs.enqueue('generate_meal_plan', user=self.user, plan_id=plan.pk)
+        with mock.patch.object(jobs, 'PERIODIC_TASKS', periodic), self.assertLogs('myapp.jobs', 'ERROR'):
+            Worker(once=True).run()
+        self.assertEqual(calls, ['ran'])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertTrue(DailyMeal.objects.filter(meal_plan=plan).exists())
+
+
+class ImageVariantTests(TestCase):
+    """คิวงานรูปย่อไม่ซ้อนกัน และหน้ารายการอ่าน manifest จาก cache ครั้งเดียวทั้งหน้า"""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def _product(self, name):
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600), (200, 80, 40)).save(buffer, format='PNG')
+        image = SimpleUploadedFile(f'{name}.png', buffer.getvalue(), content_type='image/png')
+        return Product.objects.create(name=name, description='-', price=100, image=image)
+
+    def test_resave_does_not_queue_duplicate_jobs(self):
+        product = self._product('Kettlebell')
+        product.save()
+        product.save(update_fields=['image'])
+        self.assertEqual(Job.objects.filter(kind='generate_image_variants').count(), 1)
+
+    def test_list_partial_reads_manifests_once(self):
+        products = [self._product(f'Band {i}') for i in range(3)]
+        images.generate_variants(products[0].image.name)
+        with mock.patch('myapp.templatetags.myapp_images.get_manifest') as get_manifest:
+            html = render_to_string('myapp/partials/product_items.html', {'products': products})
+        get_manifest.assert_not_called()
+        self.assertEqual(html.count('<picture'), 1)
+        self.assertEqual(html.count('<img'), 3)
+
+
+class PromptPayQrTests(TestCase):
+    """endpoint รูป QR สาธารณะรับเฉพาะ payload ที่ qr_url ลงลายเซ็นไว้"""
+
+    def setUp(self):
+        cache.clear()
+        promptpay._qr_images.clear()
+        self.payload = promptpay.generate_promptpay_payload(mobile='0812345678', amount=Decimal('250.00'))
+
+    def test_signed_url_serves_image(self):
+        response = self.client.get(promptpay.qr_url(self.payload, 'svg'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+
+    def test_forged_payload_is_not_rendered_or_cached(self):
+        forged = promptpay.generate_promptpay_payload(mobile='0899999999', amount=Decimal('1.00'))
+        kwargs = promptpay.qr_url_kwargs(self.payload, 'png')
+        kwargs['payload'] = forged
+        response = self.client.get(reverse('promptpay_qr', kwargs=kwargs))
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(cache.get(f"promptpay:qr:png:{promptpay.payload_digest(forged)}"))
+
+
+class ProductSearchTests(TestCase):
+    """คำค้นที่ไม่มีโทเคน (ช่องว่าง, เครื่องหมายล้วน) ต้องได้ผลว่าง ไม่ใช่ error"""
+
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(name='Yoga mat', description='-', price=100)
+
+    def test_blank_query_can_be_ordered_by_rank(self):
+        for text in (' ', '!!!'):
+            with self.subTest(text=text):
+                self.assertEqual(list(search_products(Product.objects.all(), text).order_by(*SEARCH_ORDERING)), [])
+
+    def test_blank_query_page_renders(self):
+        for text in (' ', '!!!'):
+            with self.subTest(text=text):
+                response = self.client.get(reverse('product_list'), {'q': text})
+                self.assertEqual(response.status_code, 200)
+
+
+class KeysetPaginationTests(TestCase):
+    """cursor ที่เสียหายหรือมีค่าผิดชนิดต้องได้หน้าแรก ไม่ใช่ error"""
+
+    ORDERING = ('-created_at', '-id')
+
+    def setUp(self):
+        for i in range(3):
+            Product.objects.create(name=f'Paged {i}', description='-', price=10)
+
+    def _page(self, cursor, per_page=2):
+        params = QueryDict(mutable=True)
+        params['cursor'] = cursor
+        return paginate(Product.objects.all(), self.ORDERING, params, per_page=per_page)
+
+    def test_valid_cursor_moves_to_next_page(self):
+        first = self._page('')
+        second = self._page(first.next_cursor)
+        self.assertEqual(len(second), 1)
+        self.assertTrue(second.has_previous)
+
+    def test_bad_values_fall_back_to_first_page(self):
+        first = [product.pk for product in self._page('')]
+        for values in (['garbage', 'x'], [{'a': 1}, 1], [None, 1], ['2026-01-01T00:00:00+00:00'], 'abc'):
+            with self.subTest(values=values):
+                page = self._page(encode_cursor('next', values))
+                self.assertEqual([product.pk for product in page], first)
+                self.assertFalse(page.has_previous)
+
+    def test_cursor_walks_search_results_once(self):
+        Product.objects.create(name='Other', description='-', price=10)
+        ordering = search_ordering_for('paged', self.ORDERING)
+        self.assertEqual(ordering, SEARCH_ORDERING)
+        queryset = search_products(Product.objects.all(), 'paged')
+        seen, params = [], QueryDict(mutable=True)
+        while True:
+            page = paginate(queryset, ordering, params, per_page=2)
+            seen.extend(product.name for product in page)
+            if not page.has_next:
+                break
+            params['cursor'] = page.next_cursor
+        self.assertEqual(sorted(seen), ['Paged 0', 'Paged 1', 'Paged 2'])
+
+    def test_query_without_tokens_uses_default_ordering(self):
+        for text in ('', ' ', '!!!'):
+            with self.subTest(text=text):
+                self.assertEqual(search_ordering_for(text, self.ORDERING), self.ORDERING)
+
+
+class ApiQueryBudgetTests(TestCase):
+    """list ของทุก endpoint ใน API ต้องใช้ query จำนวนคงที่ไม่ว่าจะมีกี่แถว"""
+
+    # จำนวน query สูงสุดต่อคำขอ (รวม session/ผู้ใช้/สิทธิ์สมาชิก เมื่อ cache ว่าง)
+    BUDGETS = {
+        'api-product-list': 3,
+        'api-subscription-plan-list': 3,
+        'api-article-list': 3,
+        'api-video-list': 3,
+        'api-exercise-plan-list': 7,
+        'api-meal-plan-list': 7,
+        'api-order-list': 4,
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('api', 'api@example.com', 'pass1234')
+        plan = SubscriptionPlan.objects.create(name='Monthly', description='-', price=199)
+        Subscription.objects.create(user=self.user, plan=plan,
+                                    end_date=timezone.now() + timedelta(days=30))
+        self.exercise = Exercise.objects.create(
+            name='Squat', description='-', muscle_group='legs', difficulty='beginner', instructions='-'
+        )
+        self.recipe = Recipe.objects.create(
+            name='Salad', description='-', instructions='-', prep_time=5, cook_time=0,
+            calories_per_serving=300, protein=10, carbs=20, fat=5, meal_type='lunch',
+        )
+        self.client.force_login(self.user)
+        self.add_rows(2)
+
+    def add_rows(self, count):
+        for i in range(count):
+            n = Product.objects.count()
+            product = Product.objects.create(name=f'Product {n}', description='-', price=100)
+            SubscriptionPlan.objects.create(name=f'Plan {n}', description='-', price=100 + n)
+            Article.objects.create(title=f'Article {n}', slug=f'article-{n}', content='-',
+                                   category='exercise', author=self.user)
+            Video.objects.create(title=f'Video {n}', description='-', video_url='https://example.com',
+                                 thumbnail='video_thumbnails/x.jpg', category='beginner', duration=60)
+
+            exercise_plan = ExercisePlan.objects.create(user=self.user, goal='general_fitness',
+                                                        level='beginner')
+            for day in range(1, 4):
+                workout_day = WorkoutDay.objects.create(exercise_plan=exercise_plan, day_number=day,
+                                                        focus='full_body')
+                WorkoutExercise.objects.create(workout_day=workout_day, exercise=self.exercise)
+
+            meal_plan = MealPlan.objects.create(user=self.user, goal='general_health')
+            for day in range(1, 4):
+                daily_meal = DailyMeal.objects.create(meal_plan=meal_plan, day_number=day)
+                MealItem.objects.create(daily_meal=daily_meal, recipe=self.recipe, meal_time='lunch')
+
+            order = Order.objects.create(user=self.user, total_amount=100, status='paid',
+                                         tracking_number=f'TRK-{n}')
+            OrderItem.objects.create(order=order, product=product, price=100)
+
+    def _queries(self, name, **params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200, name)
+        return len(ctx.captured_queries), response.json()
+
+    def test_list_query_count_is_constant(self):
+        small = {name: self._queries(name)[0] for name in self.BUDGETS}
+        self.add_rows(5)
+        for name, budget in self.BUDGETS.items():
+            with self.subTest(endpoint=name):
+                large, data = self._queries(name)
+                self.assertGreaterEqual(len(data['results']), 7)
+                self.assertEqual(large, small[name])
+                self.assertLessEqual(large, budget)
+
+    def test_sparse_fields_skip_nested_prefetch(self):
+        full, _ = self._queries('api-exercise-plan-list')
+        sparse, data = self._queries('api-exercise-plan-list', fields='id,goal')
+        self.assertEqual(set(data['results'][0]), {'id', 'goal'})
+        self.assertLess(sparse, full)
+
+    def test_cursor_walks_every_row_once(self):
+        self.add_rows(3)
+        seen, params = [], {'page_size': 2}
+        while True:
+            _, data = self._queries('api-order-list', **params)
+            seen.extend(row['id'] for row in data['results'])
+            if not data['next']:
+                break
+            params = {'page_size': 2, 'cursor': data['next'].split('cursor=')[1].split('&')[0]}
+        self.assertEqual(sorted(seen), sorted(Order.objects.values_list('id', flat=True)))
+
+    def test_product_search(self):
+        _, data = self._queries('api-product-list', q='product 1')
+        self.assertEqual([row['name'] for row in data['results']], ['Product 1'])
+        for text in (' ', '!!!'):
+            with self.subTest(q=text):
+                _, data = self._queries('api-product-list', q=text)
+                self.assertEqual(data['results'], [])
+
+    def test_etag_returns_not_modified(self):
+        url = reverse('api-product-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # คำตอบถูก cache ไว้แล้ว เหลือเพียง session และผู้ใช้
+        self.assertLessEqual(len(ctx.captured_queries), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name='New product', description='-', price=1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_plans_require_active_subscription(self):
+        Subscription.objects.filter(user=self.user).update(end_date=timezone.now() - timedelta(days=1))
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('api-meal-plan-list')).status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api-order-list')).status_code, 403)
+
+
+class RouteQueryBudgetTests(TestCase):
+    """ทุกหน้าใน myapp/urls.py ต้องอยู่ในงบ query ของ route_bench.ROUTES และไม่โตตามจำนวนแถว"""
+
+    def setUp(self):
+        cache.clear()
+        self.dataset = route_bench.seed_dataset(rows=2)
+
+    def test_every_named_route_has_a_budget(self):
+        names = {pattern.name for pattern in urls.urlpatterns if getattr(pattern, 'name', None)}
+        self.assertEqual(names - {route.name for route in route_bench.ROUTES}, set())
+
+    def test_product_search_variants_are_measured(self):
+        keys = {route.key for route in route_bench.ROUTES}
+        self.assertLessEqual({'product_list[search]', 'product_list[search-no-tokens]'}, keys)
+        self.assertEqual(len(keys), len(route_bench.ROUTES))
+
+    def test_routes_stay_within_budget(self):
+        small = {}
+        for route in route_bench.ROUTES:
+            for persona in route_bench.PERSONAS:
+                status, queries, _ = route_bench.measure(self.dataset, route, persona)
+                small[route.key, persona] = queries
+                with self.subTest(route=route.key, persona=persona):
+                    self.assertLess(status, 500)
+                    self.assertLessEqual(queries, route.budget(persona))
+
+        route_bench.add_rows(self.dataset, 5)
+        for route in route_bench.ROUTES:
+            for persona in route_bench.PERSONAS:
+                _, queries, _ = route_bench.measure(self.dataset, route, persona)
+                with self.subTest(route=route.key, persona=persona, rows='large'):
+                    self.assertEqual(queries, small[route.key, persona])
@@ -1,6 +1,7 @@
-from django.urls import path
+from django.urls import include, path, re_path
 from django.contrib.auth import views as auth_views
 from . import views
+from .utils import promptpay
 
 # ไม่ต้องมี app_name = 'myapp' เพื่อหลีกเลี่ยงปัญหาการใช้ URL namespaces
 # ถ้าเทมเพลตไม่ได้ถูกเขียนให้รองรับ namespaces
@@ -29,6 +30,7 @@ urlpatterns = [
     path('cart/update/<int:item_id>/', views.update_cart_item, name='update_cart_item'),
     path('checkout/', views.checkout, name='checkout'),
     path('orders/<int:order_id>/pay/', views.pay_order, name='pay_order'),
+    re_path(r'^qr/promptpay/(?P<signature>[0-9a-f]{32})/(?P<payload>[0-9A-Z.]+)\.(?P<fmt>png|svg)$', promptpay.qr_image_view, name='promptpay_qr'),
 
     
     # แดชบอร์ดและคอนเทนต์
@@ -58,6 +60,10 @@ urlpatterns = [
     path('meal-plan/day/<int:meal_id>/', views.view_daily_meal, name='view_daily_meal'),
     path('recipe/<int:recipe_id>/', views.view_recipe, name='view_recipe'),
 
+    # งานเบื้องหลัง (สร้างแผน ฯลฯ)
+    path('jobs/<int:job_id>/', views.job_wait, name='job_wait'),
+    path('jobs/<int:job_id>/status/', views.job_status, name='job_status'),
+
     # ประวัติการสั่งซื้อ
     path('orders/', views.order_history, name='order_history'),
     path('orders/<int:order_id>/', views.order_detail, name='order_detail'),
@@ -73,4 +79,7 @@ urlpatterns = [
     path('contact/', views.contact_view, name='contact'),
     path('faq/', views.faq, name='faq'),
     path('terms/', views.terms, name='terms'),
+
+    # API สำหรับแอปมือถือ (อ่านอย่างเดียว)
+    path('api/v1/', include('myapp.api.urls')),
 ]
@@ -0,0 +1,32 @@
+# utils/benchmark.py
+import time
+
+
+def percentile(samples, pct):
+    """ค่าเปอร์เซ็นไทล์แบบ nearest-rank ของรายการตัวเลข"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def time_call(fn, *args, **kwargs):
+    """เรียกฟังก์ชันหนึ่งครั้งแล้วคืนเวลาที่ใช้ (มิลลิวินาที)"""
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+def summarize(samples):
+    return {
+        'n': len(samples),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'max': max(samples) if samples else 0.0,
+    }
+
+
+def format_summary(label, samples):
+    stats = summarize(samples)
+    return f"{label:<28} n={stats['n']:<5} p50={stats['p50']:8.2f}ms p95={stats['p95']:8.2f}ms max={stats['max']:8.2f}ms"
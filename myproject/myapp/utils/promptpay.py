@@ -1,8 +1,20 @@
 # utils/promptpay.py
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
 import libscrc
 import qrcode
+import qrcode.image.svg
 from io import BytesIO
 from PIL import Image
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
 
 def _format_tlv(tag: str, value: str) -> str:
     length_str = f"{len(value):02d}"
@@ -29,6 +41,10 @@ def generate_promptpay_payload(mobile: str, amount: float) -> str:
     crc = calculate_crc(full_payload)
     return full_payload + crc
 
+def order_promptpay_payload(order) -> str:
+    """payload PromptPay สำหรับชำระคำสั่งซื้อ (ใช้ทั้งหน้าแสดงผลและงานสร้าง QR ล่วงหน้า)"""
+    return generate_promptpay_payload(mobile="0812345678", amount=order.total_amount)
+
 def generate_qr_image(payload: str) -> BytesIO:
     qr = qrcode.QRCode(box_size=8, border=4)
     qr.add_data(payload)
@@ -38,3 +54,121 @@ def generate_qr_image(payload: str) -> BytesIO:
     img.save(buffer, format='PNG')
     buffer.seek(0)
     return buffer
+
+
+# ---------------------------------------------------------------------------
+# QR image endpoint
+#
+# รูป QR ขึ้นกับ payload อย่างเดียว URL จึงมี payload อยู่ในตัว และ key ของ cache/ETag
+# คือ hash ของ payload: รูปที่สร้างแล้วไม่มีวันเปลี่ยน เบราว์เซอร์เก็บไว้ได้ตลอด
+# URL มีลายเซ็น (HMAC ด้วย SECRET_KEY) ของ payload ที่ qr_url ออกให้ endpoint สาธารณะ
+# จึงไม่สร้าง/เก็บรูปของ payload ที่คนนอกแต่งขึ้นเองลง cache กลาง
+# ---------------------------------------------------------------------------
+
+QR_CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+# PromptPay payload มีแต่ตัวเลข, อักษรพิมพ์ใหญ่ และจุด (ยอดเงิน)
+PAYLOAD_RE = re.compile(r'^[0-9A-Z.]{1,512}$')
+QR_LRU_SIZE = 128
+QR_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+QR_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class LRUCache:
+    """cache ในหน่วยความจำของ process ที่จำกัดจำนวนรายการ (ทิ้งรายการที่ใช้ล่าสุดนานที่สุด)"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_qr_images = LRUCache(QR_LRU_SIZE)
+
+
+def is_valid_payload(payload: str) -> bool:
+    """ตรวจรูปแบบและ CRC เพื่อไม่ให้ endpoint ถูกใช้สร้าง QR ของข้อมูลอื่น"""
+    if not PAYLOAD_RE.match(payload) or len(payload) < 8 or payload[-8:-4] != "6304":
+        return False
+    return calculate_crc(payload[:-4]) == payload[-4:]
+
+
+def payload_signature(payload: str) -> str:
+    return salted_hmac('myapp.promptpay.qr', payload).hexdigest()[:32]
+
+
+def is_signed_payload(payload: str, signature: str) -> bool:
+    return constant_time_compare(payload_signature(payload), signature) and is_valid_payload(payload)
+
+
+def payload_digest(payload: str) -> str:
+    return hashlib.sha256(payload.encode('ascii')).hexdigest()[:32]
+
+
+def generate_qr_svg(payload: str) -> bytes:
+    qr = qrcode.QRCode(box_size=8, border=4, image_factory=qrcode.image.svg.SvgPathImage)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    buffer = BytesIO()
+    qr.make_image().save(buffer)
+    return buffer.getvalue()
+
+
+def get_qr_image(payload: str, fmt: str = 'svg') -> bytes:
+    """รูป QR ของ payload: LRU ของ process ก่อน แล้วจึงเป็น cache กลาง และสร้างใหม่เมื่อไม่พบ"""
+    key = f"promptpay:qr:{fmt}:{payload_digest(payload)}"
+    content = _qr_images.get(key)
+    if content is None:
+        content = cache.get(key)
+        if content is None:
+            if fmt == 'png':
+                content = generate_qr_image(payload).getvalue()
+            else:
+                content = generate_qr_svg(payload)
+            cache.set(key, content, QR_CACHE_TIMEOUT)
+        _qr_images.set(key, content)
+    return content
+
+
+def qr_url_kwargs(payload: str, fmt: str = 'svg') -> dict:
+    return {'signature': payload_signature(payload), 'payload': payload, 'fmt': fmt}
+
+
+def qr_url(payload: str, fmt: str = 'svg') -> str:
+    return reverse('promptpay_qr', kwargs=qr_url_kwargs(payload, fmt))
+
+
+def _qr_etag(request, signature, payload, fmt):
+    if not is_signed_payload(payload, signature):
+        return None
+    return f"{fmt}-{payload_digest(payload)}"
+
+
+@require_GET
+@cache_control(public=True, max_age=QR_MAX_AGE, immutable=True)
+@condition(etag_func=_qr_etag)
+def qr_image_view(request, signature, payload, fmt):
+    """ส่งรูป QR (png/svg) ของ payload ที่ลงลายเซ็นแล้ว; ตอบ 304 เมื่อ If-None-Match ตรงกับ ETag"""
+    if fmt not in QR_CONTENT_TYPES or not is_signed_payload(payload, signature):
+        raise Http404("Invalid PromptPay payload")
+    return HttpResponse(get_qr_image(payload, fmt), content_type=QR_CONTENT_TYPES[fmt])
@@ -4,7 +4,7 @@ from .models import (
     UserProfile, ExercisePlan, WorkoutDay, MealPlan, DailyMeal, 
     Exercise, WorkoutExercise, Recipe, Ingredient, MealItem,
     ForumTopic, ForumThread, Article, Video, Content,
-    Product, Order, OrderItem, SubscriptionPlan, Subscription
+    Product, Order, OrderItem, SubscriptionPlan, Subscription, Progress, NutritionPlan, Job, Wishlist
 )
 from .forms import UserProfileForm, ExercisePlanForm, MealPlanForm, NutritionPreferencesForm
 from .forms import CustomUserCreationForm
@@ -17,10 +17,19 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, DetailView
 from django.db.models import Q, Sum
 from django.utils import timezone
-from itertools import cycle
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme, urlencode
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
 from allauth.socialaccount.models import SocialAccount
-from .utils.promptpay import generate_promptpay_payload, generate_qr_image
-from django.http import HttpResponse
+from .utils.promptpay import order_promptpay_payload, qr_url
+from .search import ordering_for as search_ordering_for, search_products
+from .pagination import KeysetPaginationMixin, paginate
+from .conditional import conditional_page, content_hash, version_validator
+from . import cart as cart_service
+from . import dashboard, forum, inventory, jobs
+from .entitlements import subscription_required
+from django.http import HttpResponse, Http404, JsonResponse
 from django.core.files.base import ContentFile
 from .models import Order
 from collections import defaultdict
@@ -106,28 +115,38 @@ def home(request):
     return render(request, 'myapp/home.html', context)
 
 # Product List View
-class ProductListView(ListView):
+@method_decorator(conditional_page(version_validator('products')), name='dispatch')
+class ProductListView(KeysetPaginationMixin, ListView):
     model = Product
     template_name = 'myapp/product_list.html'
+    partial_template_name = 'myapp/partials/product_items.html'
     context_object_name = 'products'
+    per_page = 24
+
+    def get_keyset_ordering(self):
+        # ผลการค้นหาเรียงตามคะแนนความเกี่ยวข้องก่อน
+        return search_ordering_for(self.request.GET.get('q'), ('-created_at', '-id'))
     
     def get_queryset(self):
         queryset = super().get_queryset().filter(is_active=True).order_by('-created_at')
         query = self.request.GET.get('q')  # Get the search term from the URL
         if query:
-            # Filter products where name or description contains the query (case-insensitive)
-            queryset = queryset.filter(
-                Q(name__icontains=query) | Q(description__icontains=query)
-            )
+            # Full-text search with ranking (see myapp.search)
+            queryset = search_products(queryset, query)
         return queryset
 
+def _product_validator(request, pk):
+    return Product.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+
 # Product Detail View
+@method_decorator(conditional_page(_product_validator), name='dispatch')
 class ProductDetailView(DetailView):
     model = Product
     template_name = 'myapp/product_detail.html'
     context_object_name = 'product'
 
 # Subscription Plan List View
+@method_decorator(conditional_page(version_validator('subscription_plans')), name='dispatch')
 class SubscriptionPlanListView(ListView):
     model = SubscriptionPlan
     template_name = 'myapp/subscription_list.html'
@@ -137,6 +156,7 @@ class SubscriptionPlanListView(ListView):
         return super().get_queryset().filter(is_active=True)
 
 # Subscription Detail View
+@method_decorator(conditional_page(version_validator('subscription_plans')), name='dispatch')
 class SubscriptionDetailView(DetailView):
     model = SubscriptionPlan
     template_name = 'myapp/subscription_detail.html'
@@ -155,50 +175,21 @@ class UserSubscriptionListView(LoginRequiredMixin, ListView):
 @login_required
 def add_to_cart(request, product_id):
     product = get_object_or_404(Product, id=product_id)
+    if product.stock < 1:
+        # ตรวจคร่าว ๆ เพื่อแจ้งผู้ใช้ทันที สต็อกถูกตัดจริงตอน checkout (myapp.inventory)
+        messages.error(request, f'สินค้า {product.name} หมดแล้ว')
+        return redirect('product_detail', pk=product.pk)
     
-    # Get or create order with 'pending' status (cart)
-    order, created = Order.objects.get_or_create(
-        user=request.user,
-        status='pending',
-        defaults={'total_amount': 0,
-                  'shipping_fee': 0,
-                  'tracking_number': 'TEMP' }
-    )
-    
-    # If order was just created, set initial total_amount
-    if created:
-        order.total_amount = 0
-        order.save()
-    
-    # Check if item already in cart, if so increase quantity
-    try:
-        order_item = OrderItem.objects.get(order=order, product=product)
-        order_item.quantity += 1
-        order_item.save()
-    except OrderItem.DoesNotExist:
-        # Create new order item
-        order_item = OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=1,
-            price=product.price
-        )
-    
-    # Update order total
-    order.total_amount = sum(item.price * item.quantity for item in order.items.all())
-    order.save()
+    # เพิ่มสินค้า (หรือเพิ่มจำนวนถ้ามีอยู่แล้ว) และปรับยอดรวมใน transaction เดียว
+    cart_service.add_item(request.user, product)
     
     return redirect('cart')
 
 # View Cart (FBV)
 @login_required
 def view_cart(request):
-    try:
-        cart = Order.objects.get(user=request.user, status='pending')
-        items = cart.items.all()
-    except Order.DoesNotExist:
-        cart = None
-        items = []
+    cart = cart_service.get_cart(request.user)
+    items = cart.items.select_related('product') if cart else []
     
     context = {
         'cart': cart,
@@ -239,59 +230,31 @@ def subscribe(request, plan_id):
 def user_dashboard(request):
     """หน้าแดชบอร์ดผู้ใช้"""
     user = request.user
+    snapshot = dashboard.get_snapshot(user)
     
     # Check if user profile is complete
-    try:
-        user_profile = UserProfile.objects.get(user=user)
-        profile_complete = user_profile.has_completed_profile
-    except UserProfile.DoesNotExist:
+    user_profile = snapshot['user_profile']
+    if user_profile is None:
         # Create profile if it doesn't exist
         user_profile = UserProfile.objects.create(user=user)
-        profile_complete = False
     
     # If profile is not complete, redirect to profile setup with message
-    if not profile_complete:
+    if not user_profile.has_completed_profile:
         messages.info(request, 'กรุณากรอกข้อมูลส่วนตัวเพื่อปรับแต่งแดชบอร์ดของคุณ')
         return redirect('profile_setup')
     
-    # Check if user has an active subscription
-    active_subscription = Subscription.objects.filter(
-        user=user, 
-        status='active', 
-        end_date__gte=timezone.now().date()
-    ).first()
-    
+    active_subscription = snapshot['active_subscription']
     if active_subscription:
         # Calculate remaining days
         remaining_days = (active_subscription.end_date.date() - timezone.now().date()).days
         active_subscription.remaining_days = max(0, remaining_days)
     
-    # Get recent orders
-    recent_orders = Order.objects.filter(user=user).order_by('-created_at')[:5]
-    
-    # Get exercise and meal plans
-    exercise_plan = ExercisePlan.objects.filter(user=user).order_by('-created_at').first()
-    meal_plan = MealPlan.objects.filter(user=user).order_by('-created_at').first()
-    
-    # Today's workout and meal
-    today_workout = None
-    today_meal = None
-    
-    if exercise_plan:
-        # Get today's weekday (1-7)
-        today_weekday = timezone.now().weekday() + 1  # +1 because weekday() starts at 0 (Monday)
-        today_workout = WorkoutDay.objects.filter(
-            exercise_plan=exercise_plan,
-            day_number=today_weekday
-        ).first()
-    
-    if meal_plan:
-        # Get today's weekday (1-7)
-        today_weekday = timezone.now().weekday() + 1
-        today_meal = DailyMeal.objects.filter(
-            meal_plan=meal_plan,
-            day_number=today_weekday
-        ).first()
+    recent_orders = snapshot['recent_orders']
+    exercise_plan = snapshot['exercise_plan']
+    meal_plan = snapshot['meal_plan']
+    today_workout = snapshot['today_workout']
+    today_meal = snapshot['today_meal']
+    recommended_articles = snapshot['recommended_articles']
     
     # Calculate BMI if height and weight are available
     if user_profile and user_profile.weight and user_profile.height:
@@ -301,29 +264,9 @@ def user_dashboard(request):
     else:
         user_profile.bmi = None
     
-    # Get recommended articles based on exercise goal
-    if exercise_plan:
-        goal_category = {
-            'weight_loss': 'weight_loss',
-            'fat_loss': 'weight_loss',
-            'muscle_gain': 'muscle_building',
-            'endurance': 'cardio',
-            'general_fitness': 'general'
-        }.get(exercise_plan.goal, 'general')
-        
-        recommended_articles = Content.objects.filter(
-            category=goal_category,
-            is_published=True
-        ).order_by('-published_at')[:3]
-    else:
-        # General articles if no exercise plan
-        recommended_articles = Content.objects.filter(
-            is_published=True
-        ).order_by('-published_at')[:3]
-    
     # Get last activity
     last_activity = None
-    if recent_orders.exists():
+    if recent_orders:
         last_activity = f"สั่งซื้อรายการ #{recent_orders[0].order_number} เมื่อ {recent_orders[0].created_at.strftime('%d/%m/%Y')}"
     elif exercise_plan:
         last_activity = f"สร้างแผนออกกำลังกายเมื่อ {exercise_plan.created_at.strftime('%d/%m/%Y')}"
@@ -345,14 +288,26 @@ def user_dashboard(request):
     return render(request, 'myapp/dashboard.html', context)
 
 # หน้าบทความและวิดีโอ
+@conditional_page(version_validator('content'))
 def content_list(request):
-    articles = Article.objects.filter(published=True).order_by('-date')
-    videos = Video.objects.filter(published=True).order_by('-date')
+    articles = Article.objects.filter(published=True)
+    videos = Video.objects.filter(published=True)
     category = request.GET.get('category', None)
     
     if category:
         articles = articles.filter(category=category)
         videos = videos.filter(category=category)
+
+    # แบ่งหน้าแยกกัน (?articles=<cursor> / ?videos=<cursor>)
+    articles = paginate(articles, ('-date', '-id'), request.GET, per_page=6, param='articles')
+    videos = paginate(videos, ('-date', '-id'), request.GET, per_page=6, param='videos')
+
+    # infinite scroll ขอเฉพาะรายการถัดไป
+    partial = request.GET.get('partial')
+    if partial == 'articles':
+        return render(request, 'myapp/partials/article_items.html', {'articles': articles})
+    if partial == 'videos':
+        return render(request, 'myapp/partials/video_items.html', {'videos': videos})
     
     context = {
         'articles': articles,
@@ -363,12 +318,9 @@ def content_list(request):
 
 # หน้าแผนโภชนาการ
 @login_required
+@subscription_required
 def nutrition_plan(request):
     user = request.user
-    subscription = Subscription.objects.filter(user=user, status='active').first()
-    
-    if not subscription:
-        return redirect('subscription_list')
     
     # รับหรือสร้างแผนโภชนาการเฉพาะบุคคล
     nutrition_plan, created = NutritionPlan.objects.get_or_create(user=user)
@@ -391,7 +343,7 @@ def nutrition_plan(request):
 @login_required
 def community_forum(request):
     topics = ForumTopic.objects.all().order_by('-last_activity')
-    popular_threads = ForumThread.objects.annotate(reply_count=Count('replies')).order_by('-reply_count')[:5]
+    popular_threads = forum.get_popular_threads()
     
     context = {
         'topics': topics,
@@ -429,23 +381,50 @@ def profile_setup(request):
     }
     return render(request, 'myapp/profile_setup.html', context)
 
+def _redirect_to_job(job, next_url):
+    """ส่งผู้ใช้ไปหน้ารองานเบื้องหลัง ซึ่งจะพาไปที่ next_url เมื่องานเสร็จ"""
+    return redirect(f"{reverse('job_wait', args=[job.id])}?{urlencode({'next': reverse(next_url)})}")
+
+def _job_next_url(request):
+    next_url = request.GET.get('next', '')
+    if url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()},
+                                       require_https=request.is_secure()):
+        return next_url
+    return reverse('dashboard')
+
+@login_required
+def job_wait(request, job_id):
+    """หน้าแสดงสถานะ "กำลังสร้าง" ระหว่างรองานเบื้องหลัง (โพลล์ job_status)"""
+    job = get_object_or_404(Job, id=job_id, user=request.user)
+    next_url = _job_next_url(request)
+    if job.status == 'done':
+        return redirect(next_url)
+
+    context = {
+        'job': job,
+        'next_url': next_url,
+    }
+    return render(request, 'myapp/job_status.html', context)
+
+@never_cache
+@login_required
+def job_status(request, job_id):
+    """สถานะของงานเบื้องหลังในรูป JSON"""
+    job = get_object_or_404(
+        Job.objects.only('id', 'status', 'attempts', 'max_attempts', 'user_id'),
+        id=job_id, user=request.user,
+    )
+    return JsonResponse({
+        'id': job.id,
+        'status': job.status,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+    })
+
 @login_required
+@subscription_required(profile_message='โปรดกรอกข้อมูลส่วนตัวก่อนเพื่อสร้างแผนออกกำลังกาย')
 def exercise_plan(request):
     """หน้าจัดการแผนออกกำลังกาย"""
-    # ตรวจสอบว่าผู้ใช้มีการสมัครสมาชิกที่ใช้งานอยู่
-    active_subscription = Subscription.objects.filter(user=request.user, status='active').first()
-    if not active_subscription:
-        return redirect('subscription_list')
-    
-    # ตรวจสอบว่าผู้ใช้ได้กรอกข้อมูลส่วนตัวแล้วหรือไม่
-    try:
-        profile = UserProfile.objects.get(user=request.user)
-        if not profile.has_completed_profile:
-            messages.warning(request, 'โปรดกรอกข้อมูลส่วนตัวก่อนเพื่อสร้างแผนออกกำลังกาย')
-            return redirect('profile_setup')
-    except UserProfile.DoesNotExist:
-        messages.warning(request, 'โปรดกรอกข้อมูลส่วนตัวก่อนเพื่อสร้างแผนออกกำลังกาย')
-        return redirect('profile_setup')
     
     # ดึงแผนออกกำลังกายล่าสุดของผู้ใช้
     exercise_plan = ExercisePlan.objects.filter(user=request.user).order_by('-created_at').first()
@@ -458,11 +437,9 @@ def exercise_plan(request):
             plan.user = request.user
             plan.save()
             
-            # สร้างแผนการออกกำลังกายรายวัน
-            generate_workout_plan(plan)
-            
-            messages.success(request, 'สร้างแผนออกกำลังกายเรียบร้อยแล้ว')
-            return redirect('view_exercise_plan')
+            # สร้างแผนการออกกำลังกายรายวันในคิวงานเบื้องหลัง แล้วให้ผู้ใช้รอที่หน้าสถานะ
+            job = jobs.enqueue('generate_workout_plan', user=request.user, plan_id=plan.pk)
+            return _redirect_to_job(job, 'view_exercise_plan')
     else:
         form = ExercisePlanForm(instance=exercise_plan)
     
@@ -473,13 +450,9 @@ def exercise_plan(request):
     return render(request, 'myapp/exercise_plan_setup.html', context)
 
 @login_required
+@subscription_required
 def view_exercise_plan(request):
     """หน้าดูแผนออกกำลังกาย"""
-    # ตรวจสอบว่าผู้ใช้มีการสมัครสมาชิกที่ใช้งานอยู่
-    active_subscription = Subscription.objects.filter(user=request.user, status='active').first()
-    if not active_subscription:
-        return redirect('subscription_list')
-    
     # ดึงแผนออกกำลังกายล่าสุดของผู้ใช้
     exercise_plan = ExercisePlan.objects.filter(user=request.user).order_by('-created_at').first()
     
@@ -520,17 +493,18 @@ def view_exercise_plan(request):
         'exercise_plan': exercise_plan,
         'workout_days': workout_days,
         'calendar_days': calendar_days,
-        'weeks': dict(weeks)
+        'weeks': dict(weeks),
+        'generating': jobs.has_pending(request.user, 'generate_workout_plan'),
     }
     return render(request, 'myapp/view_exercise_plan.html', context)
 
 @login_required
 def view_workout_day(request, day_id):
     """หน้าดูรายละเอียดการออกกำลังกายรายวัน"""
-    workout_day = get_object_or_404(WorkoutDay, id=day_id)
+    workout_day = get_object_or_404(WorkoutDay.objects.select_related('exercise_plan'), id=day_id)
     
     # ตรวจสอบว่าเป็นแผนของผู้ใช้นี้
-    if workout_day.exercise_plan.user != request.user:
+    if workout_day.exercise_plan.user_id != request.user.id:
         messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงแผนนี้')
         return redirect('dashboard')
     
@@ -544,22 +518,11 @@ def view_workout_day(request, day_id):
     return render(request, 'myapp/view_workout_day.html', context)
 
 @login_required
+@subscription_required(profile_message='โปรดกรอกข้อมูลส่วนตัวก่อนเพื่อสร้างแผนอาหาร')
 def meal_plan(request):
     """หน้าจัดการแผนอาหาร"""
-    # ตรวจสอบว่าผู้ใช้มีการสมัครสมาชิกที่ใช้งานอยู่
-    active_subscription = Subscription.objects.filter(user=request.user, status='active').first()
-    if not active_subscription:
-        return redirect('subscription_list')
-    
-    # ตรวจสอบว่าผู้ใช้ได้กรอกข้อมูลส่วนตัวแล้วหรือไม่
-    try:
-        profile = UserProfile.objects.get(user=request.user)
-        if not profile.has_completed_profile:
-            messages.warning(request, 'โปรดกรอกข้อมูลส่วนตัวก่อนเพื่อสร้างแผนอาหาร')
-            return redirect('profile_setup')
-    except UserProfile.DoesNotExist:
-        messages.warning(request, 'โปรดกรอกข้อมูลส่วนตัวก่อนเพื่อสร้างแผนอาหาร')
-        return redirect('profile_setup')
+    # สมาชิกที่ใช้งานอยู่และกรอกข้อมูลส่วนตัวแล้ว (ตรวจโดย subscription_required)
+    profile = request.entitlement.profile
     
     # ดึงแผนอาหารล่าสุดของผู้ใช้
     meal_plan = MealPlan.objects.filter(user=request.user).order_by('-created_at').first()
@@ -575,11 +538,9 @@ def meal_plan(request):
             plan.user = request.user
             plan.save()
             
-            # สร้างแผนอาหารรายวัน
-            generate_meal_plan(plan)
-            
-            messages.success(request, 'สร้างแผนอาหารเรียบร้อยแล้ว')
-            return redirect('view_meal_plan')
+            # สร้างแผนอาหารรายวันในคิวงานเบื้องหลัง แล้วให้ผู้ใช้รอที่หน้าสถานะ
+            job = jobs.enqueue('generate_meal_plan', user=request.user, plan_id=plan.pk)
+            return _redirect_to_job(job, 'view_meal_plan')
     else:
         # ถ้าไม่มีแผนอาหารเดิม ใช้ค่า TDEE เป็นค่าเริ่มต้น
         initial_data = {}
@@ -609,13 +570,9 @@ def meal_plan(request):
     return render(request, 'myapp/meal_plan_setup.html', context)
 
 @login_required
+@subscription_required
 def view_meal_plan(request):
     """หน้าดูแผนอาหาร"""
-    # ตรวจสอบว่าผู้ใช้มีการสมัครสมาชิกที่ใช้งานอยู่
-    active_subscription = Subscription.objects.filter(user=request.user, status='active').first()
-    if not active_subscription:
-        return redirect('subscription_list')
-    
     # ดึงแผนอาหารล่าสุดของผู้ใช้
     meal_plan = MealPlan.objects.filter(user=request.user).order_by('-created_at').first()
     
@@ -660,18 +617,19 @@ def view_meal_plan(request):
         'calendar_days': calendar_days,
         'macros': macros,
         'weeks': dict(weeks),
+        'generating': jobs.has_pending(request.user, 'generate_meal_plan'),
     }
     return render(request, 'myapp/view_meal_plan.html', context)
 
 @login_required
 def view_daily_meal(request, meal_id):
     """หน้าดูรายละเอียดอาหารรายวัน"""
-    daily_meal = get_object_or_404(DailyMeal, id=meal_id)
+    daily_meal = get_object_or_404(DailyMeal.objects.select_related('meal_plan'), id=meal_id)
     
     # ตรวจสอบว่าเป็นแผนของผู้ใช้นี้
-    if daily_meal.meal_plan.user != request.user:
+    if daily_meal.meal_plan.user_id != request.user.id:
         messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงแผนนี้')
-        return redirect('user_dashboard')  # แก้ไขตามชื่อฟังก์ชันที่ถูกต้อง
+        return redirect('dashboard')
     
     # ดึงรายการอาหาร
     meal_items = MealItem.objects.filter(daily_meal=daily_meal).select_related('recipe')
@@ -710,7 +668,15 @@ def view_daily_meal(request, meal_id):
     }
     return render(request, 'myapp/view_daily_meal.html', context)
 
+def _recipe_validator(request, recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).values_list().first()
+    if recipe is None:
+        return None
+    ingredients = Ingredient.objects.filter(recipe_id=recipe_id).order_by('id').values_list('id', 'name', 'amount')
+    return content_hash(recipe, list(ingredients))
+
 @login_required
+@conditional_page(_recipe_validator)
 def view_recipe(request, recipe_id):
    """หน้าดูรายละเอียดสูตรอาหาร"""
    recipe = get_object_or_404(Recipe, id=recipe_id)
@@ -724,179 +690,10 @@ def view_recipe(request, recipe_id):
    }
    return render(request, 'myapp/view_recipe.html', context)
 
-# ฟังก์ชั่นช่วยสร้างแผนอาหาร
-def generate_meal_plan(meal_plan):
-   """สร้างแผนอาหารรายวันตามเป้าหมายและความต้องการทางโภชนาการ"""
-   # ลบแผนเดิมหากมี
-   DailyMeal.objects.filter(meal_plan=meal_plan).delete()
-   
-   # สร้างชุดสูตรอาหารที่เหมาะสมตามเป้าหมาย
-   diet_type = 'any'  # ค่าเริ่มต้น
-   if 'vegetarian' in meal_plan.dietary_restrictions.lower():
-       diet_type = 'vegetarian'
-   elif 'vegan' in meal_plan.dietary_restrictions.lower():
-       diet_type = 'vegan'
-   
-   # สร้างเมนูอาหารตามเป้าหมาย
-   if meal_plan.goal == 'weight_loss':
-       breakfast_recipes = Recipe.objects.filter(meal_type='breakfast', diet_type__in=[diet_type, 'any'], calories_per_serving__lt=400).order_by('?')
-       lunch_recipes = Recipe.objects.filter(meal_type='lunch', diet_type__in=[diet_type, 'any'], calories_per_serving__lt=500).order_by('?')
-       dinner_recipes = Recipe.objects.filter(meal_type='dinner', diet_type__in=[diet_type, 'any'], calories_per_serving__lt=500).order_by('?')
-       snack_recipes = Recipe.objects.filter(meal_type='snack', diet_type__in=[diet_type, 'any'], calories_per_serving__lt=200).order_by('?')
-   
-   elif meal_plan.goal == 'muscle_gain':
-       breakfast_recipes = Recipe.objects.filter(meal_type='breakfast', diet_type__in=[diet_type, 'any'], protein__gt=20).order_by('?')
-       lunch_recipes = Recipe.objects.filter(meal_type='lunch', diet_type__in=[diet_type, 'any'], protein__gt=30).order_by('?')
-       dinner_recipes = Recipe.objects.filter(meal_type='dinner', diet_type__in=[diet_type, 'any'], protein__gt=30).order_by('?')
-       snack_recipes = Recipe.objects.filter(meal_type='snack', diet_type__in=[diet_type, 'any'], protein__gt=10).order_by('?')
-   
-   else:  # general_health, maintenance
-       breakfast_recipes = Recipe.objects.filter(meal_type='breakfast', diet_type__in=[diet_type, 'any']).order_by('?')
-       lunch_recipes = Recipe.objects.filter(meal_type='lunch', diet_type__in=[diet_type, 'any']).order_by('?')
-       dinner_recipes = Recipe.objects.filter(meal_type='dinner', diet_type__in=[diet_type, 'any']).order_by('?')
-       snack_recipes = Recipe.objects.filter(meal_type='snack', diet_type__in=[diet_type, 'any']).order_by('?')
-   
-   # หากไม่มีสูตรอาหารที่ตรงตามเงื่อนไข ใช้ทั้งหมด
-   if not breakfast_recipes:
-       breakfast_recipes = Recipe.objects.filter(meal_type='breakfast').order_by('?')
-   if not lunch_recipes:
-       lunch_recipes = Recipe.objects.filter(meal_type='lunch').order_by('?')
-   if not dinner_recipes:
-       dinner_recipes = Recipe.objects.filter(meal_type='dinner').order_by('?')
-   if not snack_recipes:
-       snack_recipes = Recipe.objects.filter(meal_type='snack').order_by('?')
-   
-   # สร้างแผนอาหาร 7 วัน
-   for day in range(1, 8):
-       daily_meal = DailyMeal.objects.create(
-           meal_plan=meal_plan,
-           day_number=day
-       )
-       
-       # เพิ่มมื้ออาหาร
-       # อาหารเช้า
-       if breakfast_recipes:
-           breakfast = breakfast_recipes[day % len(breakfast_recipes)]
-           MealItem.objects.create(
-               daily_meal=daily_meal,
-               recipe=breakfast,
-               meal_time='breakfast'
-           )
-       
-       # อาหารกลางวัน
-       if lunch_recipes:
-           lunch = lunch_recipes[day % len(lunch_recipes)]
-           MealItem.objects.create(
-               daily_meal=daily_meal,
-               recipe=lunch,
-               meal_time='lunch'
-           )
-       
-       # อาหารเย็น
-       if dinner_recipes:
-           dinner = dinner_recipes[day % len(dinner_recipes)]
-           MealItem.objects.create(
-               daily_meal=daily_meal,
-               recipe=dinner,
-               meal_time='dinner'
-           )
-       
-       # อาหารว่าง (ถ้ามีมากกว่า 3 มื้อ)
-       if meal_plan.meals_per_day > 3 and snack_recipes:
-           snack = snack_recipes[day % len(snack_recipes)]
-           MealItem.objects.create(
-               daily_meal=daily_meal,
-               recipe=snack,
-               meal_time='snack'
-           )
-
-# views.py
-# เพิ่มการนำเข้าฟังก์ชันช่วยเหลือ
-from .helpers import distribute_training_days, create_workout_exercises
-
-
-# ใช้ในฟังก์ชัน generate_workout_plan
-def generate_workout_plan(exercise_plan):
-    """สร้างแผนออกกำลังกายรายวันตามเป้าหมายและระดับความสามารถ"""
-    # ลบแผนเดิมหากมี
-    WorkoutDay.objects.filter(exercise_plan=exercise_plan).delete()
-    
-    # กำหนดวันออกกำลังกายตามจำนวนวันต่อสัปดาห์
-    days_per_week = exercise_plan.days_per_week
-    
-    # สร้างแผนออกกำลังกายตามรูปแบบการฝึก
-    if exercise_plan.training_focus == 'full_body':
-        # แผนฝึกทั้งร่างกาย - กระจายวันฝึกให้ห่างกัน
-        training_days = distribute_training_days(days_per_week)
-        for day in range(1, 8):
-            if day in training_days:
-                workout_day = WorkoutDay.objects.create(
-                    exercise_plan=exercise_plan,
-                    day_number=day,
-                    focus='full_body'
-                )
-                create_workout_exercises(workout_day, exercise_plan)
-            else:
-                WorkoutDay.objects.create(
-                    exercise_plan=exercise_plan,
-                    day_number=day,
-                    focus='rest'
-                )
-    
-    elif exercise_plan.training_focus == 'upper_lower':
-        # แผนฝึกส่วนบน/ส่วนล่าง - สลับวันฝึก
-        training_days = distribute_training_days(days_per_week)
-        upper_lower_cycle = cycle(['upper_body', 'lower_body'])
-        
-        for day in range(1, 8):
-            if day in training_days:
-                focus = next(upper_lower_cycle)
-                workout_day = WorkoutDay.objects.create(
-                    exercise_plan=exercise_plan,
-                    day_number=day,
-                    focus=focus
-                )
-                create_workout_exercises(workout_day, exercise_plan)
-            else:
-                WorkoutDay.objects.create(
-                    exercise_plan=exercise_plan,
-                    day_number=day,
-                    focus='rest'
-                )
-                
-    elif exercise_plan.training_focus == 'push_pull_legs':
-        # แผนฝึกแบบ Push/Pull/Legs
-        training_days = distribute_training_days(min(6, days_per_week))  # สูงสุด 6 วัน
-        ppl_cycle = cycle(['chest', 'back', 'legs'])  # Push, Pull, Legs
-        
-        for day in range(1, 8):
-            if day in training_days:
-                muscle_focus = next(ppl_cycle)
-                # กำหนด focus สำหรับการแสดงผล
-                if muscle_focus == 'chest':
-                    display_focus = 'upper_body'  # Push
-                elif muscle_focus == 'back':
-                    display_focus = 'upper_body'  # Pull
-                else:
-                    display_focus = 'lower_body'  # Legs
-                
-                workout_day = WorkoutDay.objects.create(
-                    exercise_plan=exercise_plan,
-                    day_number=day,
-                    focus=display_focus
-                )
-                create_workout_exercises(workout_day, exercise_plan, primary_muscle=muscle_focus)
-            else:
-                WorkoutDay.objects.create(
-                    exercise_plan=exercise_plan,
-                    day_number=day,
-                    focus='rest'
-                )
-
 @login_required
 def order_history(request):
     """แสดงประวัติคำสั่งซื้อของผู้ใช้"""
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    orders = paginate(Order.objects.filter(user=request.user), ('-created_at', '-id'), request.GET)
     return render(request, 'myapp/order_history.html', {'orders': orders})
 
 @login_required
@@ -904,17 +701,18 @@ def order_detail(request, order_id):
     """แสดงรายละเอียดคำสั่งซื้อ"""
     order = get_object_or_404(Order, id=order_id, user=request.user)
    
-    # สร้าง QR payload
+    # รูป QR ให้ endpoint แยกส่ง (cache ได้ทั้งฝั่งเซิร์ฟเวอร์และเบราว์เซอร์)
     try:
-        payload = generate_promptpay_payload(mobile="0812345678", amount=order.total_amount)
-        qr_image = generate_qr_image(payload)
-        qr_base64 = base64.b64encode(qr_image.read()).decode('utf-8')
-    except Exception as e:
-        qr_base64 = None
+        payload = order_promptpay_payload(order)
+        qr_svg_url = qr_url(payload, 'svg')
+        qr_png_url = qr_url(payload, 'png')
+    except ValueError:
+        qr_svg_url = qr_png_url = None
 
     return render(request, 'myapp/order_detail.html', {
         'order': order,
-        'qr_base64': qr_base64,
+        'qr_svg_url': qr_svg_url,
+        'qr_png_url': qr_png_url,
     })
 
 @login_required
@@ -959,8 +757,7 @@ def password_change(request):
 @login_required
 def wishlist(request):
     """แสดงรายการโปรด"""
-    # สมมติว่ามีโมเดล Wishlist
-    wishlist_items = Wishlist.objects.filter(user=request.user)
+    wishlist_items = Wishlist.objects.filter(user=request.user).select_related('product')
     return render(request, 'myapp/wishlist.html', {'wishlist_items': wishlist_items})
 
 @login_required
@@ -992,15 +789,8 @@ def support(request):
 @login_required
 def remove_from_cart(request, item_id):
     """ลบสินค้าออกจากตะกร้า"""
-    order_item = get_object_or_404(OrderItem, id=item_id, order__user=request.user, order__status='pending')
-    order = order_item.order
-    
-    # ลบรายการจากตะกร้า
-    order_item.delete()
-    
-    # อัปเดตยอดรวมของคำสั่งซื้อ
-    order.total_amount = sum(item.price * item.quantity for item in order.items.all())
-    order.save()
+    if not cart_service.remove_item(request.user, item_id):
+        raise Http404('ไม่พบสินค้าในตะกร้า')
     
     messages.success(request, 'ลบสินค้าออกจากตะกร้าเรียบร้อยแล้ว')
     return redirect('cart')
@@ -1008,58 +798,69 @@ def remove_from_cart(request, item_id):
 @login_required
 def update_cart_item(request, item_id):
     """อัปเดตจำนวนสินค้าในตะกร้า"""
-    order_item = get_object_or_404(OrderItem, id=item_id, order__user=request.user, order__status='pending')
     action = request.POST.get('action')
+    delta = {'increase': 1, 'decrease': -1}.get(action, 0)
     
-    if action == 'increase':
-        order_item.quantity += 1
-    elif action == 'decrease':
-        if order_item.quantity > 1:
-            order_item.quantity -= 1
-        else:
-            # ถ้าจำนวนเหลือ 1 และกดลด ให้ลบรายการออก
-            return redirect('remove_from_cart', item_id=item_id)
-    
-    order_item.save()
-    
-    # อัปเดตยอดรวมของคำสั่งซื้อ
-    order = order_item.order
-    order.total_amount = sum(item.price * item.quantity for item in order.items.all())
-    order.save()
+    quantity = cart_service.change_item_quantity(request.user, item_id, delta)
+    if quantity is None:
+        raise Http404('ไม่พบสินค้าในตะกร้า')
+    if quantity == 0:
+        # ถ้าจำนวนเหลือ 1 และกดลด รายการจะถูกลบออก
+        messages.success(request, 'ลบสินค้าออกจากตะกร้าเรียบร้อยแล้ว')
     
     return redirect('cart')
 
 @login_required
 def checkout(request):
     """ดำเนินการสั่งซื้อ"""
-    try:
-        cart = Order.objects.get(user=request.user, status='pending')
-    except Order.DoesNotExist:
+    cart = cart_service.get_cart(request.user)
+    if cart is None:
         messages.error(request, 'ไม่พบตะกร้าสินค้าของคุณ')
         return redirect('product_list')
     
     if request.method == 'POST':
-        # ดำเนินการชำระเงิน (จำลองว่าสำเร็จเสมอ)
-        cart.status = 'paid'
-        cart.save()
+        # ดำเนินการชำระเงิน (จำลองว่าสำเร็จเสมอ): ตัดสต็อกและเปลี่ยนสถานะใน transaction เดียว
+        try:
+            order = inventory.place_order(cart.id)
+        except inventory.OutOfStock as exc:
+            messages.error(request, f'สินค้า {exc.product_name} มีไม่พอ กรุณาปรับจำนวนในตะกร้า')
+            return redirect('cart')
+        if order is None:
+            messages.error(request, 'ไม่พบสินค้าในตะกร้าของคุณ')
+            return redirect('cart')
+        cart_service.invalidate_cart_count(request.user)
+        # เตรียมรูป QR สำหรับหน้าคำสั่งซื้อไว้ล่วงหน้า
+        jobs.enqueue('render_promptpay_qr', user=request.user, order_id=order.id)
         
         messages.success(request, 'สั่งซื้อสินค้าสำเร็จ! ขอบคุณที่ใช้บริการ')
-        return redirect('order_detail', order_id=cart.id)
+        return redirect('order_detail', order_id=order.id)
+    
+    # จองสต็อกไว้ระหว่างที่ผู้ใช้ยืนยันการสั่งซื้อ (คืนอัตโนมัติเมื่อหมดเวลา)
+    try:
+        reserved_until = inventory.reserve(cart.id)
+    except inventory.OutOfStock as exc:
+        messages.error(request, f'สินค้า {exc.product_name} มีไม่พอ กรุณาปรับจำนวนในตะกร้า')
+        return redirect('cart')
     
     context = {
         'cart': cart,
-        'items': cart.items.all()
+        'items': cart.items.select_related('product'),
+        'reserved_until': reserved_until,
     }
     return render(request, 'myapp/checkout.html', context)
 
 @login_required
 def track_progress(request):
     """หน้าติดตามความก้าวหน้า"""
-    progress_entries = Progress.objects.filter(user=request.user).order_by('-date')
+    progress_entries = paginate(
+        Progress.objects.filter(user=request.user), ('-date', '-id'), request.GET, per_page=30
+    )
     
     context = {
         'progress_entries': progress_entries
     }
+    if request.GET.get('partial'):
+        return render(request, 'myapp/partials/progress_items.html', context)
     return render(request, 'myapp/track_progress.html', context)
 
 @login_required
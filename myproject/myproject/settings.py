@@ -56,6 +56,7 @@ INSTALLED_APPS = [
     'django.contrib.sites',
     'myapp',
     'django_extensions',
+    'rest_framework',
     'allauth',
     'allauth.account',
     'allauth.socialaccount',
@@ -72,19 +73,6 @@ AUTHENTICATION_BACKENDS = [
     'allauth.account.auth_backends.AuthenticationBackend',
 ]
 
-# Add this to MIDDLEWARE in settings.py
-
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'myapp.middleware.AuthenticationMiddleware',  # Add this line
-]
-
 # Allauth settings
 ACCOUNT_EMAIL_REQUIRED = True
 ACCOUNT_USERNAME_REQUIRED = True
@@ -110,15 +98,64 @@ LOGIN_REDIRECT_URL = '/dashboard/'  # เปลี่ยนตามที่ต
 LOGOUT_REDIRECT_URL = '/'  # เปลี่ยนตามที่ต้องการ
 
 MIDDLEWARE = [
+    # อยู่นอกสุดเพื่อวัดเวลาและ query ของ middleware อื่นด้วย
+    'myapp.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # ไฟล์ static ที่มี hash ในชื่อได้ Cache-Control แบบ immutable อายุยาว
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'myapp.middleware.AuthenticationMiddleware',
 ]
 
+# การวัดต้นทุนของคำขอ (myapp.middleware.InstrumentationMiddleware)
+SERVER_TIMING = os.environ.get('DJANGO_SERVER_TIMING', '1') == '1'
+SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get('DJANGO_SLOW_REQUEST_MS', '500'))
+SLOW_REQUEST_TOP_QUERIES = 5
+
+# รอบเวลา (วินาที) ของตัวเก็บกวาด subscription หมดอายุใน process (0 = ปิด)
+SUBSCRIPTION_SWEEP_INTERVAL = int(os.environ.get('DJANGO_SUBSCRIPTION_SWEEP_INTERVAL', '0'))
+
+# คิวงานเบื้องหลัง (myapp.jobs): worker รันด้วย `python manage.py run_jobs`
+# JOBS_EAGER=1 รันงานใน process ของคำขอหลัง commit แทน (สำหรับพัฒนาโดยไม่มี worker)
+JOBS_EAGER = os.environ.get('DJANGO_JOBS_EAGER', '0') == '1'
+JOBS_RETENTION_DAYS = 7
+# worker ยกเลิกตะกร้า (คำสั่งซื้อ 'pending') ที่ไม่มีการแก้ไขนานกว่านี้ (myapp.jobs.reap_idle_carts)
+CART_IDLE_DAYS = 30
+
+# รหัสรุ่นของโค้ดที่ deploy อยู่ (เช่น git sha) ใช้ใน ETag ของหน้าเว็บ (myapp.conditional)
+# เพื่อให้หน้าที่เบราว์เซอร์เก็บไว้หมดอายุเมื่อเทมเพลตเปลี่ยน
+RELEASE = os.environ.get('DJANGO_RELEASE', '')
+
+# API อ่านอย่างเดียว (myapp.api)
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+    'DEFAULT_PAGINATION_CLASS': 'myapp.api.pagination.KeysetCursorPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'myapp.instrumentation': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 ROOT_URLCONF = 'myproject.urls'
 
 TEMPLATES = [
@@ -152,6 +189,33 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'django_pass'),
         'HOST': os.environ.get('POSTGRES_HOST', 'db'),
         'PORT': '5432',
+        # วินาทีที่เก็บการเชื่อมต่อไว้ใช้ข้ามคำขอ (0 = เปิดใหม่ทุกคำขอ) ตรวจก่อนใช้ว่ายังไม่หลุด
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# พูลการเชื่อมต่อใน process (myapp/db_pool): จำกัดจำนวนการเชื่อมต่อต่อ process
+# และให้ thread/คำขอยืมการเชื่อมต่อที่เปิดค้างไว้ คืนเข้าพูลเมื่อจบคำขอ (CONN_MAX_AGE ต้องเป็น 0)
+DB_POOL = os.environ.get('DJANGO_DB_POOL', '0') == '1'
+if DB_POOL:
+    DATABASES['default'].update({
+        'ENGINE': 'myapp.db_pool',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DJANGO_DB_POOL_MAX_SIZE', '10')),
+            'TIMEOUT': float(os.environ.get('DJANGO_DB_POOL_TIMEOUT', '5')),
+        },
+    })
+
+
+# Cache
+# ค่าเริ่มต้นเป็น cache ในหน่วยความจำของแต่ละ process; เมื่อรันหลาย worker
+# ควรตั้ง DJANGO_CACHE_BACKEND/DJANGO_CACHE_LOCATION ให้ใช้ cache ร่วมกัน (เช่น Redis, Memcached)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'careme'),
     }
 }
 
@@ -187,6 +251,23 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# CSS/JS ใน myapp/static/dist มาจาก npm run build (package.json)
+# โหมด production ใช้ manifest storage: collectstatic ใส่ hash ของเนื้อหาในชื่อไฟล์และบีบอัดไว้ล่วงหน้า
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'myapp.storage.StaticFilesStorage'
+        ),
+    },
+}
+WHITENOISE_USE_FINDERS = DEBUG
+WHITENOISE_AUTOREFRESH = DEBUG
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -0,0 +1,61 @@
+"""
+ค่าสำหรับ production: DJANGO_SETTINGS_MODULE=myproject.settings_production
+
+ใช้ค่าทั้งหมดจาก settings.py แล้วปิด DEBUG, เปิด cached template loader,
+เก็บการเชื่อมต่อฐานข้อมูลไว้ใช้ซ้ำ ใช้ไฟล์ static ที่มี hash ในชื่อ และใช้ cache ร่วมกันบน Redis
+entrypoint.sh ใช้ไฟล์นี้เมื่อรันด้วย gunicorn/uvicorn (DJANGO_SERVER)
+"""
+import multiprocessing
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, DB_POOL, STORAGES, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('ต้องตั้ง DJANGO_SECRET_KEY ในโหมด production')
+
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',') if host.strip()]
+CSRF_TRUSTED_ORIGINS = [
+    origin.strip() for origin in os.environ.get('DJANGO_CSRF_TRUSTED_ORIGINS', '').split(',') if origin.strip()
+]
+
+# โหลดและ compile template ครั้งเดียวต่อ worker
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# ใช้การเชื่อมต่อเดิมข้ามคำขอ (เมื่อไม่ได้ใช้พูล DJANGO_DB_POOL)
+# ยกเว้น ASGI: view แบบ sync รันใน thread ใหม่ต่อคำขอ การเชื่อมต่อที่ค้างไว้จะสะสมจนเต็ม max_connections
+# (ASGI ควรใช้พูลแทน)
+if not DB_POOL:
+    _default_conn_max_age = '0' if os.environ.get('DJANGO_SERVER') == 'uvicorn' else '60'
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DJANGO_CONN_MAX_AGE', _default_conn_max_age))
+
+STORAGES['staticfiles']['BACKEND'] = 'myapp.storage.StaticFilesStorage'
+WHITENOISE_USE_FINDERS = False
+WHITENOISE_AUTOREFRESH = False
+
+# ค่าที่ถูกล้างผ่าน signal (สิทธิ์ subscription, badge ตะกร้า, แดชบอร์ด, เวอร์ชันของ ETag, แคตตาล็อกท่าออกกำลังกาย)
+# ต้องหายจากทุก worker พร้อมกัน LocMemCache แยกตาม process จึงใช้ได้เมื่อมี worker เดียวเท่านั้น
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.redis.RedisCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'redis://redis:6379/0'),
+    }
+}
+# จำนวน worker เดียวกับ gunicorn.conf.py
+WEB_WORKERS = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+if CACHES['default']['BACKEND'].endswith('.LocMemCache') and WEB_WORKERS > 1:
+    raise ImproperlyConfigured(
+        f'LocMemCache ใช้ร่วมกันข้าม {WEB_WORKERS} worker ไม่ได้ ตั้ง DJANGO_CACHE_BACKEND เป็น Redis/Memcached '
+        '(หรือ WEB_CONCURRENCY=1)'
+    )
@@ -0,0 +1,53 @@
+// myproject/tailwind.config.js
+/** @type {import('tailwindcss').Config} */
+module.exports = {
+  // ไฟล์ที่มีชื่อ class: class ที่ไม่พบในไฟล์เหล่านี้จะไม่ถูกสร้าง
+  // (ชื่อ class ต้องเขียนเต็ม ห้ามประกอบจากตัวแปรใน template)
+  content: [
+    './myapp/templates/**/*.html',
+    './myapp/components/**/*.html',
+    './myapp/static/js/**/*.js',
+    './myapp/**/*.py',
+  ],
+  darkMode: 'class',
+  theme: {
+    extend: {
+      colors: {
+        'rich-black': '#0A0D14',
+        'mint': '#84E8C5',
+        'teal': '#3ABDB8',
+        'peach': '#FF9E7A',
+        'secondary': {
+          light: '#FF9E7A',
+          dark: '#FF7E52',
+        },
+        'primary': {
+          light: '#3ABDB8',
+          dark: '#84E8C5',
+        },
+        'bg-light': '#ffffff',
+        'bg-dark': '#0A0D14',
+        'text-light': '#333333',
+        'text-dark': '#F0F0F0',
+      },
+      fontFamily: {
+        'sans': ['Inter', 'Noto Sans Thai', 'sans-serif'],
+        'display': ['Druk', 'Noto Sans Thai', 'sans-serif'],
+      },
+      animation: {
+        float: 'float 5s ease-in-out infinite',
+        fadeIn: 'fadeIn 0.5s ease-in-out',
+      },
+      keyframes: {
+        float: {
+          '0%, 100%': { transform: 'translateY(0)' },
+          '50%': { transform: 'translateY(-10px)' },
+        },
+        fadeIn: {
+          '0%': { opacity: '0' },
+          '100%': { opacity: '1' },
+        },
+      },
+    },
+  },
+};